@@ -1,6 +1,6 @@
 {
     'name': 'Zid Integration',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'summary': 'Integration with Zid E-commerce Platform',
     'description': """
         Zid Integration Module
@@ -35,6 +35,9 @@
         
         # All views first (except product_template which references wizard actions)
         'views/zid_queue_ept_views.xml',
+        'views/zid_import_job_views.xml',
+        'views/zid_sync_run_views.xml',
+        'views/zid_webhook_event_views.xml',
         'views/zid_locations.xml',
         'views/stock_locations.xml',
         'views/zid_stock_sync_views.xml',
@@ -82,6 +85,7 @@
         'wizards/zid_customer_sync_wizard.xml',
         'wizards/zid_abandoned_cart_fetch_wizard.xml',
         'wizards/zid_bulk_sync_wizard.xml',
+        'wizards/zid_webhook_replay_wizard.xml',
         'wizards/zid_health_report_wizard.xml',
         'wizards/zid_product_matching_wizard_views.xml',
         'wizards/zid_automation_wizard_views.xml',
@@ -97,6 +101,7 @@
     'assets': {
         'web.assets_backend': [
             'zid_integration/static/src/css/zid_dashboard.css',
+            'zid_integration/static/src/js/zid_progress_service.js',
         ],
     },
     'installable': True,
@@ -0,0 +1,56 @@
+import logging
+
+from odoo.addons.zid_integration.models.zid_payload_mixin import compress_payload
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# table -> {legacy text column: compressed blob column}
+PAYLOAD_COLUMNS = {
+    'zid_queue_line_ept': {'data': 'data_blob'},
+    'zid_sale_order': {'raw_data': 'raw_data_blob', 'processed_data': 'processed_data_blob'},
+    'zid_product': {'images_data': 'images_data_blob', 'categories_data': 'categories_data_blob'},
+    'zid_stock_update_log': {'request_data': 'request_data_blob', 'response_data': 'response_data_blob'},
+    'product_template': {'zid_response': 'zid_response_blob'},
+}
+
+
+def _column_exists(cr, table, column):
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = %s AND column_name = %s
+    """, (table, column))
+    return bool(cr.fetchone())
+
+
+def _convert_column(cr, table, text_column, blob_column):
+    """Compress ``text_column`` into ``blob_column`` in id batches, then drop it"""
+    converted = 0
+    last_id = 0
+    while True:
+        cr.execute(f"""
+            SELECT id, "{text_column}" FROM "{table}"
+             WHERE id > %s AND "{text_column}" IS NOT NULL
+             ORDER BY id
+             LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cr.fetchall()
+        if not rows:
+            break
+        params = [(compress_payload(text), record_id) for record_id, text in rows]
+        cr.executemany(f'UPDATE "{table}" SET "{blob_column}" = %s WHERE id = %s', params)
+        converted += len(rows)
+        last_id = rows[-1][0]
+
+    cr.execute(f'ALTER TABLE "{table}" DROP COLUMN "{text_column}"')
+    _logger.info(f"Compressed {converted} payloads from {table}.{text_column} into {blob_column}")
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    for table, columns in PAYLOAD_COLUMNS.items():
+        for text_column, blob_column in columns.items():
+            if _column_exists(cr, table, text_column) and _column_exists(cr, table, blob_column):
+                _convert_column(cr, table, text_column, blob_column)
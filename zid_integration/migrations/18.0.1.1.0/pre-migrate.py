@@ -0,0 +1,83 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _table_exists(cr, table):
+    cr.execute("SELECT 1 FROM information_schema.tables WHERE table_name = %s", (table,))
+    return bool(cr.fetchone())
+
+
+def _foreign_keys_to(cr, table):
+    """``(table, column)`` of every single-column foreign key referencing ``table.id``"""
+    cr.execute("""
+        SELECT fk.table_name, fk.column_name
+          FROM information_schema.referential_constraints rc
+          JOIN information_schema.key_column_usage fk
+            ON fk.constraint_schema = rc.constraint_schema AND fk.constraint_name = rc.constraint_name
+          JOIN information_schema.key_column_usage pk
+            ON pk.constraint_schema = rc.unique_constraint_schema AND pk.constraint_name = rc.unique_constraint_name
+         WHERE pk.table_name = %s AND pk.column_name = 'id'
+           AND fk.table_schema = current_schema()
+    """, (table,))
+    return cr.fetchall()
+
+
+def _dedupe_zid_orders(cr):
+    """Collapse duplicate (connector, Zid order id) rows before ``unique_zid_order`` is created.
+
+    The survivor of each group is the row linked to a sale order, else the
+    most recent one. Foreign keys and chatter references to the other rows
+    are moved onto it, so nothing is cascaded away with them.
+    """
+    cr.execute("""
+        CREATE TEMP TABLE zid_order_duplicates AS
+        SELECT id, keep_id
+          FROM (
+                SELECT id, first_value(id) OVER (
+                           PARTITION BY zid_connector_id, zid_order_id
+                           ORDER BY sale_order_id IS NULL, id DESC
+                       ) AS keep_id
+                  FROM zid_sale_order
+               ) ranked
+         WHERE id != keep_id
+    """)
+    cr.execute("SELECT count(*) FROM zid_order_duplicates")
+    duplicates = cr.fetchone()[0]
+
+    if duplicates:
+        # Every many2one to zid.sale.order (payout lines, reverse orders, sale
+        # orders, wizards): a cascading delete would otherwise drop or unlink them
+        for table, column in _foreign_keys_to(cr, 'zid_sale_order'):
+            cr.execute(f"""
+                UPDATE "{table}" rec
+                   SET "{column}" = dup.keep_id
+                  FROM zid_order_duplicates dup
+                 WHERE rec."{column}" = dup.id
+            """)
+        for table, model_column in (
+            ('mail_message', 'model'),
+            ('mail_activity', 'res_model'),
+            ('ir_attachment', 'res_model'),
+        ):
+            cr.execute(f"""
+                UPDATE "{table}" rec
+                   SET res_id = dup.keep_id
+                  FROM zid_order_duplicates dup
+                 WHERE rec."{model_column}" = 'zid.sale.order' AND rec.res_id = dup.id
+            """)
+        cr.execute("""
+            DELETE FROM mail_followers
+             WHERE res_model = 'zid.sale.order'
+               AND res_id IN (SELECT id FROM zid_order_duplicates)
+        """)
+        cr.execute("DELETE FROM zid_sale_order WHERE id IN (SELECT id FROM zid_order_duplicates)")
+        _logger.info(f"Removed {duplicates} duplicate Zid orders before adding unique_zid_order")
+
+    cr.execute("DROP TABLE zid_order_duplicates")
+
+
+def migrate(cr, version):
+    if not version or not _table_exists(cr, 'zid_sale_order'):
+        return
+    _dedupe_zid_orders(cr)
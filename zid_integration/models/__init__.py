@@ -1,3 +1,6 @@
+from . import zid_payload_mixin
+from . import zid_payload_archive
+from . import zid_chunked_transaction
 from . import zid_connector
 from . import product_template
 from . import zid_location
@@ -10,6 +13,7 @@ from . import stock_quant
 from . import zid_product
 from . import zid_product_image
 from . import zid_webhook
+from . import zid_webhook_event
 from . import zid_product_category
 from . import zid_abandoned_cart
 from . import zid_payout
@@ -27,6 +31,10 @@ from . import zid_attribute
 from . import zid_variant_mapping
 from . import zid_queue_ept
 from . import zid_queue_line_ept
+from . import zid_order_idempotency
+from . import zid_order_prefetch
+from . import zid_import_job
+from . import zid_sync_run
 from . import sale_order_inherit
 from . import zid_diagnostic
 from . import stock_picking_inherit
@@ -7,7 +7,9 @@ _logger = logging.getLogger(__name__)
 
 
 class ProductTemplate(models.Model):
-    _inherit = 'product.template'
+    _name = 'product.template'
+    _inherit = ['product.template', 'zid.payload.mixin']
+    _payload_fields = {'zid_response': 'zid_response_blob'}
 
     # ============== Zid Fields ==============
     # Connection field
@@ -184,11 +186,20 @@ class ProductTemplate(models.Model):
     # Zid response storage
     zid_response = fields.Text(
         string='Zid API Response',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         readonly=True,
         copy=False,
         help='Last API response from Zid'
     )
 
+    zid_response_blob = fields.Binary(
+        string='Zid API Response (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+
     zid_error_message = fields.Text(
         string='Zid Error Message',
         readonly=True,
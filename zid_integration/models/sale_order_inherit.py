@@ -25,7 +25,7 @@ class SaleOrder(models.Model):
         
         for order in self:
             # Check if this is a Zid order
-            zid_order = self.env['zid.sale.order'].search([('sale_order_id', '=', order.id)], limit=1)
+            zid_order = order.zid_order_id or self.env['zid.sale.order'].search([('sale_order_id', '=', order.id)], limit=1)
             
             if zid_order and zid_order.zid_connector_id.sync_status_to_zid:
                 # Map Odoo 'sale' state to Zid 'preparing' or 'ready'
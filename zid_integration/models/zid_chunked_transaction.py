@@ -0,0 +1,65 @@
+import logging
+import time
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+# Default commit cadence: whichever comes first
+COMMIT_EVERY = 100
+COMMIT_SECONDS = 30
+
+
+class ZidChunkedTransaction(models.AbstractModel):
+    """Savepoint per item, commit per chunk.
+
+    ``_run_chunked`` isolates every item in its own savepoint, so one bad
+    record never aborts the transaction, and commits every ``commit_every``
+    items or ``commit_seconds`` seconds. ``on_commit`` runs right before each
+    commit with the last handled item, letting callers persist a resume
+    cursor in the same transaction as the work it covers.
+    """
+    _name = 'zid.chunked.transaction'
+    _description = 'Zid Chunked Transaction Helper'
+
+    @api.model
+    def _run_chunked(self, items, process, on_error=None, on_commit=None,
+                     commit_every=COMMIT_EVERY, commit_seconds=COMMIT_SECONDS):
+        """Call ``process(item)`` for each item; returns ``(succeeded, failed)``.
+
+        ``on_error(item, exception)`` is called after the item's savepoint was
+        rolled back; without it the error is only logged.
+        """
+        cr = self.env.cr
+        succeeded = failed = pending = 0
+        last_item = None
+        chunk_started = time.monotonic()
+
+        for item in items:
+            try:
+                with cr.savepoint():
+                    process(item)
+                succeeded += 1
+            except Exception as e:
+                failed += 1
+                if on_error:
+                    on_error(item, e)
+                else:
+                    _logger.error(f"Chunked processing failed for {item}: {str(e)}", exc_info=True)
+
+            last_item = item
+            pending += 1
+            if pending >= commit_every or time.monotonic() - chunk_started >= commit_seconds:
+                self._commit_chunk(on_commit, last_item)
+                pending = 0
+                chunk_started = time.monotonic()
+
+        if pending:
+            self._commit_chunk(on_commit, last_item)
+        return succeeded, failed
+
+    @api.model
+    def _commit_chunk(self, on_commit, last_item):
+        if on_commit:
+            on_commit(last_item)
+        self.env.cr.commit()
@@ -1,13 +1,16 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
 import requests
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import urllib.parse
 
 _logger = logging.getLogger(__name__)
 
+# Fields the cached webhook connector lookup depends on
+WEBHOOK_LOOKUP_FIELDS = {'store_id', 'webhook_secret', 'webhook_coalesce_seconds', 'active'}
+
 
 class ZidConnector(models.Model):
     _name = 'zid.connector'
@@ -109,8 +112,26 @@ class ZidConnector(models.Model):
     )
     order_import_start_date = fields.Datetime(
         string='Order Fetch Start Date',
-        help='Orders created/updated after this date will be fetched by the scheduler. \
-              Updated automatically after each successful sync.'
+        help='Orders created/updated after this date will be fetched by the scheduler \
+              until the first incremental sync sets the order sync watermark.'
+    )
+    order_sync_watermark = fields.Datetime(
+        string='Order Sync Watermark',
+        readonly=True,
+        copy=False,
+        help='Highest Zid updated_at seen by the incremental order import'
+    )
+    order_sync_watermark_id = fields.Integer(
+        string='Order Sync Watermark ID',
+        readonly=True,
+        copy=False,
+        help='Zid order ID that set the order sync watermark (tie-breaker for equal timestamps)'
+    )
+    order_sync_overlap_minutes = fields.Integer(
+        string='Order Sync Overlap (Minutes)',
+        default=10,
+        help='Re-read orders updated this many minutes before the watermark to absorb \
+              clock skew and late writes on Zid. Re-read orders are upserted idempotently.'
     )
     active = fields.Boolean(
         string='Active',
@@ -149,6 +170,14 @@ class ZidConnector(models.Model):
         help='Secret key for webhook verification'
     )
 
+    webhook_coalesce_seconds = fields.Integer(
+        string='Coalesce Product Updates (Seconds)',
+        default=30,
+        help='product.update webhooks wait this long in the inbox; further updates of the same '
+             'product received meanwhile are folded into a single re-sync using the latest '
+             'payload. 0 processes every update.'
+    )
+
     enable_product_sync = fields.Boolean(
         string='Auto-sync Products',
         default=True,
@@ -164,7 +193,8 @@ class ZidConnector(models.Model):
     auto_process_webhooks = fields.Boolean(
         string='Auto Process Webhooks',
         default=True,
-        help='Automatically process webhook data immediately instead of queuing'
+        help='Wake the queue worker as soon as a webhook order is queued '
+             'instead of waiting for its next scheduled run'
     )
 
     sync_status_to_zid = fields.Boolean(
@@ -249,6 +279,60 @@ class ZidConnector(models.Model):
         help='Automatically validate delivery/picking when order is processed'
     )
     
+    order_batch_size = fields.Integer(
+        string='Sale Order Batch Size',
+        default=100,
+        help='Number of queued orders materialized together: sale orders and lines are created, '
+             'confirmed, delivered and invoiced in one call per step for the whole batch'
+    )
+    
+    api_rate_limit = fields.Float(
+        string='API Rate Limit (req/s)',
+        default=5.0,
+        help='Maximum Zid API requests per second issued by concurrent fetches. 0 means unlimited.'
+    )
+    
+    prefetch_workers = fields.Integer(
+        string='Prefetch Workers',
+        default=4,
+        help='Parallel requests used to fetch full order details before a queue batch is processed'
+    )
+    
+    queue_max_attempts = fields.Integer(
+        string='Queue Max Attempts',
+        default=5,
+        help='Failed queue lines are retried with exponential backoff and moved to the dead letter '
+             'state after this many attempts. Invalid data is dead-lettered immediately.'
+    )
+    
+    stock_log_retention_days = fields.Integer(
+        string='Keep Stock Logs (Days)',
+        default=30,
+        help='Successful and cancelled stock update logs older than this are deleted. 0 keeps them.'
+    )
+    
+    stock_log_error_retention_days = fields.Integer(
+        string='Keep Failed Stock Logs (Days)',
+        default=90,
+        help='Failed, partial and timed out stock update logs older than this are deleted. 0 keeps them.'
+    )
+    
+    image_fetch_mode = fields.Selection([
+        ('background', 'Background Download'),
+        ('lazy', 'On Demand')
+    ], string='Image Download', default='background', required=True,
+        help='Background: the image stage downloads product images right after each import. '
+             'On Demand: imports only store image URLs; images are downloaded when a product is '
+             'loaded from its form or linked to Odoo, or by the low-priority warm-up job for '
+             'published products.')
+    
+    payload_archive_days = fields.Integer(
+        string='Archive Payloads After (Days)',
+        default=30,
+        help='Raw JSON of imported orders older than this is moved to compressed archive files '
+             'in the filestore and restored on demand. 0 disables order payload archiving.'
+    )
+    
     # Payment Processing Rules
     auto_register_payment = fields.Boolean(
         string='Auto-Register Payment',
@@ -288,6 +372,14 @@ class ZidConnector(models.Model):
         help='Only check orders modified in the last X days for status changes'
     )
     
+    status_sync_watermark = fields.Datetime(
+        string='Status Sync Watermark',
+        readonly=True,
+        copy=False,
+        help='Highest Zid updated_at seen by the order status sync. The next run only lists '
+             'orders updated after this point (minus the order sync overlap).'
+    )
+    
     sync_order_status_on_import = fields.Boolean(
         string='Sync Status During Import',
         default=True,
@@ -570,6 +662,16 @@ class ZidConnector(models.Model):
     def call_proxy_api(self, endpoint, data=None):
         """Helper to call proxy server APIs with license validation"""
         self.ensure_one()
+        url, payload = self._prepare_proxy_request(endpoint, data)
+        return self._send_proxy_request(url, payload)
+
+    def _prepare_proxy_request(self, endpoint, data=None):
+        """Validate the license and build ``(url, JSON-RPC payload)`` for a proxy call.
+
+        This is the only part of a proxy call that touches the database, so the
+        result can be sent from a worker thread with ``_send_proxy_request``.
+        """
+        self.ensure_one()
         
         if not self.license_valid:
             raise UserError(_('Invalid or expired license. Please contact support.'))
@@ -584,24 +686,29 @@ class ZidConnector(models.Model):
             'business_config': self._get_business_config()  # ← Client's settings
         })
         
+        url = f"{self.proxy_url}{endpoint}"
+        
+        # All proxy endpoints use JSON-RPC format (type='json' in Odoo)
+        # Wrap request in JSON-RPC envelope
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': data,
+            'id': 1
+        }
+        return url, payload
+
+    @api.model
+    def _send_proxy_request(self, url, payload):
+        """Post a prepared proxy request and return its result (network only, thread safe)"""
+        data = payload['params']
         try:
-            url = f"{self.proxy_url}{endpoint}"
-            
             _logger.info("=" * 80)
             _logger.info(f"📡 CALLING PROXY API")
             _logger.info(f"🔗 URL: {url}")
             _logger.info(f"📤 Request data: {data}")
             _logger.info("=" * 80)
             
-            # All proxy endpoints use JSON-RPC format (type='json' in Odoo)
-            # Wrap request in JSON-RPC envelope
-            payload = {
-                'jsonrpc': '2.0',
-                'method': 'call',
-                'params': data,
-                'id': 1
-            }
-            
             _logger.info(f"📤 Sending JSON-RPC payload: {payload}")
             
             response = requests.post(
@@ -846,6 +953,35 @@ class ZidConnector(models.Model):
                 if record.proxy_url.endswith('/'):
                     record.proxy_url = record.proxy_url.rstrip('/')
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        connectors = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return connectors
+
+    def write(self, vals):
+        res = super().write(vals)
+        if WEBHOOK_LOOKUP_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('store_id')
+    def _get_webhook_connector(self, store_id):
+        """Return ``(connector id, webhook secret, coalesce window)`` for a Zid store id.
+
+        Cached per worker so webhook deliveries resolve their connector
+        without a query; cleared when a connector is created or deleted, or
+        its store id, secret or active flag changes.
+        """
+        connector = self.sudo().search([('store_id', '=', str(store_id))], limit=1)
+        return connector.id, connector.webhook_secret or None, connector.webhook_coalesce_seconds
+
     def _fetch_store_info(self):
         """Fetch store information from Zid API through PROXY"""
         self.ensure_one()
@@ -1492,11 +1628,53 @@ class ZidConnector(models.Model):
             }
         }
 
+    @api.model
+    def _parse_zid_datetime(self, value):
+        """Parse a Zid timestamp ("2025-12-28 13:41:16" or ISO 8601) into a naive UTC datetime"""
+        if not value:
+            return None
+        if not isinstance(value, datetime):
+            for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ'):
+                try:
+                    return datetime.strptime(str(value), fmt)
+                except ValueError:
+                    continue
+            try:
+                value = datetime.fromisoformat(str(value))
+            except ValueError:
+                return None
+        # Watermarks are naive UTC: convert an explicit offset instead of dropping it
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def _get_order_sync_window_start(self):
+        """Start of the next incremental order import window (watermark minus overlap)"""
+        self.ensure_one()
+        start = self.order_sync_watermark or self.order_import_start_date
+        if not start:
+            return fields.Datetime.now() - timedelta(days=7)
+        return start - timedelta(minutes=max(self.order_sync_overlap_minutes, 0))
 
+    def _get_status_sync_window_start(self):
+        """Start of the next order status sync window (watermark minus overlap)"""
+        self.ensure_one()
+        if not self.status_sync_watermark:
+            return fields.Datetime.now() - timedelta(days=self.status_sync_days_back or 7)
+        return self.status_sync_watermark - timedelta(minutes=max(self.order_sync_overlap_minutes, 0))
 
-
-
-
+    def _advance_order_watermark(self, updated_at, zid_order_id):
+        """Move the order sync watermark forward, never backwards"""
+        self.ensure_one()
+        if not updated_at:
+            return
+        current = (self.order_sync_watermark or datetime.min, self.order_sync_watermark_id or 0)
+        if (updated_at, zid_order_id or 0) > current:
+            self.write({
+                'order_sync_watermark': updated_at,
+                'order_sync_watermark_id': zid_order_id or 0,
+            })
+            _logger.info(f"Order sync watermark for {self.app_name} advanced to {updated_at} (order {zid_order_id})")
 
     def update_last_sync_date(self):
         """Update the last sync date - call this after successful sync operations"""
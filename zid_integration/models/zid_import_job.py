@@ -0,0 +1,198 @@
+import logging
+import time
+
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a single cron run may spend on one job before yielding
+JOB_TIME_BUDGET = 240
+
+
+class ZidImportJob(models.Model):
+    """Server-side, resumable order import.
+
+    The order import wizard only records the import parameters here. The
+    ``cron_zid_import_jobs`` worker then fetches and queues every page,
+    persisting the page cursor after each one, so an import survives browser
+    closes and worker restarts. Progress is pushed to the requesting user
+    through the bus.
+    """
+    _name = 'zid.import.job'
+    _description = 'Zid Import Job'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Name',
+        required=True,
+        readonly=True,
+        default=lambda self: _('Order Import')
+    )
+    zid_connector_id = fields.Many2one(
+        'zid.connector',
+        string='Zid Connector',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        readonly=True,
+        default=lambda self: self.env.user
+    )
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled')
+    ], string='Status', default='queued', required=True, readonly=True, tracking=True, index=True)
+
+    # Import parameters (copied from the wizard)
+    import_mode = fields.Selection(
+        selection=lambda self: self.env['zid.sale.order.connector']._fields['import_mode'].selection,
+        string='Import Mode',
+        required=True,
+        readonly=True
+    )
+    date_from = fields.Datetime(string='Start Sync Date', readonly=True)
+    date_to = fields.Datetime(string='End Sync Date', readonly=True)
+    order_status = fields.Char(string='Order Status', readonly=True)
+    payment_status = fields.Char(string='Payment Status', readonly=True)
+    page_size = fields.Integer(string='Batch Size', default=50, readonly=True)
+    source = fields.Char(string='Source', default='wizard', readonly=True)
+
+    # Resume cursor and progress
+    current_page = fields.Integer(string='Next Page', default=1, readonly=True)
+    total_fetched = fields.Integer(string='Orders Queued', readonly=True)
+    queue_id = fields.Many2one('zid.queue.ept', string='Queue', readonly=True)
+    watermark_updated_at = fields.Datetime(string='Newest Update Seen', readonly=True)
+    watermark_order_id = fields.Integer(string='Newest Order Seen', readonly=True)
+    progress_text = fields.Text(string='Progress', readonly=True)
+    error_message = fields.Text(string='Error Message', readonly=True)
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    finished_at = fields.Datetime(string='Finished At', readonly=True)
+
+    @api.model
+    def cron_run_jobs(self):
+        """Advance queued/running jobs within the time budget, oldest first"""
+        deadline = time.monotonic() + JOB_TIME_BUDGET
+        for job in self.search([('state', 'in', ['queued', 'running'])], order='id'):
+            if time.monotonic() >= deadline:
+                break
+            job._run(deadline)
+
+        if self.search_count([('state', 'in', ['queued', 'running'])]):
+            # More pages left: come back right away instead of waiting for the interval
+            self.env.ref('zid_integration.cron_zid_import_jobs').sudo()._trigger()
+
+    def _run(self, deadline):
+        """Fetch and queue pages until the import is complete or the deadline passes"""
+        self.ensure_one()
+        wizard = self._get_wizard()
+        try:
+            if self.state == 'queued':
+                self.write({'state': 'running', 'started_at': fields.Datetime.now()})
+                self._append_progress(_('Import started'))
+
+            has_more = True
+            while has_more and time.monotonic() < deadline:
+                orders, has_more = wizard._fetch_orders_page(self.current_page)
+                wizard._track_watermark(orders)
+                queued = wizard._enqueue_orders(wizard._filter_orders_to_enqueue(orders))
+
+                self.write({
+                    'current_page': self.current_page + 1,
+                    'total_fetched': self.total_fetched + queued,
+                    'queue_id': wizard.current_queue_id.id,
+                    'watermark_updated_at': wizard.watermark_updated_at,
+                    'watermark_order_id': wizard.watermark_order_id,
+                })
+                self._append_progress(_('Page %d: %d orders queued (total %d)') % (
+                    self.current_page - 1, queued, self.total_fetched))
+                # Cursor and queue lines are committed together
+                self.env.cr.commit()
+                # Pick up a cancellation made from the UI meanwhile
+                self.invalidate_recordset(['state'])
+                if self.state != 'running':
+                    return
+
+            if not has_more:
+                self._finish(wizard)
+
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error(f"Import job {self.id} failed: {str(e)}", exc_info=True)
+            self.write({
+                'state': 'failed',
+                'error_message': str(e),
+                'finished_at': fields.Datetime.now(),
+            })
+            self._notify(_('Order import failed: %s') % str(e), 'danger')
+            self.env.cr.commit()
+
+    def _get_wizard(self):
+        """Transient helper carrying the page mechanics, rebuilt from the persisted cursor"""
+        return self.env['zid.sale.order.connector'].create({
+            'zid_connector_id': self.zid_connector_id.id,
+            'import_mode': self.import_mode,
+            'date_from': self.date_from,
+            'date_to': self.date_to,
+            'order_status': self.order_status or 'all',
+            'payment_status': self.payment_status or 'all',
+            'page_size': self.page_size,
+            'import_source': self.source,
+            'state': 'importing',
+            'current_page': self.current_page,
+            'total_fetched': self.total_fetched,
+            'current_queue_id': self.queue_id.id,
+            'watermark_updated_at': self.watermark_updated_at,
+            'watermark_order_id': self.watermark_order_id,
+        })
+
+    def _finish(self, wizard):
+        """All pages are queued: advance the watermark and hand over to the queue worker"""
+        wizard._advance_connector_watermark()
+        self.write({'state': 'done', 'finished_at': fields.Datetime.now()})
+        self._append_progress(_('All pages fetched, %d orders queued') % self.total_fetched)
+        self.env.cr.commit()
+
+        if self.queue_id:
+            self.env.ref('zid_integration.cron_zid_queue_process').sudo()._trigger()
+        self._notify(_('Order import finished: %d orders queued') % self.total_fetched, 'success')
+
+    def _append_progress(self, text):
+        self.progress_text = (self.progress_text or '') + text + '\n'
+        self._notify_progress()
+
+    def _notify_progress(self):
+        """Push the job's progress to its requester"""
+        if self.user_id:
+            self.env['bus.bus']._sendone(self.user_id.partner_id, 'zid_integration/import_job', {
+                'id': self.id,
+                'state': self.state,
+                'current_page': self.current_page,
+                'total_fetched': self.total_fetched,
+            })
+
+    def _notify(self, message, notification_type):
+        if self.user_id:
+            self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+                'title': self.name,
+                'message': message,
+                'type': notification_type,
+                'sticky': notification_type == 'danger',
+            })
+
+    def action_cancel(self):
+        self.filtered(lambda j: j.state in ('queued', 'running')).write({
+            'state': 'cancelled',
+            'finished_at': fields.Datetime.now(),
+        })
+
+    def action_retry(self):
+        """Resume a failed job from its persisted page"""
+        self.filtered(lambda j: j.state == 'failed').write({'state': 'running', 'error_message': False})
+        self.env.ref('zid_integration.cron_zid_import_jobs').sudo()._trigger()
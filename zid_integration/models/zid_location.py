@@ -247,6 +247,47 @@ class ZidLocation(models.Model):
         else:
             return self.create(vals)
 
+    @api.model
+    def _get_location_map(self, connector_id):
+        """``{zid_location_id: id}`` of every location of the connector, in one query"""
+        locations = self.with_context(active_test=False).search_read(
+            [('zid_connector_id', '=', connector_id)], ['zid_location_id'])
+        return {location['zid_location_id']: location['id'] for location in locations}
+
+    @api.model
+    def _resolve_stock_location(self, location_data, connector_id, location_map):
+        """Id of the location a stock entry points to, created when unknown.
+
+        ``location_map`` comes from ``_get_location_map`` and is kept up to
+        date with the locations created here.
+        """
+        location_id_str = str(location_data.get('id', ''))
+        if not location_id_str:
+            return False
+        if location_id_str in location_map:
+            return location_map[location_id_str]
+
+        location_name = location_data.get('name', {})
+        if isinstance(location_name, dict):
+            name_ar = location_name.get('ar', '')
+            name_en = location_name.get('en', '')
+        else:
+            name_ar = str(location_name) if location_name else 'Unknown Location'
+            name_en = name_ar
+
+        location = self.create({
+            'zid_connector_id': connector_id,
+            'zid_location_id': location_id_str,
+            'name_en': name_en or name_ar or 'Unknown Location',
+            'name_ar': name_ar or name_en or 'Unknown Location',
+            'location_type': location_data.get('type', 'warehouse'),
+            'is_enabled': True,
+            'has_stocks': True,
+        })
+        _logger.info(f"Created new Zid location {location_id_str} - {name_en or name_ar}")
+        location_map[location_id_str] = location.id
+        return location.id
+
     def _prepare_location_values(self, location_data, connector_id):
         """Prepare values from Zid API response"""
         vals = {
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class ZidOrderIdempotency(models.Model):
+    """One row per order version that was ever queued.
+
+    Webhooks, the polling cron and the manual wizard all enqueue orders
+    through ``zid.queue.ept._enqueue_orders``, which claims a key here
+    first, so the same order version never gets a second queue line.
+    """
+    _name = 'zid.order.idempotency'
+    _description = 'Zid Order Idempotency Key'
+    _order = 'id desc'
+
+    zid_connector_id = fields.Many2one(
+        'zid.connector',
+        string='Connector',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    zid_order_id = fields.Integer(
+        string='Zid Order ID',
+        required=True
+    )
+    version_key = fields.Char(
+        string='Version Key',
+        required=True,
+        help='Zid updated_at of the order, or a hash of the payload when it has none'
+    )
+    source = fields.Char(
+        string='Source',
+        help='Path that first queued this version (webhook, cron, wizard)'
+    )
+
+    _sql_constraints = [
+        ('unique_order_version',
+         'UNIQUE(zid_connector_id, zid_order_id, version_key)',
+         'This order version was already queued!')
+    ]
+
+    @api.model
+    def _get_version_key(self, connector, order_data):
+        """updated_at identifies an order version; fall back to a payload hash"""
+        updated_at = connector._parse_zid_datetime(order_data.get('updated_at'))
+        if updated_at:
+            return fields.Datetime.to_string(updated_at)
+        payload = json.dumps(order_data, sort_keys=True, ensure_ascii=False, default=str)
+        return 'sha1:' + hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @api.model
+    def _claim_orders(self, connector, orders, source=None, force=False):
+        """Record keys for ``orders`` and return only those not seen before.
+
+        Uses ``INSERT ... ON CONFLICT DO NOTHING`` so concurrent webhook and
+        cron transactions cannot both claim the same version. With ``force``
+        (an explicit re-import by a user) keys are still recorded but every
+        order is returned.
+        """
+        keyed = {}
+        for order_data in orders:
+            if not order_data.get('id'):
+                continue
+            key = (int(order_data['id']), self._get_version_key(connector, order_data))
+            keyed.setdefault(key, order_data)
+        if not keyed:
+            return []
+
+        self.flush_model()
+        values = [
+            (connector.id, zid_order_id, version_key, source, self.env.uid, self.env.uid)
+            for zid_order_id, version_key in keyed
+        ]
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, now() at time zone \'UTC\', now() at time zone \'UTC\')'] * len(values))
+        self.env.cr.execute(f"""
+            INSERT INTO zid_order_idempotency
+                (zid_connector_id, zid_order_id, version_key, source, create_uid, write_uid, create_date, write_date)
+            VALUES {placeholders}
+            ON CONFLICT (zid_connector_id, zid_order_id, version_key) DO NOTHING
+            RETURNING zid_order_id, version_key
+        """, [value for row in values for value in row])
+        claimed = set(self.env.cr.fetchall())
+        if force:
+            return list(keyed.values())
+
+        skipped = len(keyed) - len(claimed)
+        if skipped:
+            _logger.info(f"Dropped {skipped} already queued order versions for connector {connector.app_name}")
+        return [order_data for key, order_data in keyed.items() if key in claimed]
+
+    @api.model
+    def _cleanup_old_keys(self, days=30):
+        """Forget keys older than ``days`` (their queue lines are archived by then)"""
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), days=days)
+        old_keys = self.search([('create_date', '<', cutoff)])
+        if old_keys:
+            _logger.info(f"Removing {len(old_keys)} order idempotency keys older than {days} days")
+            old_keys.unlink()
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls to at most ``rate`` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            slot = max(self._next_slot, time.monotonic())
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(connector_id, rate):
+    """Process-wide limiter per connector, rebuilt when its rate changes"""
+    with _limiters_lock:
+        limiter = _limiters.get(connector_id)
+        if limiter is None or limiter.interval != (1.0 / rate if rate and rate > 0 else 0.0):
+            limiter = _limiters[connector_id] = RateLimiter(rate)
+        return limiter
+
+
+class ZidOrderPrefetch(models.AbstractModel):
+    """Fetches full order details concurrently, outside of any ORM work.
+
+    Requests are prepared on the calling thread (license check, business
+    config), then only the HTTP calls run in a bounded thread pool, paced by
+    the connector's rate limiter.
+    """
+    _name = 'zid.order.prefetch'
+    _description = 'Zid Order Details Prefetch'
+
+    @api.model
+    def _fetch_order_details(self, connector, order_ids):
+        """Return ``(details, errors)`` dicts keyed by Zid order id"""
+        if not order_ids:
+            return {}, {}
+
+        requests_by_order = {
+            order_id: connector._prepare_proxy_request('/api/zid/request', {
+                'endpoint': f"managers/store/orders/{order_id}/view",
+                'method': 'GET',
+                'data': None,
+                'params': None,
+                'store_id': connector.store_id,
+            })
+            for order_id in order_ids
+        }
+        limiter = get_rate_limiter(connector.id, connector.api_rate_limit)
+        # Threads only post requests; no lang lookup may reach the database
+        sender = connector.with_context(lang=None)
+
+        def fetch(url, payload):
+            limiter.wait()
+            result = sender._send_proxy_request(url, payload)
+            return (result.get('data') or {}).get('order')
+
+        details, errors = {}, {}
+        workers = max(min(connector.prefetch_workers or 1, len(requests_by_order)), 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='zid_prefetch') as pool:
+            futures = {
+                pool.submit(fetch, url, payload): order_id
+                for order_id, (url, payload) in requests_by_order.items()
+            }
+            for future in as_completed(futures):
+                order_id = futures[future]
+                try:
+                    order = future.result()
+                    if order:
+                        details[order_id] = order
+                    else:
+                        errors[order_id] = requests.exceptions.RequestException(
+                            f"No order details returned for order {order_id}")
+                except Exception as e:
+                    errors[order_id] = e
+
+        _logger.info(f"Prefetched details for {len(details)}/{len(order_ids)} orders ({len(errors)} failed)")
+        return details, errors
@@ -0,0 +1,68 @@
+import gzip
+import json
+import logging
+from collections import defaultdict
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+class ZidPayloadArchive(models.AbstractModel):
+    """Cold storage for old queue lines and order payloads.
+
+    Records are written as gzip-compressed JSON Lines attachments (one file
+    per connector, kind and day) in the filestore, so the hot tables can be
+    trimmed while the history stays retrievable. Later batches for the same
+    day are appended to that file as extra gzip members.
+    """
+    _name = 'zid.payload.archive'
+    _description = 'Zid Payload Archive'
+
+    @api.model
+    def _write_partitions(self, kind, entries):
+        """Archive ``(connector, day, payload dict)`` entries.
+
+        Returns ``{(connector id, day): ir.attachment}`` for the written files.
+        """
+        partitions = defaultdict(list)
+        for connector, day, payload in entries:
+            partitions[(connector.id, day)].append(payload)
+
+        attachment_model = self.env['ir.attachment'].sudo()
+        attachments = {}
+        for (connector_id, day), payloads in partitions.items():
+            content = '\n'.join(json.dumps(payload, ensure_ascii=False, default=str) for payload in payloads)
+            member = gzip.compress((content + '\n').encode('utf-8'))
+            name = f'zid_{kind}_{connector_id}_{day}.jsonl.gz'
+
+            attachment = attachment_model.search([
+                ('res_model', '=', 'zid.connector'),
+                ('res_id', '=', connector_id),
+                ('name', '=', name),
+            ], limit=1)
+            if attachment:
+                # gzip readers decompress concatenated members as one stream
+                attachment.raw = (attachment.raw or b'') + member
+            else:
+                attachment = attachment_model.create({
+                    'name': name,
+                    'type': 'binary',
+                    'raw': member,
+                    'mimetype': 'application/gzip',
+                    'res_model': 'zid.connector',
+                    'res_id': connector_id,
+                    'description': f'Archived Zid {kind} payloads for {day}',
+                })
+            attachments[(connector_id, day)] = attachment
+            _logger.info(f"Archived {len(payloads)} {kind} records for connector {connector_id} on {day}")
+        return attachments
+
+    @api.model
+    def _read_partition(self, attachment):
+        """Yield the payload dicts stored in an archive attachment"""
+        if not attachment.raw:
+            return
+        for row in gzip.decompress(attachment.raw).decode('utf-8').splitlines():
+            if row:
+                yield json.loads(row)
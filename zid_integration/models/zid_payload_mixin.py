@@ -0,0 +1,72 @@
+import base64
+import json
+import logging
+import zlib
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+def compress_payload(text):
+    """Compact and compress a JSON (or plain text) payload for blob storage.
+
+    Valid JSON is re-serialized without indentation before compression.
+    Returns base64-encoded zlib data, the storage convention of binary fields.
+    """
+    if not text:
+        return False
+    if isinstance(text, (dict, list)):
+        text = json.dumps(text, ensure_ascii=False, separators=(',', ':'))
+    else:
+        try:
+            text = json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            text = str(text)
+    return base64.b64encode(zlib.compress(text.encode('utf-8'), 6))
+
+
+def decompress_payload(blob):
+    """Inverse of :func:`compress_payload`; returns the payload text or False"""
+    if not blob:
+        return False
+    if isinstance(blob, str):
+        blob = blob.encode()
+    return zlib.decompress(base64.b64decode(blob)).decode('utf-8')
+
+
+class ZidPayloadMixin(models.AbstractModel):
+    """Stores large JSON payloads as compressed blobs.
+
+    Inheriting models declare the blob columns as
+    ``fields.Binary(attachment=False, prefetch=False)`` and expose the
+    original Text field names as non-stored fields using
+    ``_compute_payloads`` / ``_inverse_payloads``, listing the pairs in
+    ``_payload_fields`` (``{text field: blob field}``). Existing code keeps
+    reading and writing plain JSON strings, while list views and default
+    prefetch never load the payload columns.
+    """
+    _name = 'zid.payload.mixin'
+    _description = 'Zid Compressed Payload Mixin'
+
+    _payload_fields = {}
+
+    @api.depends(lambda self: tuple(self._payload_fields.values()))
+    def _compute_payloads(self):
+        for record in self:
+            for text_field, blob_field in record._payload_fields.items():
+                try:
+                    record[text_field] = decompress_payload(record[blob_field])
+                except (ValueError, zlib.error) as e:
+                    _logger.warning(f"Could not decode payload {record._name}.{blob_field} for record {record.id}: {str(e)}")
+                    record[text_field] = False
+
+    def _inverse_payloads(self):
+        for record in self:
+            vals = {}
+            for text_field, blob_field in record._payload_fields.items():
+                # Only payloads present in cache can have been assigned
+                if self.env.cache.contains(record, record._fields[text_field]):
+                    vals[blob_field] = compress_payload(record[text_field])
+            if vals:
+                record.write(vals)
@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+import base64
 import json
 import logging
 
@@ -8,8 +9,9 @@ _logger = logging.getLogger(__name__)
 
 class ZidProduct(models.Model):
     _name = 'zid.product'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'zid.payload.mixin']
     _description = 'Zid Product'
+    _payload_fields = {'images_data': 'images_data_blob', 'categories_data': 'categories_data_blob'}
     _rec_name = 'name'
     _order = 'sequence, name'
 
@@ -217,11 +219,40 @@ class ZidProduct(models.Model):
         store=True
     )
 
+    # Rows created before the image stage existed already hold their image
+    main_image_state = fields.Selection([
+        ('pending', 'Pending Download'),
+        ('done', 'Downloaded'),
+        ('failed', 'Failed')
+    ], string='Main Image Status', default='done', required=True, readonly=True, index=True)
+
+    main_image_attempts = fields.Integer(
+        string='Main Image Download Attempts',
+        readonly=True,
+        copy=False
+    )
+
+    main_image_next_fetch_at = fields.Datetime(
+        string='Next Main Image Download',
+        readonly=True,
+        copy=False,
+        help='A failed main image download is retried by the image stage after this time'
+    )
+
     images_data = fields.Text(
         string='Images JSON Data',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         readonly=True
     )
 
+    images_data_blob = fields.Binary(
+        string='Images JSON Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+
     zid_image_ids = fields.One2many(
         'zid.product.image',
         'product_id',
@@ -231,9 +262,18 @@ class ZidProduct(models.Model):
     # Categories
     categories_data = fields.Text(
         string='Categories JSON Data',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         readonly=True
     )
 
+    categories_data_blob = fields.Binary(
+        string='Categories JSON Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+
     zid_category_ids = fields.Many2many(
         'zid.product.category',
         string='Zid Categories',
@@ -426,6 +466,11 @@ class ZidProduct(models.Model):
         compute='_compute_display_name',
         store=True
     )
+    has_pending_images = fields.Boolean(
+        string='Has Pending Images',
+        compute='_compute_has_pending_images',
+        help='The main image or a gallery or variant image is not downloaded yet'
+    )
 
     @api.depends('name', 'sku')
     def _compute_display_name(self):
@@ -434,125 +479,182 @@ class ZidProduct(models.Model):
                 product.display_name = f"[{product.sku}] {product.name}"
             else:
                 product.display_name = product.name or ''
-    
+
+    @api.depends('main_image_state', 'zid_image_ids.state')
+    def _compute_has_pending_images(self):
+        # Variant images hang off the variants, look them up in one query
+        variant_pending = set(self.env['zid.product.image'].search([
+            ('state', '!=', 'done'),
+            ('variant_id.parent_product_id', 'in', self.ids),
+        ]).variant_id.parent_product_id.ids) if self.ids else set()
+        for product in self:
+            product.has_pending_images = (
+                product.main_image_state != 'done'
+                or any(image.state != 'done' for image in product.zid_image_ids)
+                or product.id in variant_pending
+            )
+
     def _update_location_lines(self, product_data):
         """Update location lines from stocks data in API response"""
         self.ensure_one()
-        
-        # Get stocks data from API response
-        stocks = product_data.get('stocks', [])
-        
-        if not stocks:
-            _logger.info(f"No stocks data for product {self.zid_product_id}")
-            # return  # Don't return, as we might need to update categories even if no stock data
-        
-        # Only process location lines if we have stock data
-        if stocks:
-            # Delete existing location lines
-            self.zid_location_ids.unlink()
-        
-        location_line_model = self.env['zid.location.line']
-        zid_location_model = self.env['zid.location']
-        
-        for stock in stocks:
-            if not isinstance(stock, dict):
-                continue
-                
-            # Get location data
-            location_data = stock.get('location', {})
-            if not location_data or not isinstance(location_data, dict):
-                continue
-                
-            location_id_str = str(location_data.get('id', ''))
-            if not location_id_str:
+        self._sync_location_lines([(self, product_data)])
+
+    @api.model
+    def _sync_location_lines(self, products_data):
+        """Diff location lines against the stocks of each ``(product, product_data)``.
+
+        Lines are keyed by (product, location): changed quantities are
+        written, new locations inserted and vanished ones deleted, each in
+        bulk. Products whose payload has no stocks keep their lines. The
+        location ids of each connector are loaded once per call.
+        """
+        line_model = self.env['zid.location.line']
+        wanted, products = self._collect_location_lines(products_data)
+        if not products:
+            return
+
+        obsolete = line_model
+        updated = 0
+        for line in line_model.search([('product_id', 'in', products.ids)]):
+            vals = wanted.pop((line.product_id.id, line.location_id.id), None)
+            if vals is None:
+                obsolete |= line
+            elif any(line[name] != value for name, value in vals.items()):
+                line.write(vals)
+                updated += 1
+
+        obsolete.unlink()
+        if wanted:
+            line_model.create([
+                {'product_id': product_id, 'location_id': location_id, **vals}
+                for (product_id, location_id), vals in wanted.items()
+            ])
+
+        _logger.info(f"Location lines of {len(products)} products: {len(wanted)} created, "
+                     f"{updated} updated, {len(obsolete)} deleted")
+
+    @api.model
+    def _collect_location_lines(self, products_data):
+        """Line values keyed by (product id, location id) from the stocks payloads.
+
+        Returns ``(wanted, products)`` where ``products`` holds only the
+        products whose payload carries stocks.
+        """
+        location_model = self.env['zid.location']
+        location_maps = {}
+        wanted = {}
+        products = self.browse()
+
+        for product, product_data in products_data:
+            stocks = product_data.get('stocks') or []
+            if not stocks:
+                _logger.info(f"No stocks data for product {product.zid_product_id}")
                 continue
-            
-            # Find or create the Zid location
-            zid_location = zid_location_model.search([
-                ('zid_location_id', '=', location_id_str),
-                ('zid_connector_id', '=', self.zid_connector_id.id)
-            ], limit=1)
-            
-            if not zid_location:
-                # Create new location if it doesn't exist
-                location_name = location_data.get('name', {})
-                if isinstance(location_name, dict):
-                    name_ar = location_name.get('ar', '')
-                    name_en = location_name.get('en', '')
-                else:
-                    name_ar = str(location_name) if location_name else 'Unknown Location'
-                    name_en = name_ar
-                
-                zid_location = zid_location_model.create({
-                    'zid_connector_id': self.zid_connector_id.id,
-                    'zid_location_id': location_id_str,
-                    'name_en': name_en or name_ar or 'Unknown Location',
-                    'name_ar': name_ar or name_en or 'Unknown Location',
-                    'location_type': location_data.get('type', 'warehouse'),
-                    'is_enabled': True,
-                    'has_stocks': True,
-                })
-                _logger.info(f"Created new Zid location {location_id_str} - {name_en or name_ar}")
-            
-            # Create location line
-            line_vals = {
-                'product_id': self.id,
-                'location_id': zid_location.id,
-                'stock_id': str(stock.get('id', '')),
-                'quantity': float(stock.get('available_quantity', 0) or 0),
-                'is_infinite': stock.get('is_infinite', False),
-            }
-            
-            location_line = location_line_model.create(line_vals)
-            _logger.info(f"Created location line for product {self.zid_product_id} at location {zid_location.display_name}: {line_vals['quantity']} units")
-        
-        _logger.info(f"Updated {len(self.zid_location_ids)} location lines for product {self.zid_product_id}")
+
+            products |= product
+            connector_id = product.zid_connector_id.id
+            if connector_id not in location_maps:
+                location_maps[connector_id] = location_model._get_location_map(connector_id)
+
+            for stock in stocks:
+                if not isinstance(stock, dict):
+                    continue
+                location_data = stock.get('location', {})
+                if not location_data or not isinstance(location_data, dict):
+                    continue
+
+                location_id = location_model._resolve_stock_location(
+                    location_data, connector_id, location_maps[connector_id])
+                if not location_id:
+                    continue
+
+                wanted[(product.id, location_id)] = {
+                    'stock_id': str(stock.get('id') or '') or False,
+                    'quantity': float(stock.get('available_quantity', 0) or 0),
+                    'is_infinite': bool(stock.get('is_infinite', False)),
+                }
+
+        return wanted, products
 
     def _update_gallery_images(self, product_data):
-        """Update gallery images from API response"""
+        """Update gallery images from API response; files are downloaded by the image stage"""
         self.ensure_one()
-        images = product_data.get('images', [])
-        if not images:
-            return
+        self.env['zid.product.image']._sync_gallery('product_id', self, product_data.get('images', []))
 
-        # Keep track of existing image IDs to avoid duplicates
-        existing_zid_ids = self.zid_image_ids.mapped('zid_image_id')
-        
-        # Sort images by display order
-        images = sorted(images, key=lambda x: x.get('display_order', 0))
+    def _prepare_main_image_values(self, main_image_url, connector):
+        """Main image values for ``main_image_url``; the file is downloaded by the image stage.
 
-        image_model = self.env['zid.product.image']
-        import requests
-        import base64
+        Called on the existing row, if any, so a downloaded image whose URL is
+        unchanged is not fetched again. The previous image stays in place
+        until its replacement is downloaded.
+        """
+        if not main_image_url:
+            return {'main_image_url': False, 'main_image': False, 'main_image_state': 'done'}
+        if len(self) == 1 and self.main_image_url == main_image_url and self.main_image_state == 'done':
+            return {'main_image_url': main_image_url}
 
-        for img_data in images:
-            zid_img_id = str(img_data.get('id', ''))
-            if not zid_img_id or zid_img_id in existing_zid_ids:
+        self.env['zid.product.image']._schedule_fetch(connector)
+        return {
+            'main_image_url': main_image_url,
+            'main_image_state': 'pending',
+            'main_image_attempts': 0,
+            'main_image_next_fetch_at': False,
+        }
+
+    def _fetch_main_images(self):
+        """Download the main images, once per distinct URL"""
+        by_url = self.filtered('main_image_url').grouped('main_image_url')
+        downloads = self.env['zid.product.image']._download_urls(list(by_url))
+        for url, products in by_url.items():
+            content, error = downloads[url]
+            if error:
+                products._mark_main_image_failed()
                 continue
+            # An undecodable or oversized image fails its URL, not the whole batch
+            try:
+                with self.env.cr.savepoint():
+                    products.write({
+                        'main_image': base64.b64encode(content),
+                        'main_image_state': 'done',
+                        'main_image_attempts': 0,
+                        'main_image_next_fetch_at': False,
+                    })
+            except Exception as e:
+                _logger.warning(f"Could not store main image {url}: {str(e)}")
+                products._mark_main_image_failed()
+        self.filtered(lambda p: not p.main_image_url).main_image_state = 'done'
+
+    def _mark_main_image_failed(self):
+        """Record a failed main image download; the image stage retries it with backoff"""
+        Image = self.env['zid.product.image']
+        for attempts, products in self.grouped(lambda p: p.main_image_attempts + 1).items():
+            products.write({
+                'main_image_state': 'failed',
+                'main_image_attempts': attempts,
+                'main_image_next_fetch_at': Image._get_next_fetch_at(attempts),
+            })
 
-            # Get URL
-            image_obj = img_data.get('image', {})
-            img_url = ''
-            if isinstance(image_obj, dict):
-                img_url = image_obj.get('full_size') or image_obj.get('large') or image_obj.get('medium')
-            
-            if not img_url:
-                img_url = img_data.get('url', '') or img_data.get('thumbnail', '')
-
-            if img_url:
-                try:
-                    response = requests.get(img_url, timeout=10)
-                    if response.status_code == 200:
-                        image_binary = base64.b64encode(response.content)
-                        image_model.create({
-                            'product_id': self.id,
-                            'zid_image_id': zid_img_id,
-                            'image': image_binary,
-                            'image_url': img_url,
-                            'sequence': img_data.get('display_order', 10)
-                        })
-                except Exception as e:
-                    _logger.warning(f"Failed to download gallery image {zid_img_id}: {str(e)}")
+    def _fetch_pending_images(self):
+        """Download the images these products still miss (Load Images button, linking)"""
+        self.filtered(lambda p: p.main_image_state != 'done')._fetch_main_images()
+        self.env['zid.product.image'].search([
+            ('state', '!=', 'done'),
+            '|', ('product_id', 'in', self.ids), ('variant_id.parent_product_id', 'in', self.ids),
+        ])._fetch()
+
+    def action_load_images(self):
+        """Download missing images now instead of waiting for the image stage"""
+        self._fetch_pending_images()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Product Images'),
+                'message': _('Images loaded for %d products') % len(self),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
 
     _sql_constraints = [
         ('unique_zid_product',
@@ -582,8 +684,8 @@ class ZidProduct(models.Model):
                     ('zid_connector_id', '=', connector_id)
                 ], limit=1)
 
-                # Prepare values
-                values = self._prepare_product_values(product_data, connector_id)
+                # Prepare values against the existing row so an unchanged image is kept
+                values = existing._prepare_product_values(product_data, connector_id)
 
                 if existing:
                     existing.write(values)
@@ -638,8 +740,12 @@ class ZidProduct(models.Model):
             return False
 
     @api.model
-    def _prepare_product_values(self, product_data, connector_id):
-        """Prepare product values from Zid API response"""
+    def _prepare_product_values(self, product_data, connector_id, category_map=None):
+        """Prepare product values from Zid API response.
+
+        ``category_map`` (see ``_get_category_map``) saves a category lookup
+        per product when a whole page is prepared.
+        """
 
         # Get name translations
         name_data = product_data.get('name', {})
@@ -744,18 +850,7 @@ class ZidProduct(models.Model):
                 # Fallback to direct url/thumbnail
                 if not main_image_url:
                     main_image_url = first_image.get('url', '') or first_image.get('thumbnail', '')
-        
-        # Download image if URL exists
-        main_image_binary = False
-        if main_image_url:
-            try:
-                import requests
-                import base64
-                response = requests.get(main_image_url, timeout=10)
-                if response.status_code == 200:
-                    main_image_binary = base64.b64encode(response.content)
-            except Exception as e:
-                _logger.warning(f"Failed to download image from {main_image_url}: {str(e)}")
+
 
         # Get product class - handle None/null values
         product_class = product_data.get('product_class')
@@ -811,13 +906,12 @@ class ZidProduct(models.Model):
 
             # URLs
             'html_url': product_data.get('html_url', ''),
-            'main_image_url': main_image_url,
-            'main_image': main_image_binary,
+            **self._prepare_main_image_values(main_image_url, self.env['zid.connector'].browse(connector_id)),
 
             # JSON Data Storage
             'images_data': json.dumps(product_data.get('images', []), ensure_ascii=False),
             'categories_data': json.dumps(product_data.get('categories', []), ensure_ascii=False),
-            'zid_category_ids': self._get_category_ids(product_data.get('categories', []), connector_id),
+            'zid_category_ids': self._get_category_ids(product_data.get('categories', []), connector_id, category_map),
             'attributes_data': json.dumps(product_data.get('attributes', []), ensure_ascii=False),
             'keywords_data': json.dumps(product_data.get('keywords', []), ensure_ascii=False),
             'group_products_data': json.dumps(product_data.get('group_products', []), ensure_ascii=False),
@@ -888,13 +982,15 @@ class ZidProduct(models.Model):
             'target': 'new',
         }
 
-    def _get_category_ids(self, categories_data, connector_id):
+    def _get_category_ids(self, categories_data, connector_id, category_map=None):
         """Resolve Zid category IDs to Odoo records"""
         if not categories_data:
             return False
             
         category_obj = self.env['zid.product.category']
         category_ids = []
+        if category_map is None:
+            category_map = {}
         
         for cat_data in categories_data:
             if not isinstance(cat_data, dict):
@@ -904,24 +1000,48 @@ class ZidProduct(models.Model):
             if not zid_cat_id:
                 continue
                 
-            # Find existing category
-            category = category_obj.search([
-                ('zid_category_id', '=', zid_cat_id),
-                ('zid_connector_id', '=', connector_id)
-            ], limit=1)
-            
-            # If not found, create it recursively
-            if not category:
-                category = category_obj.create_or_update_from_zid(cat_data, connector_id)
+            if zid_cat_id not in category_map:
+                # Find existing category
+                category = category_obj.search([
+                    ('zid_category_id', '=', zid_cat_id),
+                    ('zid_connector_id', '=', connector_id)
+                ], limit=1)
+
+                # If not found, create it recursively
+                if not category:
+                    category = category_obj.create_or_update_from_zid(cat_data, connector_id)
+                category_map[zid_cat_id] = category.id if category else False
                 
-            if category:
-                category_ids.append(category.id)
+            if category_map[zid_cat_id]:
+                category_ids.append(category_map[zid_cat_id])
                 
         return [(6, 0, category_ids)]
 
+    @api.model
+    def _get_category_map(self, products_data, connector_id):
+        """``{zid_category_id: id}`` of the categories referenced by a page, in one query"""
+        zid_cat_ids = {
+            str(cat_data['id'])
+            for product_data in products_data
+            for cat_data in product_data.get('categories') or []
+            if isinstance(cat_data, dict) and cat_data.get('id')
+        }
+        if not zid_cat_ids:
+            return {}
+
+        category_map = {}
+        for category in self.env['zid.product.category'].search([
+            ('zid_category_id', 'in', list(zid_cat_ids)),
+            ('zid_connector_id', '=', connector_id)
+        ]):
+            category_map.setdefault(category.zid_category_id, category.id)
+        return category_map
+
     def create_or_update_odoo_product(self):
         """Create or update Odoo product from Zid product data"""
         self.ensure_one()
+        # Images of on-demand connectors are fetched when first needed
+        self._fetch_pending_images()
 
         product_template = self.env['product.template']
         product_product = self.env['product.product']
@@ -1148,7 +1268,8 @@ class ZidProduct(models.Model):
             
             # Simple sync: if Odoo has no images, add them all
             if not existing_odoo:
-                for zid_img in self.zid_image_ids:
+                # Images still waiting for the image stage are added on a later sync
+                for zid_img in self.zid_image_ids.filtered('image'):
                     odoo_image_model.create({
                         'name': f"{template.name} - Image {zid_img.sequence}",
                         'image_1920': zid_img.image,
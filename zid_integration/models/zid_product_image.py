@@ -1,4 +1,30 @@
-from odoo import models, fields, api, _
+import base64
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import requests
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Parallel downloads per batch and per-request timeout (seconds)
+IMAGE_FETCH_WORKERS = 8
+IMAGE_FETCH_TIMEOUT = 10
+# Images handled per committed batch, and seconds a cron run may take
+IMAGE_FETCH_BATCH_SIZE = 100
+IMAGE_FETCH_TIME_BUDGET = 240
+# Seconds the low-priority warm-up of on-demand connectors may take per run
+IMAGE_WARM_UP_TIME_BUDGET = 120
+# Failed downloads are retried IMAGE_RETRY_BASE_SECONDS * 2 ** (attempt - 1) later, capped,
+# until IMAGE_FETCH_MAX_ATTEMPTS; after that only a new URL or Load Images tries again
+IMAGE_FETCH_MAX_ATTEMPTS = 5
+IMAGE_RETRY_BASE_SECONDS = 5 * 60
+IMAGE_RETRY_MAX_SECONDS = 6 * 60 * 60
+
 
 class ZidProductImage(models.Model):
     _name = 'zid.product.image'
@@ -29,16 +55,272 @@ class ZidProductImage(models.Model):
     )
 
     image = fields.Image(
-        string='Image',
-        required=True
+        string='Image'
     )
 
     image_url = fields.Char(
         string='Image URL',
+        readonly=True,
+        index=True
+    )
+
+    # Rows created before the image stage existed already hold their image
+    state = fields.Selection([
+        ('pending', 'Pending Download'),
+        ('done', 'Downloaded'),
+        ('failed', 'Failed')
+    ], string='Status', default='done', required=True, readonly=True, index=True)
+
+    checksum = fields.Char(
+        string='Content Checksum',
+        readonly=True,
+        help='SHA-1 of the downloaded file; identical files share one filestore entry'
+    )
+
+    fetch_error = fields.Char(
+        string='Download Error',
         readonly=True
     )
 
+    fetch_attempts = fields.Integer(
+        string='Download Attempts',
+        readonly=True,
+        copy=False
+    )
+
+    next_fetch_at = fields.Datetime(
+        string='Next Download Attempt',
+        readonly=True,
+        copy=False,
+        help='A failed download is retried by the image stage after this time'
+    )
+
     sequence = fields.Integer(
         string='Sequence',
         default=10
     )
+
+    @api.model
+    def _extract_image_url(self, img_data):
+        """Best URL of a Zid image entry: full size first, then smaller renditions"""
+        image_obj = img_data.get('image', {})
+        img_url = ''
+        if isinstance(image_obj, dict):
+            img_url = image_obj.get('full_size') or image_obj.get('large') or image_obj.get('medium')
+        return img_url or img_data.get('url', '') or img_data.get('thumbnail', '')
+
+    @api.model
+    def _sync_gallery(self, owner_field, owner, images):
+        """Record the gallery of a product or variant without downloading anything"""
+        self._sync_galleries(owner_field, [(owner, images)])
+
+    @api.model
+    def _sync_galleries(self, owner_field, galleries):
+        """Record several galleries at once; ``galleries`` is a list of ``(owner, images)``.
+
+        New images are created as pending; an image whose URL changed, or
+        whose last download failed, is reset to pending. Downloaded images
+        with an unchanged URL are left alone. The files are
+        fetched later by ``cron_fetch_images``, outside the upsert transaction.
+        """
+        vals_list = []
+        changed = self.browse()
+        connectors = self.env['zid.connector']
+
+        for owner, images in galleries:
+            # Entries without a Zid id are matched on their URL
+            existing = {image.zid_image_id or image.image_url: image for image in owner.zid_image_ids}
+            owner_changed = False
+
+            for img_data in sorted(images or [], key=lambda x: x.get('display_order', 0)):
+                zid_img_id = str(img_data.get('id') or '')
+                img_url = self._extract_image_url(img_data)
+                if not img_url:
+                    continue
+
+                key = zid_img_id or img_url
+                if key in existing:
+                    image = existing[key]
+                    if image and (image.image_url != img_url or image.state == 'failed'):
+                        changed |= image
+                        owner_changed = True
+                        image.image_url = img_url
+                    continue
+
+                # Placeholder so a repeated entry in the same payload is not created twice
+                existing[key] = self.browse()
+                owner_changed = True
+                vals_list.append({
+                    owner_field: owner.id,
+                    'zid_image_id': zid_img_id or False,
+                    'image_url': img_url,
+                    'state': 'pending',
+                    'sequence': img_data.get('display_order', 10),
+                })
+
+            if owner_changed:
+                connectors |= owner.zid_connector_id
+
+        if changed:
+            changed.write({'state': 'pending', 'fetch_error': False, 'fetch_attempts': 0, 'next_fetch_at': False})
+        if vals_list:
+            self.create(vals_list)
+        for connector in connectors:
+            self._schedule_fetch(connector)
+
+    @api.model
+    def _schedule_fetch(self, connector):
+        """Wake the image stage unless ``connector`` downloads images on demand"""
+        if connector.image_fetch_mode != 'lazy':
+            self._trigger_fetch()
+
+    @api.model
+    def _trigger_fetch(self):
+        """Wake the image stage once per transaction"""
+        precommit_data = self.env.cr.precommit.data
+        if not precommit_data.get('zid_image_fetch_triggered'):
+            precommit_data['zid_image_fetch_triggered'] = True
+            self.env.ref('zid_integration.cron_zid_image_fetch').sudo()._trigger()
+
+    @api.model
+    def cron_fetch_images(self, batch_size=IMAGE_FETCH_BATCH_SIZE):
+        """Download pending images of background-mode connectors within the time budget"""
+        owners = [('zid_connector_id.image_fetch_mode', '!=', 'lazy')]
+        deadline = time.monotonic() + IMAGE_FETCH_TIME_BUDGET
+        if not self._fetch_pending(owners, deadline, batch_size):
+            # Out of time with images left: continue right away
+            self.env.ref('zid_integration.cron_zid_image_fetch').sudo()._trigger()
+
+    @api.model
+    def cron_warm_up_images(self, batch_size=IMAGE_FETCH_BATCH_SIZE):
+        """Fill images of published products of on-demand connectors, a budget at a time.
+
+        Drafts and unpublished products are left for their first access.
+        """
+        owners = [
+            ('zid_connector_id.image_fetch_mode', '=', 'lazy'),
+            ('is_published', '=', True),
+            ('is_draft', '=', False),
+        ]
+        deadline = time.monotonic() + IMAGE_WARM_UP_TIME_BUDGET
+        self._fetch_pending(owners, deadline, batch_size)
+
+    @api.model
+    def _fetch_pending(self, owner_domain, deadline, batch_size):
+        """Download pending main and gallery images of owners matching ``owner_domain``.
+
+        ``owner_domain`` applies to products and variants alike. Failed images
+        whose backoff expired are retried along with the pending ones. Each
+        batch is committed; returns False when the deadline passed with
+        images left.
+        """
+        stages = (
+            (self.env['zid.product'], self._get_fetchable_domain(
+                'main_image_state', 'main_image_attempts', 'main_image_next_fetch_at') + owner_domain,
+             '_fetch_main_images'),
+            (self, self._get_fetchable_domain('state', 'fetch_attempts', 'next_fetch_at') + [
+                '|', ('product_id', 'any', owner_domain), ('variant_id', 'any', owner_domain),
+            ], '_fetch'),
+        )
+        for model, domain, fetch in stages:
+            while True:
+                records = model.search(domain, order='id', limit=batch_size)
+                if not records:
+                    break
+                if time.monotonic() >= deadline:
+                    return False
+                getattr(records, fetch)()
+                self.env.cr.commit()
+        return True
+
+    @api.model
+    def _get_fetchable_domain(self, state_field, attempts_field, next_field):
+        """Pending images, and failed ones under the attempt cap whose backoff expired"""
+        return [
+            '|',
+            (state_field, '=', 'pending'),
+            '&', '&',
+            (state_field, '=', 'failed'),
+            (attempts_field, '<', IMAGE_FETCH_MAX_ATTEMPTS),
+            (next_field, '<=', fields.Datetime.now()),
+        ]
+
+    @api.model
+    def _get_next_fetch_at(self, attempts):
+        """When to retry a download that failed ``attempts`` times; False once the cap is reached"""
+        if attempts >= IMAGE_FETCH_MAX_ATTEMPTS:
+            return False
+        delay = min(IMAGE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), IMAGE_RETRY_MAX_SECONDS)
+        return fields.Datetime.now() + timedelta(seconds=delay)
+
+    def _mark_fetch_failed(self, error):
+        for attempts, images in self.grouped(lambda i: i.fetch_attempts + 1).items():
+            images.write({
+                'state': 'failed',
+                'fetch_error': error,
+                'fetch_attempts': attempts,
+                'next_fetch_at': self._get_next_fetch_at(attempts),
+            })
+
+    def _fetch(self):
+        """Fill the batch: one download per distinct URL, none for URLs already stored"""
+        by_url = self.grouped('image_url')
+
+        # Images shared by several products or variants are downloaded once
+        stored = {}
+        for image in self.search([
+            ('image_url', 'in', list(by_url)),
+            ('state', '=', 'done'),
+            ('id', 'not in', self.ids),
+        ]):
+            stored.setdefault(image.image_url, image)
+
+        downloads = self._download_urls([url for url in by_url if url not in stored])
+
+        for url, images in by_url.items():
+            if url in stored:
+                source = stored[url]
+                vals = {'image': source.image, 'checksum': source.checksum}
+            else:
+                content, error = downloads[url]
+                if error:
+                    images._mark_fetch_failed(error)
+                    continue
+                # The filestore is content-addressed: identical bytes end up in one file
+                vals = {'image': base64.b64encode(content), 'checksum': hashlib.sha1(content).hexdigest()}
+
+            # An undecodable or oversized image fails its URL, not the whole batch
+            try:
+                with self.env.cr.savepoint():
+                    images.write(dict(vals, state='done', fetch_error=False, fetch_attempts=0, next_fetch_at=False))
+            except Exception as e:
+                _logger.warning(f"Could not store image {url}: {str(e)}")
+                images._mark_fetch_failed(str(e))
+
+        _logger.info(f"Image stage: {len(self)} images, {len(downloads)} downloads, {len(by_url) - len(downloads)} reused")
+
+    @api.model
+    def _download_urls(self, urls):
+        """Fetch ``urls`` on a bounded thread pool; returns ``{url: (content, error)}``.
+
+        Threads only perform HTTP requests, never ORM calls.
+        """
+        if not urls:
+            return {}
+
+        def download(url):
+            response = requests.get(url, timeout=IMAGE_FETCH_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_WORKERS, len(urls)), thread_name_prefix='zid_image') as pool:
+            futures = {pool.submit(download, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = (future.result(), None)
+                except Exception as e:
+                    _logger.warning(f"Failed to download image {url}: {str(e)}")
+                    results[url] = (None, str(e))
+        return results
@@ -1,4 +1,18 @@
+from collections import defaultdict
+
 from odoo import models, fields, api, _
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Relative share of each worker run given to a priority lane while it has work
+LANE_WEIGHTS = {
+    'realtime': 6,
+    'normal': 3,
+    'backfill': 1,
+}
+
 
 class ZidQueueEpt(models.Model):
     _name = 'zid.queue.ept'
@@ -16,57 +30,112 @@ class ZidQueueEpt(models.Model):
         ('customer', 'Customer')
     ], string='Type', required=True, default='order')
     
+    priority = fields.Selection([
+        ('realtime', 'Realtime'),
+        ('normal', 'Normal'),
+        ('backfill', 'Backfill')
+    ], string='Priority', required=True, default='normal', index=True,
+        help='Realtime queues (webhooks) get the largest share of each worker run, '
+             'historical backfills the smallest')
+    
     state = fields.Selection([
         ('draft', 'Draft'),
         ('partial', 'Partially Done'),
         ('done', 'Done'),
         ('failed', 'Failed')
-    ], string='Status', default='draft', tracking=True, compute='_compute_state', store=True)
+    ], string='Status', default='draft', tracking=True, compute='_compute_counts', store=True)
     
     line_ids = fields.One2many('zid.queue.line.ept', 'queue_id', string='Queue Lines')
     
-    total_count = fields.Integer(string='Total', compute='_compute_counts')
-    draft_count = fields.Integer(string='Draft', compute='_compute_counts')
-    done_count = fields.Integer(string='Done', compute='_compute_counts')
-    failed_count = fields.Integer(string='Failed', compute='_compute_counts')
+    total_count = fields.Integer(string='Total', compute='_compute_counts', store=True)
+    draft_count = fields.Integer(string='Draft', compute='_compute_counts', store=True)
+    done_count = fields.Integer(string='Done', compute='_compute_counts', store=True)
+    failed_count = fields.Integer(string='Failed', compute='_compute_counts', store=True)
+    dead_count = fields.Integer(string='Dead Letter', compute='_compute_counts', store=True)
     
     @api.depends('line_ids.state')
-    def _compute_state(self):
+    def _compute_counts(self):
+        """Counts and state from one grouped query instead of loading every line"""
+        counts = defaultdict(dict)
+        queue_ids = [qid for qid in self._origin.ids if qid]
+        if queue_ids:
+            groups = self.env['zid.queue.line.ept']._read_group(
+                [('queue_id', 'in', queue_ids)],
+                ['queue_id', 'state'],
+                ['__count'],
+            )
+            for queue, state, count in groups:
+                counts[queue.id][state] = count
+
         for queue in self:
-            if not queue.line_ids:
+            by_state = counts.get(queue._origin.id, {})
+            total = sum(by_state.values())
+            done = by_state.get('done', 0)
+            failed = by_state.get('failed', 0)
+            dead = by_state.get('dead', 0)
+
+            queue.total_count = total
+            queue.draft_count = by_state.get('draft', 0)
+            queue.done_count = done
+            queue.failed_count = failed
+            queue.dead_count = dead
+
+            if not total:
                 queue.state = 'draft'
-                continue
-                
-            states = queue.line_ids.mapped('state')
-            if all(s == 'done' for s in states):
+            elif done == total:
                 queue.state = 'done'
-            elif all(s == 'failed' for s in states):
+            elif failed + dead == total:
                 queue.state = 'failed'
-            elif any(s == 'done' for s in states):
+            elif done:
                 queue.state = 'partial'
             else:
                 queue.state = 'draft'
 
-    @api.depends('line_ids.state')
-    def _compute_counts(self):
-        for queue in self:
-            queue.total_count = len(queue.line_ids)
-            queue.draft_count = len(queue.line_ids.filtered(lambda l: l.state == 'draft'))
-            queue.done_count = len(queue.line_ids.filtered(lambda l: l.state == 'done'))
-            queue.failed_count = len(queue.line_ids.filtered(lambda l: l.state == 'failed'))
-
     @api.model
     def create(self, vals):
         if vals.get('name', _('New')) == _('New'):
             vals['name'] = self.env['ir.sequence'].next_by_code('zid.queue.ept') or _('New')
         return super(ZidQueueEpt, self).create(vals)
 
+    @api.model
+    def _enqueue_orders(self, connector, orders, queue=None, source=None, force=False, **queue_vals):
+        """Queue order payloads, dropping versions that were already queued.
+
+        This is the single entry point used by webhooks, the polling cron and
+        the manual wizard. ``queue`` is reused when given, otherwise a queue is
+        created with ``queue_vals`` only if at least one order is new.
+        ``force`` queues known versions too (explicit user re-import).
+        Returns ``(queue, queue lines)``.
+        """
+        fresh_orders = self.env['zid.order.idempotency']._claim_orders(
+            connector, orders, source=source, force=force)
+        queue = queue or self.browse()
+        if not fresh_orders:
+            return queue, self.env['zid.queue.line.ept']
+
+        if not queue:
+            queue = self.create(dict(queue_vals, zid_connector_id=connector.id, model_type='order'))
+            _logger.info(f"Created queue {queue.name} for {len(fresh_orders)} orders")
+
+        lines = self.env['zid.queue.line.ept'].create([{
+            'queue_id': queue.id,
+            'zid_id': str(order_data.get('id')),
+            'name': order_data.get('code') or f"Order {order_data.get('id')}",
+            'data': json.dumps(order_data, ensure_ascii=False),
+            'state': 'draft',
+        } for order_data in fresh_orders])
+        return queue, lines
+
     def action_process(self):
-        """Process pending lines in this queue"""
+        """Process pending lines in this queue, retrying failed ones without waiting for their backoff"""
         self.ensure_one()
         pending_lines = self.line_ids.filtered(lambda l: l.state in ['draft', 'failed'])
         pending_lines.process_queue_line()
 
+    def action_requeue_dead(self):
+        """Give dead-lettered lines a fresh attempt budget"""
+        self.line_ids.filtered(lambda l: l.state == 'dead').action_requeue()
+
     def action_cleanup_empty_queues(self):
         """Manual action to cleanup empty queues"""
         empty_queues = self.search([('line_ids', '=', False)])
@@ -95,20 +164,73 @@ class ZidQueueEpt(models.Model):
             }
 
     @api.model
-    def cron_process_queues(self):
-        """Cron job to process pending queues"""
-        queues = self.search([
-            ('state', 'in', ['draft', 'partial']),
-            ('line_ids.state', 'in', ['draft', 'failed'])
-        ], limit=10)  # Process 10 queues at a time
+    def cron_process_queues(self, limit=500):
+        """Cron job to process new lines and failed lines whose retry backoff has expired.
+
+        Lines are picked with weighted fair scheduling across priority lanes and
+        connectors (see ``_select_ready_lines``), realtime lane first.
+        """
+        lines_by_lane = self._select_ready_lines(limit).grouped('priority')
         
-        for queue in queues:
-            try:
-                queue.action_process()
-                # Commit after each queue to save progress
-                self.env.cr.commit()
-            except Exception as e:
-                _logger.error(f"Failed to process queue {queue.name}: {str(e)}")
+        for lane in LANE_WEIGHTS:
+            lane_lines = lines_by_lane.get(lane, self.env['zid.queue.line.ept'])
+            for queue, queue_lines in lane_lines.grouped('queue_id').items():
+                try:
+                    queue_lines.process_queue_line()
+                    # Commit after each queue to save progress
+                    self.env.cr.commit()
+                except Exception as e:
+                    self.env.cr.rollback()
+                    _logger.error(f"Failed to process queue {queue.name}: {str(e)}")
+
+    @api.model
+    def _select_ready_lines(self, limit):
+        """Pick up to ``limit`` ready lines, sharing the budget by lane weight and then evenly
+        between the connectors of each lane. Slots a lane or connector cannot use are
+        handed on to the others, so a backfill still runs at full speed when idle.
+        """
+        Line = self.env['zid.queue.line.ept']
+        domain = Line._get_ready_domain()
+
+        backlog = defaultdict(dict)
+        for lane, connector, count in Line._read_group(domain, ['priority', 'zid_connector_id'], ['__count']):
+            backlog[lane or 'normal'][connector.id] = count
+
+        lane_quota = self._fair_share(
+            {lane: sum(per_connector.values()) for lane, per_connector in backlog.items()},
+            LANE_WEIGHTS, limit)
+
+        lines = Line
+        for lane, quota in lane_quota.items():
+            connector_quota = self._fair_share(backlog[lane], dict.fromkeys(backlog[lane], 1), quota)
+            for connector_id, count in connector_quota.items():
+                if count:
+                    lines |= Line.search(domain + [
+                        ('priority', '=', lane),
+                        ('zid_connector_id', '=', connector_id),
+                    ], order='id', limit=count)
+        return lines
+
+    @api.model
+    def _fair_share(self, demand, weights, budget):
+        """Split ``budget`` over ``demand`` keys proportionally to ``weights``, never granting
+        a key more than it asked for and redistributing what is left over"""
+        share = dict.fromkeys(demand, 0)
+        remaining = budget
+        active = [key for key in demand if demand[key] > 0]
+        while remaining > 0 and active:
+            total_weight = sum(weights.get(key, 1) for key in active)
+            granted = 0
+            for key in active:
+                portion = max(remaining * weights.get(key, 1) // total_weight, 1)
+                take = min(portion, demand[key] - share[key], remaining - granted)
+                share[key] += take
+                granted += take
+            if not granted:
+                break
+            remaining -= granted
+            active = [key for key in active if share[key] < demand[key]]
+        return share
 
     @api.model
     def cron_cleanup_empty_queues(self):
@@ -126,12 +248,45 @@ class ZidQueueEpt(models.Model):
             _logger.info(f"Cleaning up {len(empty_queues)} empty queues older than 1 day")
             empty_queues.unlink()
         
-        # Also cleanup old completed queues (older than 7 days)
+        self.env['zid.order.idempotency']._cleanup_old_keys()
+        
+        # Also cleanup old completed queues (older than 7 days), keeping their lines in the archive
         old_completed_queues = self.search([
             ('create_date', '<', datetime.now() - timedelta(days=7)),
             ('state', '=', 'done')
         ])
         
+        for queue in old_completed_queues:
+            try:
+                queue._archive_lines()
+                queue.unlink()
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.error(f"Failed to archive queue {queue.name}: {str(e)}")
+        
         if old_completed_queues:
-            _logger.info(f"Cleaning up {len(old_completed_queues)} completed queues older than 7 days")
-            old_completed_queues.unlink()
+            _logger.info(f"Archived and cleaned up {len(old_completed_queues)} completed queues older than 7 days")
+
+    def _archive_lines(self, batch_size=1000):
+        """Write the queue lines to date-partitioned archive files"""
+        archive = self.env['zid.payload.archive']
+        for queue in self:
+            lines = queue.line_ids
+            for start in range(0, len(lines), batch_size):
+                batch = lines[start:start + batch_size]
+                archive._write_partitions('queue_line', [
+                    (queue.zid_connector_id, fields.Date.to_string(line.create_date.date()), {
+                        'id': line.id,
+                        'queue': queue.name,
+                        'model_type': queue.model_type,
+                        'zid_id': line.zid_id,
+                        'name': line.name,
+                        'state': line.state,
+                        'processed_at': line.processed_at,
+                        'log': line.log,
+                        'data': line.data,
+                    })
+                    for line in batch
+                ])
+                batch.invalidate_recordset(['data'])
@@ -1,53 +1,285 @@
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
 import json
 import logging
+from datetime import timedelta
+
+import requests
 
 _logger = logging.getLogger(__name__)
 
+# Backoff between automatic retries: RETRY_BASE_SECONDS * 2 ** (attempt - 1), capped
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+
+# Error messages raised by the proxy client for failures unrelated to the payload
+TRANSIENT_ERROR_MARKERS = (
+    'failed to connect to proxy server',
+    'proxy server error',
+    'proxy endpoint not found',
+    'proxy processing error',
+    'timed out',
+    'timeout',
+)
+RATE_LIMIT_MARKERS = ('429', 'too many requests', 'rate limit')
+
 
 class ZidQueueLineEpt(models.Model):
     _name = 'zid.queue.line.ept'
     _description = 'Zid Queue Line'
+    _inherit = ['zid.payload.mixin']
+    _payload_fields = {'data': 'data_blob'}
     
-    queue_id = fields.Many2one('zid.queue.ept', string='Queue', required=True, ondelete='cascade')
+    queue_id = fields.Many2one('zid.queue.ept', string='Queue', required=True, ondelete='cascade', index=True)
     zid_connector_id = fields.Many2one('zid.connector', related='queue_id.zid_connector_id', store=True)
     company_id = fields.Many2one('res.company', related='queue_id.company_id', store=True)
+    priority = fields.Selection(related='queue_id.priority', store=True, index=True)
     
     zid_id = fields.Char(string='Zid ID', required=True)
     name = fields.Char(string='Name/Reference')
-    data = fields.Text(string='Data (JSON)', required=True)
+    data = fields.Text(string='Data (JSON)', compute='_compute_payloads', inverse='_inverse_payloads')
+    data_blob = fields.Binary(string='Data (Compressed)', attachment=False, prefetch=False, copy=False)
     
     state = fields.Selection([
         ('draft', 'Draft'),
         ('done', 'Done'),
-        ('failed', 'Failed')
-    ], string='Status', default='draft')
+        ('failed', 'Failed'),
+        ('dead', 'Dead Letter')
+    ], string='Status', default='draft', index=True)
     
     processed_at = fields.Datetime(string='Processed At')
     log = fields.Text(string='Log')
     
+    # Retry metadata
+    attempt_count = fields.Integer(string='Attempts', readonly=True, copy=False)
+    next_retry_at = fields.Datetime(string='Next Retry At', readonly=True, copy=False, index=True)
+    error_class = fields.Char(string='Error Class', readonly=True, copy=False)
+    error_bucket = fields.Selection([
+        ('proxy', 'Proxy / Network'),
+        ('rate_limit', 'Rate Limited'),
+        ('data', 'Invalid Data'),
+        ('other', 'Other')
+    ], string='Error Bucket', readonly=True, copy=False, index=True)
+    
+    @api.model
+    def _get_ready_domain(self):
+        """Lines the worker may pick up: new ones and failed ones whose backoff expired"""
+        return [
+            '|',
+            ('state', '=', 'draft'),
+            '&', ('state', '=', 'failed'), ('next_retry_at', '<=', fields.Datetime.now()),
+        ]
+    
     def process_queue_line(self):
-        """Process individual queue lines"""
+        """Process individual queue lines.
+
+        Order lines are upserted one by one in chunked transactions; the sale
+        orders they need are then materialized together (see
+        ``_materialize_sale_orders``). Line states act as the resume cursor.
+        """
+        to_materialize = []
+        lines = self - self._prefetch_order_details()
+
+        def process(line):
+            if line.queue_id.model_type == 'order':
+                order, processed = line._process_order()
+                if processed is not None:
+                    to_materialize.append((line, order, processed))
+                    return
+            # Add other types here (product, customer)
+
+            line._mark_done()
+
+        def on_error(line, error):
+            _logger.error(f"Queue line processing failed: {str(error)}", exc_info=True)
+            line._mark_failed(error)
+
+        self.env['zid.chunked.transaction']._run_chunked(lines, process, on_error=on_error)
+
+        if to_materialize:
+            self._materialize_sale_orders(to_materialize)
+
+    def _prefetch_order_details(self):
+        """Fetch full details for order lines whose payload has no products.
+
+        All missing orders of a connector are fetched concurrently and the
+        enriched payloads are written back before processing, so the per-line
+        transactions never wait on the network. Nothing is committed here:
+        the payloads are committed with the first processed chunk. Returns the
+        lines whose fetch failed; they are marked failed for a later retry.
+        """
+        failed = self.browse()
+        order_lines = self.filtered(lambda l: l.queue_id.model_type == 'order')
+        for connector, lines in order_lines.grouped('zid_connector_id').items():
+            missing = {}
+            for line in lines:
+                order_data = json.loads(line.data or '{}')
+                if order_data.get('id') and not order_data.get('products'):
+                    missing[line] = order_data
+            if not missing:
+                continue
+
+            _logger.info(f"Prefetching full details for {len(missing)} orders of connector {connector.app_name}")
+            try:
+                details, errors = self.env['zid.order.prefetch']._fetch_order_details(
+                    connector, [order_data['id'] for order_data in missing.values()])
+            except Exception as e:
+                details, errors = {}, {order_data['id']: e for order_data in missing.values()}
+
+            for line, order_data in missing.items():
+                if order_data['id'] in details:
+                    # Update the original order_data with full details for future use
+                    order_data.update(details[order_data['id']])
+                    line.data = json.dumps(order_data, ensure_ascii=False)
+                else:
+                    # A missing answer is a proxy hiccup: retry with backoff
+                    line._mark_failed(errors.get(order_data['id']) or
+                                      requests.exceptions.RequestException('Order details missing'))
+                    failed |= line
+        return failed
+
+    def _mark_done(self):
+        self.write({
+            'state': 'done',
+            'processed_at': fields.Datetime.now(),
+            'log': 'Processed successfully',
+            'next_retry_at': False,
+        })
+
+    def _mark_failed(self, error):
+        """Record the failure and schedule a retry, or dead-letter the line.
+
+        Invalid data is dead-lettered right away since retrying the same
+        payload cannot succeed; other errors back off exponentially until the
+        connector's attempt limit is reached.
+        """
+        bucket = self._classify_error(error)
+        now = fields.Datetime.now()
         for line in self:
+            attempts = line.attempt_count + 1
+            max_attempts = max(line.zid_connector_id.queue_max_attempts or 1, 1)
+            vals = {
+                'attempt_count': attempts,
+                'error_class': type(error).__name__,
+                'error_bucket': bucket,
+                'log': str(error),
+            }
+            if bucket == 'data' or attempts >= max_attempts:
+                vals.update(state='dead', next_retry_at=False)
+            else:
+                delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                vals.update(state='failed', next_retry_at=now + timedelta(seconds=delay))
+            line.write(vals)
+
+    @api.model
+    def _classify_error(self, error):
+        """Map an exception to an error bucket.
+
+        Only business validation errors count as invalid data. Python errors
+        such as ``KeyError`` usually come from a malformed proxy response or a
+        code bug, so they stay retryable up to the attempt limit.
+        """
+        message = str(error).lower()
+        if any(marker in message for marker in RATE_LIMIT_MARKERS):
+            return 'rate_limit'
+        if isinstance(error, requests.exceptions.RequestException) or \
+                any(marker in message for marker in TRANSIENT_ERROR_MARKERS):
+            return 'proxy'
+        if isinstance(error, (UserError, ValidationError)):
+            return 'data'
+        return 'other'
+
+    def action_requeue(self):
+        """Send dead or failed lines back to the worker with a fresh attempt budget"""
+        self.filtered(lambda l: l.state in ('failed', 'dead')).write({
+            'state': 'draft',
+            'attempt_count': 0,
+            'next_retry_at': False,
+        })
+        return True
+
+    def _materialize_sale_orders(self, entries):
+        """Create Odoo sale orders for ``(line, zid_order, processed)`` entries in bulk.
+
+        Each chunk creates its sale orders and lines with one ``create()`` call
+        each and runs the connector automation once for the whole chunk. If a
+        chunk fails it is rolled back and retried order by order, so one bad
+        order only fails its own queue line.
+        """
+        connector = entries[0][0].zid_connector_id
+        batch_size = max(connector.order_batch_size or 1, 1)
+        for start in range(0, len(entries), batch_size):
+            chunk = entries[start:start + batch_size]
+            lines = self.browse([line.id for line, _order, _processed in chunk])
             try:
-                if line.queue_id.model_type == 'order':
-                    line._process_order()
-                # Add other types here (product, customer)
-                
-                line.state = 'done'
-                line.processed_at = fields.Datetime.now()
-                line.log = 'Processed successfully'
-                
+                with self.env.cr.savepoint():
+                    sale_orders = self._create_sale_orders_batch(chunk)
+                    self.env['zid.sale.order']._apply_order_automation_batch(sale_orders)
+                lines._mark_done()
+                _logger.info(f"Materialized {len(sale_orders)} sale orders in bulk")
             except Exception as e:
-                _logger.error(f"Queue line processing failed: {str(e)}", exc_info=True)
-                line.state = 'failed'
-                line.log = str(e)
-                # Commit to save the error state even if transaction fails
-                self.env.cr.commit()
+                _logger.warning(f"Bulk sale order creation failed ({str(e)}), retrying {len(chunk)} orders one by one")
+                # Same code path on a single order, so a retried order is delivered and invoiced identically
+                for entry in chunk:
+                    line = entry[0]
+                    try:
+                        with self.env.cr.savepoint():
+                            sale_order = self._create_sale_orders_batch([entry])
+                            self.env['zid.sale.order']._apply_order_automation_batch(sale_order)
+                        line._mark_done()
+                    except Exception as line_error:
+                        _logger.error(f"Queue line processing failed: {str(line_error)}", exc_info=True)
+                        line._mark_failed(line_error)
+            self.env.cr.commit()
+
+    def _create_sale_orders_batch(self, entries):
+        """Create sale orders and their lines for a chunk, one ``create()`` per model"""
+        partner_cache = {}
+        product_cache = {}
+        order_vals_list = []
+        for line, zid_order, processed in entries:
+            customer_data = processed.get('customer', {})
+            partner_key = (line.zid_connector_id.id, customer_data.get('email'), customer_data.get('mobile'))
+            if partner_key not in partner_cache:
+                partner_cache[partner_key] = line._find_or_create_partner(customer_data)
+            order_vals_list.append(line._prepare_sale_order_vals(zid_order, partner_cache[partner_key]))
+
+        sale_orders = self.env['sale.order'].create(order_vals_list)
+
+        line_vals_list = []
+        for (line, zid_order, processed), sale_order in zip(entries, sale_orders, strict=True):
+            for product_data in processed.get('products', []):
+                product_key = (
+                    line.zid_connector_id.id,
+                    str(product_data.get('zid_product_id', '')),
+                    product_data.get('sku'),
+                    product_data.get('barcode'),
+                    str(product_data.get('name')),
+                )
+                if product_key not in product_cache:
+                    product_cache[product_key] = line._find_product(product_data)
+                product = product_cache[product_key]
+                if not product:
+                    _logger.warning(f"Product not found for SKU {product_data.get('sku', '')}, skipping line")
+                    continue
+                line_vals_list.append(line._prepare_sale_order_line_vals(sale_order, product, product_data))
+
+            shipping = processed.get('shipping', {})
+            if shipping.get('cost', 0) > 0:
+                line_vals_list.append(line._prepare_shipping_line_vals(sale_order, shipping))
+
+            zid_order.sale_order_id = sale_order.id
+
+        if line_vals_list:
+            self.env['sale.order.line'].create(line_vals_list)
+        return sale_orders
 
     def _process_order(self):
-        """Process order import from queue - data is already raw from proxy"""
+        """Process order import from queue - data is already raw from proxy.
+
+        Returns ``(zid_order, processed)``; ``processed`` is None when no sale
+        order has to be created for it.
+        """
         self.ensure_one()
         order_data = json.loads(self.data)
         
@@ -95,239 +327,45 @@ class ZidQueueLineEpt(models.Model):
             order = order_model.create(vals)
             _logger.info(f"Created new Zid order record {order.id}")
         
-        # Step 6: Create Odoo sale.order from processed data if auto-create is enabled
+        # Step 6: Odoo sale.order is created later in bulk if auto-create is enabled
         if self.zid_connector_id.auto_create_sale_order and not order.sale_order_id:
-            self._create_sale_order_from_processed(order, processed)
-    
-    def _create_sale_order_from_processed(self, zid_order, processed):
-        """Create Odoo sale.order from proxy-processed data"""
-        try:
-            # Customer data from proxy
-            customer_data = processed.get('customer', {})
-            
-            # Find or create customer based on proxy's matching rules
-            partner = self._find_or_create_partner(customer_data)
-            
-            # Create sale order with processed data
-            sale_vals = {
-                'partner_id': partner.id,
-                'partner_invoice_id': partner.id,
-                'partner_shipping_id': partner.id,
-                'date_order': zid_order.zid_created_at or fields.Datetime.now(),
-                'client_order_ref': str(zid_order.zid_order_id),
-                'note': zid_order.customer_note or '',
-                'company_id': self.zid_connector_id.company_id.id,
-                'zid_order_ref': str(zid_order.zid_order_id),
-                'zid_order_id': zid_order.id,
-            }
-            
-            # Add salesperson and sales team if configured
-            if self.zid_connector_id.default_user_id:
-                sale_vals['user_id'] = self.zid_connector_id.default_user_id.id
-            
-            if self.zid_connector_id.default_team_id:
-                sale_vals['team_id'] = self.zid_connector_id.default_team_id.id
-            
-            sale_order = self.env['sale.order'].create(sale_vals)
-            _logger.info(f"Created sale order {sale_order.name} for Zid order {zid_order.zid_order_id}")
-            
-            # Create order lines from proxy-processed product data
-            products = processed.get('products', [])
-            _logger.info(f"Processing {len(products)} products for sale order {sale_order.name}")
-            for product in products:
-                self._create_sale_order_line(sale_order, product)
-            
-            # Create shipping line if needed
-            shipping = processed.get('shipping', {})
-            if shipping.get('cost', 0) > 0:
-                self._create_shipping_line(sale_order, shipping)
-            
-            # Link to zid order
-            zid_order.sale_order_id = sale_order.id
-            
-            # Apply automation based on connector settings
-            self._apply_order_automation(sale_order)
-            
-            _logger.info(f"Sale order {sale_order.name} created successfully with {len(processed.get('products', []))} lines")
-            
-        except Exception as e:
-            _logger.error(f"Failed to create sale order: {str(e)}", exc_info=True)
-            raise
+            return order, processed
+        return order, None
     
-    def _apply_order_automation(self, sale_order):
-        """Apply automation settings from connector configuration"""
+    def _prepare_sale_order_vals(self, zid_order, partner):
+        """Prepare sale.order values for a processed Zid order"""
         connector = self.zid_connector_id
+        sale_vals = {
+            'partner_id': partner.id,
+            'partner_invoice_id': partner.id,
+            'partner_shipping_id': partner.id,
+            'date_order': zid_order.zid_created_at or fields.Datetime.now(),
+            'client_order_ref': str(zid_order.zid_order_id),
+            'note': zid_order.customer_note or '',
+            'company_id': connector.company_id.id,
+            'zid_order_ref': str(zid_order.zid_order_id),
+            'zid_order_id': zid_order.id,
+        }
         
-        # Step 1: Auto-confirm order
-        if connector.auto_confirm_orders and sale_order.state == 'draft':
-            try:
-                sale_order.action_confirm()
-                _logger.info(f"Auto-confirmed sale order {sale_order.name}")
-            except Exception as e:
-                _logger.error(f"Failed to auto-confirm order {sale_order.name}: {str(e)}")
-        
-        # Step 2: Auto-create invoice (only if order is confirmed)
-        if connector.auto_create_invoice and sale_order.state == 'sale':
-            try:
-                # Create invoice
-                invoice_vals = sale_order._prepare_invoice()
-                invoice = self.env['account.move'].create(invoice_vals)
-                
-                # Create invoice lines
-                for line in sale_order.order_line:
-                    if line.product_uom_qty > 0:  # Only lines with quantity
-                        invoice_line_vals = line._prepare_invoice_line()
-                        invoice_line_vals['move_id'] = invoice.id
-                        self.env['account.move.line'].create(invoice_line_vals)
-                
-                _logger.info(f"Auto-created invoice {invoice.name} for order {sale_order.name}")
-                
-                # Step 3: Auto-confirm invoice
-                if connector.auto_confirm_invoice and invoice.state == 'draft':
-                    try:
-                        invoice.action_post()
-                        _logger.info(f"Auto-confirmed invoice {invoice.name}")
-                    except Exception as e:
-                        _logger.error(f"Failed to auto-confirm invoice {invoice.name}: {str(e)}")
-                        
-            except Exception as e:
-                _logger.error(f"Failed to auto-create invoice for order {sale_order.name}: {str(e)}")
-        
-        # Step 4: Auto-validate delivery (only if order is confirmed)
-        if connector.auto_validate_delivery and sale_order.state == 'sale':
-            try:
-                # Find delivery orders (pickings)
-                pickings = sale_order.picking_ids.filtered(lambda p: p.state in ['assigned', 'confirmed', 'waiting'])
-                
-                for picking in pickings:
-                    # Check if all products are available
-                    if picking.state == 'assigned' or self._force_assign_picking(picking):
-                        # Set quantities done
-                        for move in picking.move_ids:
-                            for move_line in move.move_line_ids:
-                                move_line.quantity = move_line.reserved_quantity
-                        
-                        # Validate the picking
-                        picking.button_validate()
-                        _logger.info(f"Auto-validated delivery {picking.name} for order {sale_order.name}")
-                    else:
-                        _logger.warning(f"Cannot auto-validate delivery {picking.name} - insufficient stock")
-                        
-            except Exception as e:
-                _logger.error(f"Failed to auto-validate delivery for order {sale_order.name}: {str(e)}")
-        
-        # Step 5: Auto-register payment (if Zid order is paid and invoice exists)
-        if connector.auto_register_payment:
-            self._auto_register_payment(sale_order)
-    
-    def _force_assign_picking(self, picking):
-        """Try to force assign picking if possible"""
-        try:
-            picking.action_assign()
-            return picking.state == 'assigned'
-        except Exception as e:
-            _logger.warning(f"Could not force assign picking {picking.name}: {str(e)}")
-            return False
-    
-    def _auto_register_payment(self, sale_order):
-        """Auto-register payment based on Zid order payment status"""
-        try:
-            # Find the related Zid order
-            zid_order = self.env['zid.sale.order'].search([
-                ('sale_order_id', '=', sale_order.id)
-            ], limit=1)
-            
-            if not zid_order:
-                _logger.warning(f"No Zid order found for sale order {sale_order.name}")
-                return
-            
-            # Only process if Zid order is marked as paid
-            if zid_order.payment_status != 'paid':
-                _logger.info(f"Zid order {zid_order.zid_order_id} payment status is '{zid_order.payment_status}', skipping payment registration")
-                return
-            
-            # Find posted invoices for this order
-            invoices = sale_order.invoice_ids.filtered(lambda inv: inv.state == 'posted' and inv.move_type == 'out_invoice')
-            
-            if not invoices:
-                _logger.warning(f"No posted invoices found for order {sale_order.name}, cannot register payment")
-                return
-            
-            # Get payment journal from mapping or default
-            payment_journal = self._get_payment_journal(zid_order)
-            
-            if not payment_journal:
-                _logger.error(f"No payment journal configured for payment method '{zid_order.payment_method_code}'")
-                return
-            
-            # Register payment for each invoice
-            for invoice in invoices:
-                # Check if payment already exists
-                existing_payments = self.env['account.payment'].search([
-                    ('ref', 'like', f'Zid Order {zid_order.zid_order_id}'),
-                    ('partner_id', '=', invoice.partner_id.id),
-                    ('amount', '=', invoice.amount_total)
-                ])
-                
-                if existing_payments:
-                    _logger.info(f"Payment already exists for invoice {invoice.name}")
-                    continue
-                
-                # Create payment
-                payment_vals = {
-                    'payment_type': 'inbound',
-                    'partner_type': 'customer',
-                    'partner_id': invoice.partner_id.id,
-                    'amount': invoice.amount_total,
-                    'currency_id': invoice.currency_id.id,
-                    'journal_id': payment_journal.id,
-                    'date': zid_order.zid_created_at or fields.Date.today(),
-                    'ref': f'Zid Order {zid_order.zid_order_id} - {zid_order.payment_method_name}',
-                    'reconciled_invoice_ids': [(6, 0, [invoice.id])],
-                }
-                
-                payment = self.env['account.payment'].create(payment_vals)
-                payment.action_post()
-                
-                _logger.info(f"Auto-registered payment {payment.name} for invoice {invoice.name}")
-                
-                # Auto-reconcile if enabled
-                if self.zid_connector_id.auto_reconcile_payment:
-                    self._auto_reconcile_payment(payment, invoice)
-                    
-        except Exception as e:
-            _logger.error(f"Failed to auto-register payment for order {sale_order.name}: {str(e)}")
-    
-    def _get_payment_journal(self, zid_order):
-        """Get payment journal based on Zid payment method mapping"""
-        # First try to find specific mapping
-        mapping = self.env['zid.payment.mapping'].search([
-            ('zid_connector_id', '=', zid_order.zid_connector_id.id),
-            ('payment_method_code', '=', zid_order.payment_method_code)
-        ], limit=1)
-        
-        if mapping:
-            return mapping.payment_journal_id
+        # Add salesperson and sales team if configured
+        if connector.default_user_id:
+            sale_vals['user_id'] = connector.default_user_id.id
         
-        # Fallback to default journal
-        return zid_order.zid_connector_id.default_payment_journal_id
-    
-    def _auto_reconcile_payment(self, payment, invoice):
-        """Auto-reconcile payment with invoice"""
-        try:
-            # Find matching move lines to reconcile
-            payment_line = payment.line_ids.filtered(lambda l: l.account_id.account_type == 'asset_receivable')
-            invoice_line = invoice.line_ids.filtered(lambda l: l.account_id.account_type == 'asset_receivable')
-            
-            if payment_line and invoice_line:
-                (payment_line + invoice_line).reconcile()
-                _logger.info(f"Auto-reconciled payment {payment.name} with invoice {invoice.name}")
-            else:
-                _logger.warning(f"Could not find matching lines to reconcile payment {payment.name} with invoice {invoice.name}")
-                
-        except Exception as e:
-            _logger.error(f"Failed to auto-reconcile payment {payment.name}: {str(e)}")
-    
+        if connector.default_team_id:
+            sale_vals['team_id'] = connector.default_team_id.id
+        return sale_vals
+
+    def _prepare_sale_order_line_vals(self, sale_order, product, product_data):
+        """Prepare sale.order.line values from proxy-processed product data"""
+        return {
+            'order_id': sale_order.id,
+            'product_id': product.id,
+            'name': product_data.get('name', product.name),
+            'product_uom_qty': product_data.get('quantity', 1),
+            'price_unit': product_data.get('price', 0),  # Price already processed by proxy (with commission)
+            'tax_id': [(6, 0, product.taxes_id.ids)] if product.taxes_id else False,
+        }
+
     def _find_or_create_partner(self, customer_data):
         """Find or create partner based on proxy's customer data"""
         partner_model = self.env['res.partner']
@@ -366,61 +404,6 @@ class ZidQueueLineEpt(models.Model):
             'company_id': self.zid_connector_id.company_id.id,
         })
     
-    def _create_sale_order_line(self, sale_order, product_data):
-        """Create sale order line from proxy-processed product data"""
-        # Log the product data we're trying to match
-        zid_product_id = product_data.get('zid_product_id', '')
-        sku = product_data.get('sku', '')
-        barcode = product_data.get('barcode', '')
-        name = product_data.get('name', '')
-        
-        _logger.info(f"Attempting to create order line for product: ID={zid_product_id}, SKU={sku}, Barcode={barcode}, Name={name}")
-        
-        # Find product by matching strategy from proxy
-        product = self._find_product(product_data)
-        
-        if not product:
-            _logger.error(f"CRITICAL: Product not found for order line - ID: {zid_product_id}, SKU: {sku}, Barcode: {barcode}, Name: {name}")
-            _logger.error(f"Product matching strategy: {product_data.get('match_by', 'sku')}")
-            _logger.error(f"Connector product_match_by: {self.zid_connector_id.product_match_by}")
-            
-            # Check if we have any Zid product mappings
-            if zid_product_id:
-                variant_count = self.env['zid.variant'].search_count([
-                    ('zid_variant_id', '=', str(zid_product_id)),
-                    ('zid_connector_id', '=', self.zid_connector_id.id)
-                ])
-                product_count = self.env['zid.product'].search_count([
-                    ('zid_product_id', '=', str(zid_product_id)),
-                    ('zid_connector_id', '=', self.zid_connector_id.id)
-                ])
-                _logger.error(f"Zid mappings found - Variants: {variant_count}, Products: {product_count}")
-            
-            # Check if we have Odoo products with this SKU/barcode
-            if sku:
-                odoo_sku_count = self.env['product.product'].search_count([('default_code', '=', sku)])
-                _logger.error(f"Odoo products with SKU '{sku}': {odoo_sku_count}")
-            if barcode:
-                odoo_barcode_count = self.env['product.product'].search_count([('barcode', '=', barcode)])
-                _logger.error(f"Odoo products with Barcode '{barcode}': {odoo_barcode_count}")
-            
-            _logger.warning(f"Product not found for SKU {sku}, skipping line")
-            return
-        
-        _logger.info(f"Successfully found product: {product.display_name} (ID: {product.id})")
-        
-        line_vals = {
-            'order_id': sale_order.id,
-            'product_id': product.id,
-            'name': product_data.get('name', product.name),
-            'product_uom_qty': product_data.get('quantity', 1),
-            'price_unit': product_data.get('price', 0),  # Price already processed by proxy (with commission)
-            'tax_id': [(6, 0, product.taxes_id.ids)] if product.taxes_id else False,
-        }
-        
-        order_line = self.env['sale.order.line'].create(line_vals)
-        _logger.info(f"Created order line: {product.name} x {product_data.get('quantity', 1)} @ {product_data.get('price', 0)}")
-    
     def _find_product(self, product_data):
         """Find product based on connector's matching priority and strategy"""
         product_model = self.env['product.product']
@@ -580,28 +563,9 @@ class ZidQueueLineEpt(models.Model):
         # Process products with commission
         products_data = order_data.get('products', [])
         
-        # If no products in order data, fetch full order details from Zid
+        # Full order details are fetched beforehand (see _prefetch_order_details)
         if not products_data:
-            _logger.info(f"No products found in order data, fetching full order details for order {order_data.get('id', 'unknown')}")
-            try:
-                order_id = order_data.get('id')
-                if order_id:
-                    endpoint = f"managers/store/orders/{order_id}/view"
-                    response = connector.api_request(
-                        endpoint=endpoint,
-                        method='GET'
-                    )
-                    if response and 'order' in response:
-                        full_order_data = response['order']
-                        products_data = full_order_data.get('products', [])
-                        _logger.info(f"Fetched full order details, found {len(products_data)} products")
-                        
-                        # Update the original order_data with full details for future use
-                        order_data.update(full_order_data)
-                    else:
-                        _logger.warning(f"Failed to fetch full order details for order {order_id}")
-            except Exception as e:
-                _logger.error(f"Error fetching full order details: {str(e)}")
+            _logger.warning(f"No products found in order data for order {order_data.get('id', 'unknown')}")
         
         processed_products = []
         for product in products_data:
@@ -644,8 +608,8 @@ class ZidQueueLineEpt(models.Model):
             'auto_confirm': config['auto_confirm_orders'] and not requires_approval
         }
     
-    def _create_shipping_line(self, sale_order, shipping_data):
-        """Create shipping line with processed cost from proxy"""
+    def _prepare_shipping_line_vals(self, sale_order, shipping_data):
+        """Prepare the shipping sale.order.line values with processed cost from proxy"""
         # Use configured shipping product or create generic one
         shipping_product_id = shipping_data.get('product_id')
         
@@ -666,10 +630,10 @@ class ZidQueueLineEpt(models.Model):
                     'invoice_policy': 'order',
                 })
         
-        self.env['sale.order.line'].create({
+        return {
             'order_id': sale_order.id,
             'product_id': shipping_product.id,
             'name': f"Shipping - {shipping_data.get('method', {}).get('name', 'Standard')}",
             'product_uom_qty': 1,
             'price_unit': shipping_data.get('cost', 0),  # Cost already processed by proxy (with tax)
-        })
+        }
@@ -3,7 +3,9 @@ from odoo.exceptions import UserError
 import json
 import logging
 import time
+from collections import defaultdict
 from datetime import datetime, timedelta
+from itertools import pairwise
 
 _logger = logging.getLogger(__name__)
 
@@ -11,9 +13,10 @@ _logger = logging.getLogger(__name__)
 class ZidSaleOrder(models.Model):
     _name = 'zid.sale.order'
     _description = 'Zid Sale Order'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'zid.payload.mixin']
     _rec_name = 'zid_order_id'
     _order = 'zid_created_at desc'
+    _payload_fields = {'raw_data': 'raw_data_blob', 'processed_data': 'processed_data_blob'}
 
     # Connection
     zid_connector_id = fields.Many2one(
@@ -314,12 +317,51 @@ class ZidSaleOrder(models.Model):
     )
     raw_data = fields.Text(
         string='Raw Data (JSON)',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         readonly=True
     )
     processed_data = fields.Text(
         string='Processed Data (JSON)',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         readonly=True
     )
+    raw_data_blob = fields.Binary(
+        string='Raw Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+    processed_data_blob = fields.Binary(
+        string='Processed Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+    payload_archived = fields.Boolean(
+        string='Payload Archived',
+        readonly=True,
+        copy=False,
+        help='Raw and processed JSON were moved to a compressed archive file'
+    )
+    payload_archive_id = fields.Many2one(
+        'ir.attachment',
+        string='Payload Archive',
+        readonly=True,
+        copy=False,
+        ondelete='set null'
+    )
+    payment_sync_state = fields.Selection([
+        ('registered', 'Registered'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed')
+    ], string='Payment Registration', readonly=True, copy=False)
+    payment_sync_message = fields.Char(
+        string='Payment Registration Result',
+        readonly=True,
+        copy=False
+    )
 
     # Computed Fields
     display_name = fields.Char(
@@ -333,6 +375,12 @@ class ZidSaleOrder(models.Model):
         readonly=True
     )
 
+    _sql_constraints = [
+        ('unique_zid_order',
+         'UNIQUE(zid_connector_id, zid_order_id)',
+         'Zid Order ID must be unique per connector!')
+    ]
+
     @api.depends('zid_order_id')
     def _compute_zid_order_id_display(self):
         for record in self:
@@ -534,6 +582,66 @@ class ZidSaleOrder(models.Model):
         if connector.auto_register_payment:
             self._auto_register_payment(sale_order)
     
+    @api.model
+    def _apply_order_automation_batch(self, sale_orders):
+        """Apply connector automation to many sale orders with one call per step.
+
+        Orders are confirmed together, and their pickings are validated in bulk
+        for the reserved quantities (remaining demand goes to backorders, no
+        wizard), then all invoiceable orders are invoiced through a
+        single ``_create_invoices`` call. Delivery runs before invoicing so
+        products invoiced on delivered quantities are invoiceable.
+        """
+        for connector, orders in sale_orders.grouped(lambda so: so.zid_order_id.zid_connector_id).items():
+            # Step 1: Auto-confirm orders
+            if connector.auto_confirm_orders:
+                drafts = orders.filtered(lambda so: so.state == 'draft')
+                if drafts:
+                    drafts.action_confirm()
+                    _logger.info(f"Auto-confirmed {len(drafts)} sale orders")
+
+            confirmed = orders.filtered(lambda so: so.state == 'sale')
+
+            # Step 2: Auto-validate deliveries
+            if connector.auto_validate_delivery and confirmed:
+                self._validate_deliveries_batch(confirmed)
+
+            # Step 3: Auto-create and confirm invoices
+            if connector.auto_create_invoice and confirmed:
+                to_invoice = confirmed.filtered(lambda so: so.invoice_status == 'to invoice')
+                if to_invoice:
+                    invoices = to_invoice._create_invoices()
+                    _logger.info(f"Auto-created {len(invoices)} invoices")
+                    if connector.auto_confirm_invoice:
+                        invoices.filtered(lambda inv: inv.state == 'draft').action_post()
+
+            # Step 4: Auto-register payments
+            if connector.auto_register_payment:
+                orders.zid_order_id._register_payments_batch()
+
+    @api.model
+    def _validate_deliveries_batch(self, sale_orders):
+        """Validate the open deliveries of ``sale_orders`` for their reserved quantities"""
+        pickings = sale_orders.picking_ids.filtered(lambda p: p.state in ['assigned', 'confirmed', 'waiting'])
+        to_assign = pickings.filtered(lambda p: p.state != 'assigned')
+        if to_assign:
+            # One reservation pass for every picking still waiting for stock
+            try:
+                with self.env.cr.savepoint():
+                    to_assign.action_assign()
+            except Exception as e:
+                _logger.warning(f"Could not assign {len(to_assign)} deliveries: {str(e)}")
+        ready = pickings.filtered(lambda p: p.state == 'assigned')
+        if ready:
+            # Deliver what is reserved only; the rest of the demand goes to a backorder
+            for move_line in ready.move_ids.move_line_ids:
+                move_line.quantity = move_line.reserved_quantity
+            ready.move_ids.filtered('quantity').picked = True
+            ready.with_context(skip_backorder=True).button_validate()
+            _logger.info(f"Auto-validated {len(ready)} deliveries")
+        for picking in pickings - ready:
+            _logger.warning(f"Cannot auto-validate delivery {picking.name} - insufficient stock")
+
     def _force_assign_picking(self, picking):
         """Try to force assign picking if possible"""
         try:
@@ -545,93 +653,115 @@ class ZidSaleOrder(models.Model):
     
     def _auto_register_payment(self, sale_order):
         """Auto-register payment based on Zid order payment status"""
-        try:
+        self._register_payments_batch()
+
+    @api.model
+    def _get_payment_journal_map(self, connectors):
+        """Load the payment method mapping of ``connectors`` in one query.
+
+        Returns ``{connector_id: {payment_method_code: journal}}``.
+        """
+        journal_map = {connector.id: {} for connector in connectors}
+        mappings = self.env['zid.payment.mapping'].search([('zid_connector_id', 'in', connectors.ids)])
+        for mapping in mappings:
+            journal_map[mapping.zid_connector_id.id][mapping.payment_method_code] = mapping.payment_journal_id
+        return journal_map
+
+    def _get_payment_journal(self, journal_map=None):
+        """Get payment journal based on Zid payment method mapping"""
+        if journal_map is None:
+            journal_map = self._get_payment_journal_map(self.zid_connector_id)
+        journal = journal_map.get(self.zid_connector_id.id, {}).get(self.payment_method_code)
+        # Fallback to default journal
+        return journal or self.zid_connector_id.default_payment_journal_id
+
+    def _register_payments_batch(self):
+        """Register payments for the paid Zid orders in ``self`` in bulk.
+
+        Open posted invoices are grouped by (journal, payment date, reconcile
+        mode). Groups that auto-reconcile go through one ``account.payment.register``
+        each, which creates, posts and reconciles all their payments at once;
+        other groups get their payments created and posted with one call each.
+        The outcome is written back on every Zid order.
+        """
+        results = {}
+        groups = defaultdict(lambda: self.env['account.move'])
+        invoice_owner = {}
+        journal_map = self._get_payment_journal_map(self.zid_connector_id)
+
+        for zid_order in self:
+            sale_order = zid_order.sale_order_id
+            if zid_order.payment_sync_state == 'registered':
+                continue
             # Only process if Zid order is marked as paid
-            if self.payment_status != 'paid':
-                _logger.info(f"Zid order {self.zid_order_id} payment status is '{self.payment_status}', skipping payment registration")
-                return
-            
-            # Find posted invoices for this order
-            invoices = sale_order.invoice_ids.filtered(lambda inv: inv.state == 'posted' and inv.move_type == 'out_invoice')
-            
+            if zid_order.payment_status != 'paid':
+                results[zid_order] = ('skipped', _("Payment status is '%s'") % (zid_order.payment_status or ''))
+                continue
+
+            invoices = sale_order.invoice_ids.filtered(
+                lambda inv: inv.state == 'posted' and inv.move_type == 'out_invoice'
+                and inv.payment_state in ('not_paid', 'partial')
+            )
             if not invoices:
-                _logger.warning(f"No posted invoices found for order {sale_order.name}, cannot register payment")
-                return
-            
+                results[zid_order] = ('skipped', _('No open posted invoice'))
+                continue
+
             # Get payment journal from mapping or default
-            payment_journal = self._get_payment_journal()
-            
-            if not payment_journal:
-                _logger.error(f"No payment journal configured for payment method '{self.payment_method_code}'")
-                return
-            
-            # Register payment for each invoice
+            journal = zid_order._get_payment_journal(journal_map)
+            if not journal:
+                results[zid_order] = ('failed', _("No payment journal configured for payment method '%s'") % zid_order.payment_method_code)
+                continue
+
+            payment_date = fields.Date.to_date(zid_order.zid_created_at) or fields.Date.today()
+            key = (journal.id, payment_date, zid_order.zid_connector_id.auto_reconcile_payment)
+            groups[key] |= invoices
             for invoice in invoices:
-                # Check if payment already exists
-                existing_payments = self.env['account.payment'].search([
-                    ('ref', 'like', f'Zid Order {self.zid_order_id}'),
-                    ('partner_id', '=', invoice.partner_id.id),
-                    ('amount', '=', invoice.amount_total)
-                ])
-                
-                if existing_payments:
-                    _logger.info(f"Payment already exists for invoice {invoice.name}")
-                    continue
-                
-                # Create payment
-                payment_vals = {
-                    'payment_type': 'inbound',
-                    'partner_type': 'customer',
-                    'partner_id': invoice.partner_id.id,
-                    'amount': invoice.amount_total,
-                    'currency_id': invoice.currency_id.id,
-                    'journal_id': payment_journal.id,
-                    'date': self.zid_created_at or fields.Date.today(),
-                    'ref': f'Zid Order {self.zid_order_id} - {self.payment_method_name}',
-                    'reconciled_invoice_ids': [(6, 0, [invoice.id])],
-                }
-                
-                payment = self.env['account.payment'].create(payment_vals)
-                payment.action_post()
-                
-                _logger.info(f"Auto-registered payment {payment.name} for invoice {invoice.name}")
-                
-                # Auto-reconcile if enabled
-                if self.zid_connector_id.auto_reconcile_payment:
-                    self._auto_reconcile_payment(payment, invoice)
-                    
-        except Exception as e:
-            _logger.error(f"Failed to auto-register payment for order {sale_order.name}: {str(e)}")
-    
-    def _get_payment_journal(self):
-        """Get payment journal based on Zid payment method mapping"""
-        # First try to find specific mapping
-        mapping = self.env['zid.payment.mapping'].search([
-            ('zid_connector_id', '=', self.zid_connector_id.id),
-            ('payment_method_code', '=', self.payment_method_code)
-        ], limit=1)
-        
-        if mapping:
-            return mapping.payment_journal_id
-        
-        # Fallback to default journal
-        return self.zid_connector_id.default_payment_journal_id
-    
-    def _auto_reconcile_payment(self, payment, invoice):
-        """Auto-reconcile payment with invoice"""
-        try:
-            # Find matching move lines to reconcile
-            payment_line = payment.line_ids.filtered(lambda l: l.account_id.account_type == 'asset_receivable')
-            invoice_line = invoice.line_ids.filtered(lambda l: l.account_id.account_type == 'asset_receivable')
-            
-            if payment_line and invoice_line:
-                (payment_line + invoice_line).reconcile()
-                _logger.info(f"Auto-reconciled payment {payment.name} with invoice {invoice.name}")
-            else:
-                _logger.warning(f"Could not find matching lines to reconcile payment {payment.name} with invoice {invoice.name}")
-                
-        except Exception as e:
-            _logger.error(f"Failed to auto-reconcile payment {payment.name}: {str(e)}")
+                invoice_owner[invoice.id] = zid_order
+
+        for (journal_id, payment_date, reconcile), invoices in groups.items():
+            owners = self.browse(list({invoice_owner[invoice.id].id for invoice in invoices}))
+            try:
+                with self.env.cr.savepoint():
+                    if reconcile:
+                        payments = self.env['account.payment.register'].with_context(
+                            active_model='account.move',
+                            active_ids=invoices.ids,
+                        ).create({
+                            'journal_id': journal_id,
+                            'payment_date': payment_date,
+                            'group_payment': False,
+                        })._create_payments()
+                    else:
+                        payments = self.env['account.payment'].create([
+                            invoice_owner[invoice.id]._prepare_payment_vals(invoice, journal_id, payment_date)
+                            for invoice in invoices
+                        ])
+                        payments.action_post()
+                _logger.info(f"Auto-registered {len(payments)} payments on journal {journal_id} for {len(invoices)} invoices")
+                for zid_order in owners:
+                    results[zid_order] = ('registered', _('Payment registered on %s') % fields.Date.to_string(payment_date))
+            except Exception as e:
+                _logger.error(f"Failed to auto-register payments for {len(invoices)} invoices: {str(e)}")
+                for zid_order in owners:
+                    results[zid_order] = ('failed', str(e))
+
+        for zid_order, (state, message) in results.items():
+            zid_order.write({'payment_sync_state': state, 'payment_sync_message': message})
+        return results
+
+    def _prepare_payment_vals(self, invoice, journal_id, payment_date):
+        """Prepare an inbound account.payment for ``invoice`` of this Zid order"""
+        self.ensure_one()
+        return {
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': invoice.partner_id.id,
+            'amount': invoice.amount_residual,
+            'currency_id': invoice.currency_id.id,
+            'journal_id': journal_id,
+            'date': payment_date,
+            'ref': f'Zid Order {self.zid_order_id} - {self.payment_method_name}',
+        }
 
     def action_update_status(self):
         """Open wizard to update order status"""
@@ -658,25 +788,6 @@ class ZidSaleOrder(models.Model):
             'context': {'default_zid_order_id': self.id}
         }
 
-    @api.model
-    def cron_sync_orders(self):
-        """Cron job to sync orders from Zid"""
-        connectors = self.env['zid.connector'].search([
-            ('authorization_status', '=', 'connected'),
-            ('active', '=', True)
-        ])
-
-        for connector in connectors:
-            try:
-                wizard = self.env['zid.sale.order.connector'].create({
-                    'zid_connector_id': connector.id,
-                    'import_mode': 'all'
-                })
-                wizard.action_import_orders()
-                _logger.info(f"Successfully synced orders for connector: {connector.app_name}")
-            except Exception as e:
-                _logger.error(f"Failed to sync orders for {connector.app_name}: {str(e)}")
-
     def get_credit_notes(self):
         """Fetch credit notes for this order"""
         self.ensure_one()
@@ -925,7 +1036,7 @@ class ZidSaleOrder(models.Model):
 
     @api.model
     def cron_sync_orders(self):
-        """Cron job to sync orders from Zid via proxy"""
+        """Cron job to incrementally import orders changed since each connector's watermark"""
         _logger.info("Starting Zid order sync cron...")
         
         # Get all connected connectors
@@ -940,30 +1051,98 @@ class ZidSaleOrder(models.Model):
             
         for connector in connectors:
             try:
-                _logger.info(f"Syncing orders for connector: {connector.app_name}")
-                
-                # Fetch start date from connector settings
-                start_date = connector.order_import_start_date or (fields.Datetime.now() - timedelta(days=7))
+                _logger.info(f"Syncing orders for connector: {connector.app_name} "
+                             f"(changed since {connector._get_order_sync_window_start()})")
                 
-                # Create wizard and trigger import
                 wizard = self.env['zid.sale.order.connector'].create({
                     'zid_connector_id': connector.id,
-                    'import_mode': 'new',
+                    'import_mode': 'incremental',
                     'order_status': 'all',
                     'payment_status': 'all',
-                    'date_from': start_date
+                    'import_source': 'cron',
                 })
                 
-                # This calls proxy instead of Zid directly!
-                wizard.action_start_import()
+                # Fetches every changed page, queues it and advances the watermark
+                fetched = wizard._run_incremental_import()
                 
-                # Update start date for next sync to NOW
-                connector.write({'order_import_start_date': fields.Datetime.now()})
-                
-                _logger.info(f"Successfully synced orders for connector: {connector.app_name}")
+                _logger.info(f"Successfully synced {fetched} changed orders for connector: {connector.app_name}")
                 
             except Exception as e:
+                self.env.cr.rollback()
                 _logger.error(f"Error syncing orders for connector {connector.app_name}: {str(e)}")
+
+    @api.depends('raw_data_blob', 'processed_data_blob', 'payload_archive_id')
+    def _compute_payloads(self):
+        """Read archived payloads back from their archive file when opened"""
+        super()._compute_payloads()
+        archived = self.filtered(lambda o: o.payload_archived and o.payload_archive_id and not o.raw_data)
+        for attachment, orders in archived.grouped('payload_archive_id').items():
+            payloads = {
+                row['id']: row
+                for row in self.env['zid.payload.archive']._read_partition(attachment.sudo())
+            }
+            for order in orders:
+                row = payloads.get(order._origin.id, {})
+                order.raw_data = row.get('raw_data') or False
+                order.processed_data = row.get('processed_data') or False
+
+    def action_restore_payload(self):
+        """Move archived payloads back into the order records"""
+        for order in self.filtered('payload_archived'):
+            raw_data, processed_data = order.raw_data, order.processed_data
+            order.write({'raw_data': raw_data, 'processed_data': processed_data})
+            order.write({'payload_archived': False, 'payload_archive_id': False})
+        return True
+
+    @api.model
+    def cron_archive_order_payloads(self, batch_size=500):
+        """Move raw JSON of old, already materialized orders to archive files"""
+        connectors = self.env['zid.connector'].search([('payload_archive_days', '>', 0)])
+        archive = self.env['zid.payload.archive']
+
+        for connector in connectors:
+            cutoff = fields.Datetime.now() - timedelta(days=connector.payload_archive_days)
+            archived_count = 0
+            while True:
+                orders = self.search([
+                    ('zid_connector_id', '=', connector.id),
+                    ('payload_archived', '=', False),
+                    ('sale_order_id', '!=', False),
+                    ('create_date', '<', cutoff),
+                    ('raw_data_blob', '!=', False),
+                ], order='id', limit=batch_size)
+                if not orders:
+                    break
+
+                try:
+                    entries = [
+                        (connector, fields.Date.to_string(order.create_date.date()), {
+                            'id': order.id,
+                            'zid_order_id': order.zid_order_id,
+                            'raw_data': order.raw_data,
+                            'processed_data': order.processed_data,
+                        })
+                        for order in orders
+                    ]
+                    attachments = archive._write_partitions('order', entries)
+                    orders_by_day = orders.grouped(lambda o: fields.Date.to_string(o.create_date.date()))
+                    for (_connector_id, day), attachment in attachments.items():
+                        orders_by_day[day].write({
+                            'raw_data_blob': False,
+                            'processed_data_blob': False,
+                            'payload_archived': True,
+                            'payload_archive_id': attachment.id,
+                        })
+                    self.env.cr.commit()
+                    archived_count += len(orders)
+                except Exception as e:
+                    self.env.cr.rollback()
+                    _logger.error(f"Error archiving order payloads for connector {connector.app_name}: {str(e)}")
+                    break
+
+            if archived_count:
+                _logger.info(f"Archived payloads of {archived_count} orders for connector {connector.app_name}")
+
     @api.depends('raw_data')
     def _compute_zid_product_lines(self):
         """Compute Zid product lines from raw order data"""
@@ -1076,7 +1255,7 @@ class ZidSaleOrder(models.Model):
             }
     @api.model
     def cron_sync_order_status(self):
-        """Cron job to sync order status from Zid for recent orders"""
+        """Cron job to sync order status from Zid for orders changed since the last run"""
         _logger.info("Starting Zid order status sync cron...")
         
         # Get all active connectors with status sync enabled
@@ -1095,44 +1274,179 @@ class ZidSaleOrder(models.Model):
         
         for connector in connectors:
             try:
-                _logger.info(f"Syncing order status for connector: {connector.name}")
-                
-                # Calculate date range based on connector settings
-                days_back = connector.status_sync_days_back or 7
-                cutoff_date = fields.Datetime.now() - timedelta(days=days_back)
-                
-                # Get orders that might need status updates
-                domain = [('zid_connector_id', '=', connector.id)]
-                
-                if connector.sync_all_pending_orders:
-                    # Include ALL non-final orders regardless of age
-                    domain.append(('order_status', 'not in', ['delivered', 'cancelled', 'returned']))
-                    _logger.info(f"Checking ALL pending orders for connector {connector.name}")
-                else:
-                    # Use hybrid approach: recent updates OR non-final orders
-                    domain.extend([
-                        '|',
-                        # Recently updated orders in Zid
-                        ('zid_updated_at', '>=', cutoff_date),
-                        # OR orders that are not in final status (regardless of age)
-                        ('order_status', 'not in', ['delivered', 'cancelled', 'returned'])
-                    ])
-                    _logger.info(f"Checking recent + pending orders for connector {connector.name}")
-                
-                orders_to_check = self.search(domain)
-                
-                _logger.info(f"Found {len(orders_to_check)} orders to check for status updates")
-                
-                checked, updated = self._batch_sync_order_status(orders_to_check)
+                checked, updated = self._sync_order_status_since_watermark(connector)
                 total_checked += checked
                 total_updated += updated
+                self.env.cr.commit()
                 
-                _logger.info(f"Connector {connector.name}: Checked {checked} orders, updated {updated}")
+                _logger.info(f"Connector {connector.app_name}: Checked {checked} orders, updated {updated}")
                 
             except Exception as e:
-                _logger.error(f"Error syncing order status for connector {connector.name}: {str(e)}")
+                self.env.cr.rollback()
+                _logger.error(f"Error syncing order status for connector {connector.app_name}: {str(e)}")
         
         _logger.info(f"Order status sync completed. Total checked: {total_checked}, Total updated: {total_updated}")
+
+    @api.model
+    def _sync_order_status_since_watermark(self, connector, per_page=100):
+        """Pull orders updated since the connector's status watermark and apply status changes.
+
+        Uses the paginated orders listing (newest first) instead of one view
+        call per order, and stops at the first order older than the window
+        when the page really is sorted that way. The watermark only moves
+        forward once every page has been applied; a failed listing call
+        raises and leaves it untouched. With ``sync_all_pending_orders``,
+        non-final orders the listing did not return are re-checked as well,
+        through the same listing filtered by order id.
+        """
+        since = connector._get_status_sync_window_start()
+        _logger.info(f"Syncing order status for connector {connector.app_name} (changed since {since})")
+
+        page = 1
+        newest = None
+        checked = updated = 0
+        listed_ids = set()
+        while True:
+            result = connector.call_proxy_api('/api/zid/fetch-orders', {
+                'page': page,
+                'per_page': per_page,
+                'updated_at_from': since.isoformat(),
+                'date_from': since.isoformat(),
+                'date_attribute': 'updated_at',
+                'sort_by': 'updated_at',
+                'sort_order': 'desc',
+            })
+            if not result.get('success'):
+                raise UserError(_('Proxy error: %s') % result.get('error', 'Unknown error'))
+            listed = result.get('orders', [])
+            listed_ids.update(int(order_data['id']) for order_data in listed if order_data.get('id'))
+
+            remote_statuses, page_newest, stop = self._parse_status_page(connector, listed, since)
+            if page_newest and (newest is None or page_newest > newest):
+                newest = page_newest
+
+            page_checked, page_updated = self._apply_remote_statuses(connector, remote_statuses)
+            checked += page_checked
+            updated += page_updated
+
+            if stop or len(listed) < per_page:
+                break
+            page += 1
+
+        if connector.sync_all_pending_orders:
+            pending_ids = set(self.search([
+                ('zid_connector_id', '=', connector.id),
+                ('order_status', 'not in', ['delivered', 'cancelled', 'returned']),
+            ]).mapped('zid_order_id')) - listed_ids
+            pending_checked, pending_updated = self._sync_order_status_by_ids(
+                connector, sorted(pending_ids), per_page)
+            checked += pending_checked
+            updated += pending_updated
+
+        if newest and (not connector.status_sync_watermark or newest > connector.status_sync_watermark):
+            connector.status_sync_watermark = newest
+        return checked, updated
+
+    @api.model
+    def _parse_status_page(self, connector, listed, since):
+        """Read one listing page; returns ``(remote_statuses, newest, stop)``.
+
+        ``stop`` is set when the page reaches orders older than ``since`` and
+        is really sorted by ``updated_at`` descending, so later pages are older.
+        """
+        remote_statuses = {}
+        newest = None
+        reached_older = False
+        page_dates = []
+        for order_data in listed:
+            updated_at = connector._parse_zid_datetime(order_data.get('updated_at'))
+            if updated_at:
+                page_dates.append(updated_at)
+                if updated_at < since:
+                    reached_older = True
+                    continue
+                if newest is None or updated_at > newest:
+                    newest = updated_at
+
+            status_code = self._get_remote_status_code(order_data)
+            if order_data.get('id') and status_code:
+                remote_statuses[int(order_data['id'])] = status_code
+
+        sorted_desc = all(newer >= older for newer, older in pairwise(page_dates))
+        return remote_statuses, newest, reached_older and sorted_desc
+
+    @api.model
+    def _get_remote_status_code(self, order_data):
+        status_info = order_data.get('order_status', {})
+        if isinstance(status_info, dict):
+            status_info = status_info.get('code')
+        return str(status_info) if status_info else None
+
+    @api.model
+    def _sync_order_status_by_ids(self, connector, zid_order_ids, per_page=100):
+        """Re-check ``zid_order_ids`` through the orders listing, ``per_page`` ids per call"""
+        checked = updated = 0
+        for start in range(0, len(zid_order_ids), per_page):
+            chunk = zid_order_ids[start:start + per_page]
+            result = connector.call_proxy_api('/api/zid/fetch-orders', {
+                'page': 1,
+                'per_page': per_page,
+                'order_id': ','.join(str(zid_order_id) for zid_order_id in chunk),
+            })
+            if not result.get('success'):
+                raise UserError(_('Proxy error: %s') % result.get('error', 'Unknown error'))
+
+            wanted = set(chunk)
+            remote_statuses = {}
+            for order_data in result.get('orders', []):
+                status_code = self._get_remote_status_code(order_data)
+                if order_data.get('id') and int(order_data['id']) in wanted and status_code:
+                    remote_statuses[int(order_data['id'])] = status_code
+
+            chunk_checked, chunk_updated = self._apply_remote_statuses(connector, remote_statuses)
+            checked += chunk_checked
+            updated += chunk_updated
+        return checked, updated
+
+    @api.model
+    def _apply_remote_statuses(self, connector, remote_statuses):
+        """Diff ``{zid_order_id: status_code}`` against stored orders and apply only the changes.
+
+        Orders are written once per target status and the change notes are
+        logged with a single batched chatter call.
+        """
+        if not remote_statuses:
+            return 0, 0
+
+        orders = self.search([
+            ('zid_connector_id', '=', connector.id),
+            ('zid_order_id', 'in', list(remote_statuses))
+        ])
+        allowed_statuses = dict(self._fields['order_status'].selection)
+
+        changes = defaultdict(lambda: self.browse())
+        bodies = {}
+        for order in orders:
+            new_status = remote_statuses[order.zid_order_id]
+            if new_status == order.order_status:
+                continue
+            if new_status not in allowed_statuses:
+                _logger.warning(f"Unknown order status '{new_status}' received for order {order.zid_order_id}. Skipping update.")
+                continue
+            _logger.info(f"Order {order.zid_order_id}: Status changed from '{order.order_status}' to '{new_status}'")
+            changes[new_status] |= order
+            bodies[order.id] = _("Order status automatically updated from '%s' to '%s' via cron sync") % (
+                order.order_status, new_status)
+
+        for new_status, changed_orders in changes.items():
+            changed_orders.write({'order_status': new_status})
+            # Update related Odoo sale orders if they exist
+            for order in changed_orders.filtered('sale_order_id'):
+                order._update_sale_order_status(order.sale_order_id, new_status)
+
+        if bodies:
+            self.browse(list(bodies))._message_log_batch(bodies=bodies)
+        return len(orders), len(bodies)
     
     def _batch_sync_order_status(self, orders):
         """Batch sync order status for multiple orders"""
@@ -1281,25 +1595,14 @@ class ZidSaleOrder(models.Model):
             _logger.error(f"Failed to auto-validate delivery for order {sale_order.name}: {str(e)}")
     
     def sync_status_during_import(self, connector):
-        """Sync order status for recent orders during import process"""
+        """Sync order status for recently changed orders during import process"""
         if not connector.sync_order_status_on_import:
             return
         
         try:
             _logger.info("Syncing order status during import...")
-            
-            # Get orders imported in the last 48 hours
-            cutoff_date = fields.Datetime.now() - timedelta(hours=48)
-            
-            recent_orders = self.search([
-                ('zid_connector_id', '=', connector.id),
-                ('create_date', '>=', cutoff_date),
-                ('order_status', 'not in', ['delivered', 'cancelled', 'returned'])
-            ])
-            
-            if recent_orders:
-                checked, updated = self._batch_sync_order_status(recent_orders)
-                _logger.info(f"Import-time status sync: Checked {checked} orders, updated {updated}")
+            checked, updated = self._sync_order_status_since_watermark(connector)
+            _logger.info(f"Import-time status sync: Checked {checked} orders, updated {updated}")
         
         except Exception as e:
             _logger.error(f"Error during import-time status sync: {str(e)}")
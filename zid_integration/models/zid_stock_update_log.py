@@ -1,18 +1,36 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.tools.sql import create_index
 import json
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 _logger = logging.getLogger(__name__)
 
+# Connector field holding the retention (days) of each group of statuses;
+# pending and processing logs are never purged
+STOCK_LOG_RETENTION_GROUPS = {
+    'stock_log_retention_days': ['success', 'cancelled'],
+    'stock_log_error_retention_days': ['partial', 'failed', 'error', 'timeout'],
+}
+STOCK_LOG_RETENTION_DEFAULTS = {
+    'stock_log_retention_days': 30,
+    'stock_log_error_retention_days': 90,
+}
+# Rows deleted per committed batch, and seconds a cleanup run may take
+CLEANUP_BATCH_SIZE = 1000
+CLEANUP_TIME_BUDGET = 240
+
 
 class ZidStockUpdateLog(models.Model):
     _name = 'zid.stock.update.log'
     _description = 'Zid Stock Update Log'
     _order = 'create_date desc'
     _rec_name = 'display_name'
+    _inherit = ['zid.payload.mixin']
+    _payload_fields = {'request_data': 'request_data_blob', 'response_data': 'response_data_blob'}
     
     # =============== Basic Information ===============
     display_name = fields.Char(
@@ -184,14 +202,32 @@ class ZidStockUpdateLog(models.Model):
     
     request_data = fields.Text(
         string='Request Data',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         help='JSON data sent to Zid API'
     )
     
     response_data = fields.Text(
         string='Response Data',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads',
         help='JSON response from Zid API'
     )
     
+    request_data_blob = fields.Binary(
+        string='Request Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+    
+    response_data_blob = fields.Binary(
+        string='Response Data (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+    
     response_code = fields.Integer(
         string='Response Code',
         help='HTTP response code from Zid API'
@@ -491,17 +527,74 @@ class ZidStockUpdateLog(models.Model):
         }
     
     # =============== Cron & Cleanup ===============
+    def init(self):
+        # Retention batches select by connector, status and age
+        create_index(self.env.cr, 'zid_stock_update_log_retention_index', self._table,
+                     ['zid_connector_id', 'status', 'create_date'])
+
+    @api.model
+    def cron_cleanup_logs(self):
+        """Purge logs past their connector's retention, within the time budget"""
+        deadline = time.monotonic() + CLEANUP_TIME_BUDGET
+        total = 0
+        finished = True
+        for domain in self._get_retention_domains():
+            deleted, finished = self._purge_logs(domain, deadline)
+            total += deleted
+            if not finished:
+                break
+
+        _logger.info(f"Stock update log retention removed {total} logs")
+        if not finished:
+            # Out of time with expired logs left: continue right away
+            self.env.ref('zid_integration.cron_zid_stock_update_log_cleanup').sudo()._trigger()
+        return total
+
+    @api.model
+    def _get_retention_domains(self):
+        """One domain per connector and retention group; logs in flight are never purged"""
+        now = fields.Datetime.now()
+        connectors = self.env['zid.connector'].with_context(active_test=False).search([])
+        domains = []
+        for field_name, statuses in STOCK_LOG_RETENTION_GROUPS.items():
+            for connector in connectors:
+                days = connector[field_name]
+                if days > 0:
+                    domains.append([
+                        ('zid_connector_id', '=', connector.id),
+                        ('status', 'in', statuses),
+                        ('create_date', '<', now - timedelta(days=days)),
+                    ])
+            # Logs without a connector follow the default retention
+            domains.append([
+                ('zid_connector_id', '=', False),
+                ('status', 'in', statuses),
+                ('create_date', '<', now - timedelta(days=STOCK_LOG_RETENTION_DEFAULTS[field_name])),
+            ])
+        return domains
+
+    @api.model
+    def _purge_logs(self, domain, deadline, batch_size=CLEANUP_BATCH_SIZE):
+        """Delete matching logs in committed batches; returns ``(deleted, finished)``"""
+        deleted = 0
+        while time.monotonic() < deadline:
+            logs = self.search(domain, order='id', limit=batch_size)
+            if not logs:
+                return deleted, True
+            logs.unlink()
+            # Short transactions keep row locks and WAL bursts small
+            self.env.cr.commit()
+            deleted += len(logs)
+        return deleted, False
+
     @api.model
     def cleanup_old_logs(self, days=30):
         """Clean up old logs"""
         cutoff_date = fields.Datetime.now() - timedelta(days=days)
-        old_logs = self.search([
+        count = self._purge_logs([
             ('create_date', '<', cutoff_date),
             ('status', 'in', ['success', 'cancelled'])
-        ])
-        
-        count = len(old_logs)
-        old_logs.unlink()
+        ], time.monotonic() + CLEANUP_TIME_BUDGET)[0]
         
         _logger.info(f"Cleaned up {count} old stock update logs")
         return count
@@ -0,0 +1,444 @@
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Stages in display order
+SYNC_STAGES = [
+    ('categories', 'Categories'),
+    ('attributes', 'Attributes'),
+    ('customers', 'Customers'),
+    ('products', 'Products'),
+    ('orders', 'Orders'),
+    ('stock', 'Stock Levels'),
+]
+
+# Stages that must be done first; dependencies outside the run are ignored
+STAGE_DEPENDENCIES = {
+    'categories': [],
+    'attributes': [],
+    'customers': [],
+    'products': ['categories', 'attributes'],
+    'orders': ['products'],
+    'stock': ['products'],
+}
+
+# Seconds a single cron run may spend before yielding
+RUN_TIME_BUDGET = 240
+# Independent stages run side by side, each on its own cursor
+MAX_PARALLEL_STAGES = 3
+
+
+class ZidSyncRun(models.Model):
+    """Server-side bulk synchronization, split into dependent stages.
+
+    The bulk sync wizard only records the selected stages here. The
+    ``cron_zid_sync_runs`` worker then runs every stage whose dependencies
+    are done, independent stages in parallel, within a time budget. Stages
+    persist their own checkpoint (page or record id), so a run survives
+    worker restarts and a failed stage is resumed where it stopped without
+    redoing the others.
+    """
+    _name = 'zid.sync.run'
+    _description = 'Zid Bulk Sync Run'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Name',
+        required=True,
+        readonly=True,
+        default=lambda self: _('Bulk Sync')
+    )
+    zid_connector_id = fields.Many2one(
+        'zid.connector',
+        string='Zid Connector',
+        required=True,
+        readonly=True,
+        ondelete='cascade'
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        readonly=True,
+        default=lambda self: self.env.user
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    use_date_range = fields.Boolean(string='Use Date Range', readonly=True)
+    date_from = fields.Datetime(string='From Date', readonly=True)
+    date_to = fields.Datetime(string='To Date', readonly=True)
+    stage_ids = fields.One2many(
+        'zid.sync.run.stage',
+        'run_id',
+        string='Stages',
+        readonly=True
+    )
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    finished_at = fields.Datetime(string='Finished At', readonly=True)
+
+    # Stage logs and counters are kept per stage, so parallel stages never
+    # write the same row; the run only aggregates them
+    progress_log = fields.Text(string='Progress Log', compute='_compute_progress')
+    products_synced = fields.Integer(string='Products Synced', compute='_compute_progress')
+    orders_synced = fields.Integer(string='Orders Synced', compute='_compute_progress')
+    customers_synced = fields.Integer(string='Customers Synced', compute='_compute_progress')
+    stock_synced = fields.Integer(string='Stock Items Synced', compute='_compute_progress')
+    errors_count = fields.Integer(string='Errors', compute='_compute_progress')
+
+    @api.depends('stage_ids.log', 'stage_ids.state', 'stage_ids.processed_count', 'stage_ids.error_count')
+    def _compute_progress(self):
+        state_labels = dict(self.env['zid.sync.run.stage']._fields['state']._description_selection(self.env))
+        for run in self:
+            blocks = []
+            counts = {}
+            for stage in run.stage_ids:
+                counts[stage.code] = stage.processed_count
+                header = f"[{state_labels[stage.state]}] {stage.display_name}"
+                blocks.append(header + '\n' + (stage.log or ''))
+            run.progress_log = '\n'.join(blocks)
+            run.products_synced = counts.get('products', 0)
+            run.orders_synced = counts.get('orders', 0)
+            run.customers_synced = counts.get('customers', 0)
+            run.stock_synced = counts.get('stock', 0)
+            run.errors_count = sum(run.stage_ids.mapped('error_count'))
+
+    @api.model
+    def cron_run(self):
+        """Advance pending/running sync runs within the time budget, oldest first"""
+        deadline = time.monotonic() + RUN_TIME_BUDGET
+        for run in self.search([('state', 'in', ['pending', 'running'])], order='id'):
+            if time.monotonic() >= deadline:
+                break
+            run._advance(deadline)
+
+        if time.monotonic() >= deadline and self.search_count([('state', 'in', ['pending', 'running'])]):
+            # Out of time with work left: come back right away instead of waiting for the interval
+            self.env.ref('zid_integration.cron_zid_sync_runs').sudo()._trigger()
+
+    def _advance(self, deadline):
+        """Run rounds of ready stages until nothing completes or the deadline passes"""
+        self.ensure_one()
+        if self.state == 'pending':
+            self.write({'state': 'running', 'started_at': fields.Datetime.now()})
+
+        while time.monotonic() < deadline:
+            stages = self._get_ready_stages()[:MAX_PARALLEL_STAGES]
+            if not stages:
+                break
+
+            stages.filtered(lambda s: s.state == 'pending').write({
+                'state': 'running',
+                'started_at': fields.Datetime.now(),
+            })
+            self.env.cr.commit()
+
+            if len(stages) == 1:
+                stages._execute(deadline)
+            else:
+                self._execute_parallel(stages, deadline)
+
+            # Start a new snapshot so the stage threads' commits are visible
+            self.env.cr.commit()
+            self.env.invalidate_all()
+            if not stages.filtered(lambda s: s.state in ('done', 'failed')):
+                # Stages only progressed partially or are waiting on other jobs
+                break
+
+        self._update_state()
+        self.env.cr.commit()
+
+    def _get_ready_stages(self):
+        """Unfinished stages whose selected dependencies are all done"""
+        selected = set(self.stage_ids.mapped('code'))
+        done = set(self.stage_ids.filtered(lambda s: s.state == 'done').mapped('code'))
+        return self.stage_ids.filtered(
+            lambda s: s.state in ('pending', 'running') and all(
+                dependency in done
+                for dependency in STAGE_DEPENDENCIES[s.code]
+                if dependency in selected
+            )
+        )
+
+    def _execute_parallel(self, stages, deadline):
+        """Run each stage in its own thread with a dedicated cursor"""
+        registry = self.env.registry
+        uid, context = self.env.uid, dict(self.env.context)
+
+        def execute(stage_id):
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                env['zid.sync.run.stage'].browse(stage_id)._execute(deadline)
+
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix='zid_sync') as pool:
+            futures = {pool.submit(execute, stage.id): stage for stage in stages}
+            for future, stage in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    _logger.error(f"Sync run {self.id}: stage {stage.code} crashed: {str(e)}", exc_info=True)
+
+    def _update_state(self):
+        """Close the run once every stage is done, or nothing can progress anymore"""
+        stages = self.stage_ids
+        if all(stage.state == 'done' for stage in stages):
+            self.write({'state': 'done', 'finished_at': fields.Datetime.now()})
+            self._notify(_('Bulk synchronization completed'), 'success')
+        elif stages.filtered(lambda s: s.state == 'failed') and not self._get_ready_stages():
+            self.write({'state': 'failed', 'finished_at': fields.Datetime.now()})
+            self._notify(_('Bulk synchronization stopped: some stages failed. Resume it once fixed.'), 'danger')
+
+    def _notify_progress(self, stage, message):
+        """Push a stage message to the run's requester"""
+        if self.user_id:
+            self.env['bus.bus']._sendone(self.user_id.partner_id, 'zid_integration/sync_run', {
+                'id': self.id,
+                'stage': stage.code,
+                'state': stage.state,
+                'message': message,
+            })
+
+    def _notify(self, message, notification_type):
+        if self.user_id:
+            self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+                'title': self.name,
+                'message': message,
+                'type': notification_type,
+                'sticky': notification_type == 'danger',
+            })
+
+    def action_resume(self):
+        """Retry failed stages from their checkpoint; completed stages are kept"""
+        for run in self.filtered(lambda r: r.state == 'failed'):
+            run.stage_ids.filtered(lambda s: s.state == 'failed')._prepare_resume()
+            run.write({'state': 'running', 'finished_at': False})
+        self.env.ref('zid_integration.cron_zid_sync_runs').sudo()._trigger()
+
+
+class ZidSyncRunStage(models.Model):
+    _name = 'zid.sync.run.stage'
+    _description = 'Zid Bulk Sync Stage'
+    _order = 'run_id, sequence, id'
+
+    run_id = fields.Many2one(
+        'zid.sync.run',
+        string='Sync Run',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    code = fields.Selection(
+        SYNC_STAGES,
+        string='Stage',
+        required=True,
+        readonly=True
+    )
+    sequence = fields.Integer(string='Sequence', default=10)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, readonly=True)
+    checkpoint = fields.Integer(
+        string='Checkpoint',
+        readonly=True,
+        help='Resume point of the stage: last page or record id completed'
+    )
+    processed_count = fields.Integer(string='Processed', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    import_job_id = fields.Many2one(
+        'zid.import.job',
+        string='Import Job',
+        readonly=True,
+        help='Background order import driven by this stage'
+    )
+    log = fields.Text(string='Log', readonly=True)
+    error_message = fields.Text(string='Error Message', readonly=True)
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    finished_at = fields.Datetime(string='Finished At', readonly=True)
+
+    @api.depends('code')
+    def _compute_display_name(self):
+        labels = dict(SYNC_STAGES)
+        for stage in self:
+            stage.display_name = labels.get(stage.code, stage.code)
+
+    def _execute(self, deadline):
+        """Run the stage until it completes or the deadline passes; failures stay local"""
+        self.ensure_one()
+        try:
+            if getattr(self, f'_run_{self.code}')(deadline):
+                self.write({'state': 'done', 'finished_at': fields.Datetime.now()})
+                self._log(_('✓ Completed'))
+            self.env.cr.commit()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.error(f"Sync run {self.run_id.id}: stage {self.code} failed: {str(e)}", exc_info=True)
+            self.write({
+                'state': 'failed',
+                'error_message': str(e),
+                'error_count': self.error_count + 1,
+                'finished_at': fields.Datetime.now(),
+            })
+            self._log(_('✗ Failed: %s') % str(e))
+            self.env.cr.commit()
+
+    def _prepare_resume(self):
+        for stage in self:
+            if stage.import_job_id.state == 'failed':
+                stage.import_job_id.action_retry()
+            elif stage.import_job_id.state == 'cancelled':
+                stage.import_job_id = False
+            stage.write({'state': 'running', 'error_message': False, 'finished_at': False})
+            stage._log(_('Resuming from checkpoint %d') % stage.checkpoint)
+
+    def _log(self, message):
+        self.log = (self.log or '') + message + '\n'
+        _logger.info(f"Sync run {self.run_id.id} [{self.code}]: {message}")
+        self.run_id._notify_progress(self, message)
+
+    def _add_counts(self, processed, errors=0):
+        self.write({
+            'processed_count': self.processed_count + processed,
+            'error_count': self.error_count + errors,
+        })
+
+    def _on_item_error(self, item, error):
+        item_id = item.get('id') if isinstance(item, dict) else item.id
+        _logger.error(f"Sync run {self.run_id.id} [{self.code}]: item {item_id} failed: {str(error)}")
+
+    # ==================== Stages ====================
+    # Each runner returns True once the stage is complete
+
+    def _run_categories(self, deadline):
+        connector = self.run_id.zid_connector_id
+        response = connector.api_request(endpoint='categories/', method='GET')
+        categories = response.get('results', []) if isinstance(response, dict) else []
+
+        category_model = self.env['zid.product.category']
+        synced, failed = self.env['zid.chunked.transaction']._run_chunked(
+            categories,
+            lambda category_data: category_model.create_or_update_from_zid(category_data, connector.id),
+            on_error=self._on_item_error,
+        )
+        self._add_counts(synced, failed)
+        self._log(_('Synced %d categories (%d failed)') % (synced, failed))
+        return True
+
+    def _run_attributes(self, deadline):
+        wizard = self.env['zid.attribute.connector'].create({
+            'zid_connector_id': self.run_id.zid_connector_id.id,
+        })
+        wizard.action_fetch_attributes()
+        self._add_counts(wizard.imported_count + wizard.updated_count)
+        self._log(_('Synced %d attributes') % (wizard.imported_count + wizard.updated_count))
+        return True
+
+    def _run_customers(self, deadline):
+        wizard = self.env['zid.customer.sync.wizard'].create({
+            'zid_connector_id': self.run_id.zid_connector_id.id,
+        })
+        page = self.checkpoint + 1
+        while time.monotonic() < deadline:
+            synced, failed, has_more = wizard._import_customer_page(page)
+            self.checkpoint = page
+            self._add_counts(synced, failed)
+            self._log(_('Page %d: %d customers synced, %d failed') % (page, synced, failed))
+            self.env.cr.commit()
+            if not has_more:
+                return True
+            page += 1
+        return False
+
+    def _run_products(self, deadline):
+        wizard = self.env['zid.products.connector'].create({
+            'zid_connector_id': self.run_id.zid_connector_id.id,
+            'import_mode': 'new_and_update',
+            'update_images': True,
+            'update_stock': False,  # Stock is its own stage
+            'state': 'importing',
+            'current_page': self.checkpoint,
+            'error_log': '',
+        })
+        try:
+            has_next = wizard._import_products(deadline)
+        except Exception:
+            self.env.cr.rollback()
+            if wizard.exists():
+                # Keep the last committed page so a resume skips what was imported
+                self.checkpoint = wizard.current_page
+                self.env.cr.commit()
+            raise
+
+        self.checkpoint = wizard.current_page
+        self._add_counts(wizard.imported_count + wizard.updated_count, wizard.error_count)
+        self._log(_('Up to page %d: %d imported, %d updated, %d errors') % (
+            max(wizard.current_page - 1, 0), wizard.imported_count, wizard.updated_count, wizard.error_count))
+        return not has_next
+
+    def _run_orders(self, deadline):
+        """Orders are fetched by a background import job; the stage follows it"""
+        run = self.run_id
+        job = self.import_job_id
+        if not job:
+            job_vals = {
+                'name': _('Bulk Sync Orders - %s') % run.zid_connector_id.app_name,
+                'zid_connector_id': run.zid_connector_id.id,
+                'user_id': run.user_id.id,
+                'import_mode': 'all',
+                'source': 'bulk_sync',
+            }
+            if run.use_date_range:
+                job_vals.update({
+                    'date_from': run.date_from,
+                    'date_to': run.date_to,
+                })
+            self.import_job_id = self.env['zid.import.job'].create(job_vals)
+            self.env.ref('zid_integration.cron_zid_import_jobs').sudo()._trigger()
+            self._log(_('Order import job started'))
+            return False
+
+        if job.state == 'done':
+            self.processed_count = job.total_fetched
+            self._log(_('%d orders queued for processing') % job.total_fetched)
+            return True
+        if job.state in ('failed', 'cancelled'):
+            raise UserError(_('Order import job %s: %s') % (job.state, job.error_message or ''))
+        return False
+
+    def _run_stock(self, deadline):
+        """Refresh variant stock lines in id order; the checkpoint is the last variant id"""
+        connector = self.run_id.zid_connector_id
+        wizard = self.env['zid.variant.connector'].create({
+            'zid_connector_id': connector.id,
+            'operation_type': 'sync_stock',
+        })
+        variants = self.env['zid.variant'].search([
+            ('zid_connector_id', '=', connector.id),
+            ('id', '>', self.checkpoint),
+        ], order='id')
+
+        def sync_stock(variant):
+            variant_data = wizard._fetch_variant_details(variant.zid_variant_id)
+            if not variant_data:
+                raise UserError(_('No data returned for variant %s') % variant.sku)
+            variant._update_stock_lines(variant_data)
+
+        synced, failed = self.env['zid.chunked.transaction']._run_chunked(
+            itertools.takewhile(lambda variant: time.monotonic() < deadline, variants),
+            sync_stock,
+            on_error=self._on_item_error,
+            on_commit=lambda variant: self.write({'checkpoint': variant.id}),
+        )
+        self._add_counts(synced, failed)
+        self._log(_('Stock synced for %d variants (%d failed)') % (synced, failed))
+        return not variants or self.checkpoint >= variants[-1].id
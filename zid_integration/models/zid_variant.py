@@ -173,7 +173,7 @@ class ZidVariant(models.Model):
 
     main_image_url = fields.Char(
         string='Main Image URL',
-        compute='_compute_main_image',
+        compute='_compute_main_image_url',
         store=True
     )
 
@@ -345,10 +345,9 @@ class ZidVariant(models.Model):
             record.size = size
 
     @api.depends('images_data')
-    def _compute_main_image(self):
+    def _compute_main_image_url(self):
         for record in self:
             main_image_url = False
-            main_image_binary = False
 
             if record.images_data:
                 try:
@@ -365,31 +364,20 @@ class ZidVariant(models.Model):
                                 break
                         
                         if isinstance(target_image, dict):
-                            # Handle Zid nested image object
-                            image_obj = target_image.get('image', {})
-                            if isinstance(image_obj, dict):
-                                main_image_url = image_obj.get('full_size') or image_obj.get('large') or image_obj.get('medium')
-                            
-                            # Fallback
-                            if not main_image_url:
-                                main_image_url = target_image.get('url') or target_image.get('thumbnail')
-
-                        # Download image
-                        if main_image_url:
-                            try:
-                                import requests
-                                import base64
-                                response = requests.get(main_image_url, timeout=10)
-                                if response.status_code == 200:
-                                    main_image_binary = base64.b64encode(response.content)
-                            except Exception as e:
-                                _logger.warning(f"Failed to download variant image: {str(e)}")
+                            main_image_url = self.env['zid.product.image']._extract_image_url(target_image) or False
 
                 except Exception as e:
                     _logger.warning(f"Error parsing images: {str(e)}")
 
             record.main_image_url = main_image_url
-            record.main_image = main_image_binary
+
+    @api.depends('main_image_url', 'zid_image_ids.image_url', 'zid_image_ids.image')
+    def _compute_main_image(self):
+        """Pure lookup: the main image is the gallery image downloaded by the image stage"""
+        for record in self:
+            url = record.main_image_url
+            match = record.zid_image_ids.filtered(lambda i, url=url: i.image and i.image_url == url)[:1]
+            record.main_image = match.image
 
     @api.depends('is_published', 'is_draft', 'quantity', 'is_infinite')
     def _compute_availability(self):
@@ -600,50 +588,9 @@ class ZidVariant(models.Model):
             })
 
     def _update_gallery_images(self, variant_data):
-        """Update variant gallery images from API response"""
+        """Update variant gallery images from API response; files are downloaded by the image stage"""
         self.ensure_one()
-        images = variant_data.get('images', [])
-        if not images:
-            return
-
-        # Keep track of existing image IDs
-        existing_zid_ids = self.zid_image_ids.mapped('zid_image_id')
-        
-        # Sort images
-        images = sorted(images, key=lambda x: x.get('display_order', 0))
-
-        image_model = self.env['zid.product.image']
-        import requests
-        import base64
-
-        for img_data in images:
-            zid_img_id = str(img_data.get('id', ''))
-            if not zid_img_id or zid_img_id in existing_zid_ids:
-                continue
-
-            # Get URL
-            image_obj = img_data.get('image', {})
-            img_url = ''
-            if isinstance(image_obj, dict):
-                img_url = image_obj.get('full_size') or image_obj.get('large') or image_obj.get('medium')
-            
-            if not img_url:
-                img_url = img_data.get('url', '') or img_data.get('thumbnail', '')
-
-            if img_url:
-                try:
-                    response = requests.get(img_url, timeout=10)
-                    if response.status_code == 200:
-                        image_binary = base64.b64encode(response.content)
-                        image_model.create({
-                            'variant_id': self.id,
-                            'zid_image_id': zid_img_id,
-                            'image': image_binary,
-                            'image_url': img_url,
-                            'sequence': img_data.get('display_order', 10)
-                        })
-                except Exception as e:
-                    _logger.warning(f"Failed to download variant gallery image {zid_img_id}: {str(e)}")
+        self.env['zid.product.image']._sync_gallery('variant_id', self, variant_data.get('images', []))
 
     @api.model
     def _parse_datetime(self, datetime_str):
@@ -1,6 +1,7 @@
 # models/zid_webhook.py
 import json
 import logging
+from collections import defaultdict
 
 import requests
 from odoo.exceptions import UserError
@@ -73,6 +74,88 @@ class ZidWebhook(models.Model):
         default=0
     )
 
+    stats_event_id = fields.Integer(
+        string='Counted Up To Event',
+        readonly=True,
+        default=0,
+        help='Last inbox event included in Last Triggered and Trigger Count'
+    )
+
+    # Inbox metrics
+    received_count = fields.Integer(
+        string='Deliveries Received',
+        compute='_compute_event_metrics'
+    )
+
+    coalesced_count = fields.Integer(
+        string='Deliveries Coalesced',
+        compute='_compute_event_metrics'
+    )
+
+    collapse_ratio = fields.Float(
+        string='Collapse Ratio',
+        compute='_compute_event_metrics',
+        digits=(16, 2),
+        help='Deliveries received per handler run; 1.0 means nothing was coalesced'
+    )
+
+    def _compute_event_metrics(self):
+        counts = defaultdict(int)
+        for connector, event, state, count in self.env['zid.webhook.event']._read_group(
+            [('zid_connector_id', 'in', self.zid_connector_id.ids), ('event', 'in', self.mapped('event'))],
+            ['zid_connector_id', 'event', 'state'],
+            ['__count'],
+        ):
+            counts[(connector.id, event)] += count
+            if state == 'coalesced':
+                counts[(connector.id, event, 'coalesced')] += count
+
+        for webhook in self:
+            received = counts[(webhook.zid_connector_id.id, webhook.event)]
+            coalesced = counts[(webhook.zid_connector_id.id, webhook.event, 'coalesced')]
+            webhook.received_count = received
+            webhook.coalesced_count = coalesced
+            webhook.collapse_ratio = received / (received - coalesced) if received > coalesced else 0.0
+
+    @api.model
+    def cron_flush_event_stats(self):
+        """Fold deliveries received since the last flush into the webhook counters.
+
+        The request path only appends to the inbox; counters are aggregated
+        here, so concurrent deliveries never update the same webhook row.
+        Events younger than a minute are left for the next flush, so a
+        delivery whose transaction is still open cannot be skipped.
+        """
+        event_model = self.env['zid.webhook.event']
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), minutes=1)
+        last_event_id = event_model.search([('create_date', '<', cutoff)], order='id desc', limit=1).id
+        if not last_event_id:
+            return
+
+        webhooks = self.search([('stats_event_id', '<', last_event_id)])
+        for counted_up_to, group in webhooks.grouped('stats_event_id').items():
+            stats = {
+                (connector.id, event): (count, last_received)
+                for connector, event, count, last_received in event_model._read_group(
+                    [
+                        ('id', '>', counted_up_to),
+                        ('id', '<=', last_event_id),
+                        ('zid_connector_id', 'in', group.zid_connector_id.ids),
+                    ],
+                    ['zid_connector_id', 'event'],
+                    ['__count', 'received_at:max'],
+                )
+            }
+            for webhook in group:
+                count, last_received = stats.get((webhook.zid_connector_id.id, webhook.event), (0, False))
+                vals = {'stats_event_id': last_event_id}
+                if count:
+                    vals.update({
+                        'trigger_count': webhook.trigger_count + count,
+                        'last_triggered': max(filter(None, [webhook.last_triggered, last_received])),
+                    })
+                webhook.write(vals)
+
     @api.depends('event')
     def _compute_webhook_url(self):
         base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
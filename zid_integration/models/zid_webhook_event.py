@@ -0,0 +1,396 @@
+import hashlib
+import hmac
+import json
+import logging
+import time
+
+import psycopg2
+
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+from .zid_payload_mixin import compress_payload
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a single cron run may spend draining the inbox before yielding
+EVENT_TIME_BUDGET = 120
+# Events claimed per batch
+EVENT_BATCH_SIZE = 50
+# Events stuck in processing longer than this (worker died) are picked up again
+EVENT_STALE_MINUTES = 15
+# Events where only the latest delivery per object matters
+COALESCED_EVENTS = ('product.update',)
+
+
+class ZidWebhookEvent(models.Model):
+    """Inbox of received webhook deliveries.
+
+    The webhook routes only validate a delivery and append it here, so Zid
+    gets its answer in a few milliseconds and does not retry under load.
+    The ``cron_zid_webhook_events`` worker drains the inbox in claimed
+    batches and runs the actual product, order and customer handlers.
+    """
+    _name = 'zid.webhook.event'
+    _description = 'Zid Webhook Event'
+    _inherit = ['zid.payload.mixin']
+    _payload_fields = {'payload': 'payload_blob'}
+    _order = 'id desc'
+    _rec_name = 'event'
+
+    zid_connector_id = fields.Many2one(
+        'zid.connector',
+        string='Zid Connector',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        index=True
+    )
+    event = fields.Selection(
+        selection=lambda self: self.env['zid.webhook']._fields['event'].selection,
+        string='Event Type',
+        required=True,
+        readonly=True
+    )
+    dedupe_key = fields.Char(
+        string='Delivery Key',
+        readonly=True,
+        help='Zid event id when sent, else a hash of the event and raw body'
+    )
+    zid_object_id = fields.Char(
+        string='Zid Object ID',
+        readonly=True,
+        help='Id of the product, order or customer the event is about'
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('coalesced', 'Coalesced'),
+        ('failed', 'Failed')
+    ], string='Status', default='pending', required=True, readonly=True)
+    received_at = fields.Datetime(
+        string='Received At',
+        default=fields.Datetime.now,
+        readonly=True
+    )
+    available_at = fields.Datetime(
+        string='Process After',
+        readonly=True,
+        help='The worker leaves the event alone until then'
+    )
+    coalesced_into_id = fields.Many2one(
+        'zid.webhook.event',
+        string='Coalesced Into',
+        readonly=True,
+        ondelete='set null'
+    )
+    coalesced_count = fields.Integer(
+        string='Deliveries Folded In',
+        readonly=True,
+        help='Older deliveries of the same object that this event replaced'
+    )
+    processed_at = fields.Datetime(string='Processed At', readonly=True)
+    attempt_count = fields.Integer(string='Attempts', readonly=True)
+    replay_count = fields.Integer(string='Replays', readonly=True)
+    error_message = fields.Text(string='Error Message', readonly=True)
+    payload = fields.Text(
+        string='Payload',
+        compute='_compute_payloads',
+        inverse='_inverse_payloads'
+    )
+    payload_blob = fields.Binary(
+        string='Payload (Compressed)',
+        attachment=False,
+        prefetch=False,
+        copy=False
+    )
+
+    _sql_constraints = [
+        ('unique_delivery',
+         'UNIQUE(zid_connector_id, dedupe_key)',
+         'This webhook delivery was already received!')
+    ]
+
+    def init(self):
+        # The worker only ever scans pending events in arrival order
+        create_index(self.env.cr, 'zid_webhook_event_pending_index', self._table,
+                     ['id'], where="state = 'pending'")
+        create_index(self.env.cr, 'zid_webhook_event_state_index', self._table, ['state', 'received_at'])
+
+    # ==================== Ingestion (request path) ====================
+
+    @api.model
+    def _ingest(self, event, data, headers, raw_body=b''):
+        """Validate a delivery and append it to the inbox.
+
+        Returns ``(event record or None, error message)``; no handler runs
+        here. A delivery whose key is already in the inbox (Zid retry or
+        re-delivery) is dropped by the unique index and returns no record
+        and no error.
+        """
+        if event not in self._fields['event'].get_values(self.env):
+            return None, f'Unknown event: {event}'
+        if not isinstance(data, dict):
+            return None, 'Invalid payload'
+
+        store_id = data.get('store_id') or data.get('merchant_id') or headers.get('X-Store-Id')
+        if not store_id:
+            return None, 'Missing store_id'
+
+        connector_id, webhook_secret, coalesce_seconds = self.env['zid.connector']._get_webhook_connector(str(store_id))
+        if not connector_id:
+            return None, 'Connector not found'
+
+        # Once a secret is configured, an unsigned delivery is rejected like a forged one
+        if webhook_secret:
+            signature = headers.get('X-Zid-Signature')
+            if not signature:
+                return None, 'Missing signature'
+            expected = hmac.new(webhook_secret.encode(), raw_body, hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(expected, signature):
+                return None, 'Invalid signature'
+
+        now = fields.Datetime.now()
+        object_data = data.get('product') if isinstance(data.get('product'), dict) else data
+        event_id = headers.get('X-Zid-Event-Id') or data.get('event_id')
+        dedupe_key = f'id:{event_id}' if event_id else 'sha256:' + hashlib.sha256(
+            event.encode() + b'\0' + (raw_body or json.dumps(data, sort_keys=True).encode())).hexdigest()
+        # Hold coalesced events for the window so a burst collapses into one sync
+        available_at = fields.Datetime.add(now, seconds=coalesce_seconds) \
+            if event in COALESCED_EVENTS and coalesce_seconds > 0 else now
+
+        # A single INSERT on the hot path; the unique index turns duplicates into a no-op
+        self.env.cr.execute("""
+            INSERT INTO zid_webhook_event
+                (zid_connector_id, event, dedupe_key, zid_object_id, state, received_at, available_at,
+                 attempt_count, replay_count, coalesced_count, payload_blob,
+                 create_uid, write_uid, create_date, write_date)
+            VALUES (%s, %s, %s, %s, 'pending', %s, %s, 0, 0, 0, %s, %s, %s, %s, %s)
+            ON CONFLICT (zid_connector_id, dedupe_key) DO NOTHING
+            RETURNING id
+        """, [
+            connector_id, event, dedupe_key, str(object_data.get('id') or '') or None, now, available_at,
+            psycopg2.Binary(compress_payload(data)), self.env.uid, self.env.uid, now, now,
+        ])
+        row = self.env.cr.fetchone()
+        if not row:
+            _logger.info(f"Duplicate {event} delivery {dedupe_key} ignored")
+            return None, None
+        record = self.browse(row[0])
+
+        # Wake the worker now instead of waiting for its next run
+        self.env.ref('zid_integration.cron_zid_webhook_events').sudo()._trigger()
+        return record, None
+
+    # ==================== Worker ====================
+
+    @api.model
+    def cron_process_events(self, batch_size=EVENT_BATCH_SIZE):
+        """Drain pending events in claimed batches within the time budget"""
+        deadline = time.monotonic() + EVENT_TIME_BUDGET
+        self._release_stale_events()
+
+        while time.monotonic() < deadline:
+            events = self._claim_events(batch_size)
+            if not events:
+                return
+            events._process_events()
+
+        # Out of time with events left: continue right away
+        self.env.ref('zid_integration.cron_zid_webhook_events').sudo()._trigger()
+
+    @api.model
+    def _claim_events(self, limit):
+        """Lock and mark a batch of pending events so concurrent workers skip them"""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT id FROM zid_webhook_event
+             WHERE state = 'pending'
+               AND (available_at IS NULL OR available_at <= now() at time zone 'UTC')
+             ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [limit])
+        events = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if events:
+            events = events._coalesce()
+            events.write({'state': 'processing'})
+            self.env.cr.commit()
+        return events
+
+    def _coalesce(self):
+        """Fold every pending delivery of the same object into its newest one.
+
+        Applies to ``COALESCED_EVENTS``: for each (connector, object) in the
+        batch, the newest pending or claimed delivery is kept, since its
+        payload is the latest state; the others are marked coalesced.
+        Returns the batch to process.
+        """
+        batch = self
+        folded_total = 0
+        groups = self.filtered(lambda e: e.event in COALESCED_EVENTS and e.zid_object_id).grouped(
+            lambda e: (e.zid_connector_id.id, e.event, e.zid_object_id))
+        for (connector_id, event, object_id), claimed in groups.items():
+            # Deliveries still waiting for their window; locked ones belong to another worker
+            self.env.cr.execute("""
+                SELECT id FROM zid_webhook_event
+                 WHERE state = 'pending'
+                   AND zid_connector_id = %s AND event = %s AND zid_object_id = %s
+                   AND id NOT IN %s
+                   FOR UPDATE SKIP LOCKED
+            """, [connector_id, event, object_id, tuple(claimed.ids)])
+            deliveries = claimed | self.browse([row[0] for row in self.env.cr.fetchall()])
+            if len(deliveries) == 1:
+                continue
+
+            latest = deliveries.sorted('id')[-1]
+            folded = deliveries - latest
+            folded.write({'state': 'coalesced', 'coalesced_into_id': latest.id})
+            latest.coalesced_count += len(folded) + sum(folded.mapped('coalesced_count'))
+            batch = (batch - folded) | latest
+            folded_total += len(folded)
+
+        if folded_total:
+            _logger.info(f"Coalesced {folded_total} webhook deliveries, {len(batch)} events left to process")
+        return batch
+
+    @api.model
+    def _release_stale_events(self):
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), minutes=EVENT_STALE_MINUTES)
+        stale = self.search([('state', '=', 'processing'), ('write_date', '<', cutoff)])
+        if stale:
+            _logger.warning(f"Releasing {len(stale)} webhook events stuck in processing")
+            stale.write({'state': 'pending'})
+            self.env.cr.commit()
+
+    def _process_events(self):
+        """Run the handler of every event, each in its own savepoint"""
+        self.env['zid.chunked.transaction']._run_chunked(
+            self,
+            lambda event: event._process_event(),
+            on_error=lambda event, error: event._mark_failed(error),
+        )
+
+    def _process_event(self):
+        handler = getattr(self, '_handle_' + self.event.replace('.', '_'))
+        handler(self.zid_connector_id, json.loads(self.payload or '{}'))
+        self.write({
+            'state': 'done',
+            'processed_at': fields.Datetime.now(),
+            'attempt_count': self.attempt_count + 1,
+            'error_message': False,
+        })
+
+    def _mark_failed(self, error):
+        _logger.error(f"Webhook event {self.id} ({self.event}) failed: {str(error)}")
+        self.write({
+            'state': 'failed',
+            'processed_at': fields.Datetime.now(),
+            'attempt_count': self.attempt_count + 1,
+            'error_message': str(error),
+        })
+
+    def action_retry(self):
+        self.filtered(lambda e: e.state == 'failed').write({'state': 'pending', 'error_message': False})
+        self.env.ref('zid_integration.cron_zid_webhook_events').sudo()._trigger()
+
+    # ==================== Handlers ====================
+
+    def _handle_product_create(self, connector, data):
+        product_data = data.get('product', data)
+        if not product_data.get('id'):
+            _logger.warning("Product webhook missing ID")
+            return
+        self.env['zid.product'].create_or_update_from_zid(product_data, connector.id)
+        _logger.info(f"Product {product_data.get('id')} created/updated via webhook")
+
+    def _handle_product_update(self, connector, data):
+        self._handle_product_create(connector, data)  # Same logic
+
+    def _handle_product_delete(self, connector, data):
+        product_id = str((data.get('product') or data).get('id') or '')
+        if not product_id:
+            return
+
+        # Find and archive product
+        product = self.env['zid.product'].search([
+            ('zid_connector_id', '=', connector.id),
+            ('zid_product_id', '=', product_id)
+        ], limit=1)
+        if product:
+            product.active = False
+            _logger.info(f"Product {product_id} archived via webhook")
+
+    def _handle_order_create(self, connector, data):
+        order_id = data.get('id')
+        if not order_id:
+            _logger.warning("Order create webhook missing ID")
+            return
+
+        _queue, lines = self.env['zid.queue.ept']._enqueue_orders(
+            connector,
+            [data],
+            source='webhook',
+            name=f'Webhook Order {order_id}',
+            priority='realtime',
+        )
+        if not lines:
+            _logger.info(f"Order {order_id} version already queued, ignoring duplicate webhook")
+            return
+
+        _logger.info(f"Order {order_id} queued for processing via webhook")
+        # Processing commits per chunk, so it must not run inside this event's savepoint
+        if connector.auto_process_webhooks:
+            self.env.ref('zid_integration.cron_zid_queue_process').sudo()._trigger()
+
+    def _handle_order_status_update(self, connector, data):
+        order_id = str(data.get('id') or '')
+        new_status = data.get('status')
+        if not order_id or not new_status:
+            return
+
+        order = self.env['zid.sale.order'].search([
+            ('zid_connector_id', '=', connector.id),
+            ('zid_order_id', '=', order_id)
+        ], limit=1)
+        if order:
+            # Validate status against allowed values
+            allowed_statuses = dict(order._fields['order_status'].selection).keys()
+            if new_status in allowed_statuses:
+                order.order_status = new_status
+                _logger.info(f"Order {order_id} status updated to {new_status} via webhook")
+            else:
+                _logger.warning(f"Unknown order status '{new_status}' received for order {order_id}. Skipping update.")
+
+    def _handle_customer_create(self, connector, data):
+        customer_id = data.get('id')
+        if not customer_id:
+            return
+
+        name = data.get('name', 'Guest')
+        email = data.get('email')
+        mobile = data.get('mobile')
+
+        # Find or create partner
+        domain = []
+        if email:
+            domain.append(('email', '=', email))
+        if mobile and not domain:
+            domain.append(('mobile', '=', mobile))
+
+        partner = self.env['res.partner'].search(domain, limit=1) if domain else None
+        if partner:
+            partner.write({
+                'name': name,
+                'email': email or partner.email,
+                'mobile': mobile or partner.mobile,
+            })
+        else:
+            self.env['res.partner'].create({
+                'name': name,
+                'email': email,
+                'mobile': mobile,
+                'customer_rank': 1,
+            })
+        _logger.info(f"Customer {customer_id} created/updated via webhook")
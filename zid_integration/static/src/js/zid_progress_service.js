@@ -0,0 +1,30 @@
+/** @odoo-module */
+
+import { registry } from "@web/core/registry";
+
+// Bus notification type -> models whose views show that progress
+const PROGRESS_CHANNELS = {
+    "zid_integration/import_job": ["zid.import.job"],
+    "zid_integration/sync_run": ["zid.sync.run"],
+};
+
+/**
+ * Background jobs push their progress to the requesting user through the bus.
+ * When the current view belongs to one of the notified models it is reloaded,
+ * so job and run views follow the work without pressing Refresh.
+ */
+export const zidProgressService = {
+    dependencies: ["bus_service", "action"],
+    start(env, { bus_service, action }) {
+        for (const [channel, models] of Object.entries(PROGRESS_CHANNELS)) {
+            bus_service.subscribe(channel, () => {
+                const controller = action.currentController;
+                if (controller && models.includes(controller.props.resModel)) {
+                    action.doAction("soft_reload");
+                }
+            });
+        }
+    },
+};
+
+registry.category("services").add("zid_progress", zidProgressService);
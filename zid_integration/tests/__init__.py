@@ -0,0 +1,4 @@
+from . import test_webhook_inbox
+from . import test_variant_images
+from . import test_order_migration
+from . import test_webhook_benchmark
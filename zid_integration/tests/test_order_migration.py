@@ -0,0 +1,62 @@
+import importlib.util
+import os
+
+from odoo.tests import TransactionCase, tagged
+
+
+def _load_pre_migration():
+    path = os.path.join(os.path.dirname(__file__), '..', 'migrations', '18.0.1.1.0', 'pre-migrate.py')
+    spec = importlib.util.spec_from_file_location('zid_integration_pre_migrate_18_0_1_1_0', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@tagged('post_install', '-at_install')
+class TestOrderDedupeMigration(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.connector = cls.env['zid.connector'].create({
+            'app_name': 'Test Store',
+            'license_key': 'TEST-LICENSE',
+            'store_id': '1003',
+        })
+        cls.reason = cls.env['zid.reverse.reason'].create({
+            'zid_connector_id': cls.connector.id,
+            'zid_reason_id': 'R-1',
+            'name': 'Damaged',
+        })
+        cls.partner = cls.env['res.partner'].create({'name': 'Zid Customer'})
+
+    def test_references_of_duplicates_survive(self):
+        # Recreate the pre-upgrade state, where the unique index did not exist yet
+        self.env.cr.execute("ALTER TABLE zid_sale_order DROP CONSTRAINT IF EXISTS zid_sale_order_unique_zid_order")
+        older, newer = self.env['zid.sale.order'].create([{
+            'zid_connector_id': self.connector.id,
+            'zid_order_id': 7001,
+            'order_code': 'ZID-7001',
+        }] * 2)
+        reverse = self.env['zid.reverse.order'].create({
+            'zid_connector_id': self.connector.id,
+            'zid_order_id': older.id,
+            'consignee_name': 'Zid Customer',
+            'consignee_mobile': '0500000000',
+            'consignee_city_id': 1,
+            'consignee_address_1': 'Street 1',
+            'reverse_reason_id': self.reason.id,
+        })
+        sale_order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'zid_order_id': older.id,
+        })
+        self.env.flush_all()
+
+        _load_pre_migration()._dedupe_zid_orders(self.env.cr)
+        self.env.invalidate_all()
+
+        self.assertFalse(older.exists())
+        self.assertTrue(reverse.exists(), "The reverse order of a duplicate must not be cascaded away")
+        self.assertEqual(reverse.zid_order_id, newer)
+        self.assertEqual(sale_order.zid_order_id, newer)
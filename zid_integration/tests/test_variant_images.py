@@ -0,0 +1,98 @@
+import json
+from unittest.mock import patch
+
+from lxml import etree
+from odoo.tests import TransactionCase, tagged
+
+# 1x1 transparent PNG
+PIXEL = b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=='
+IMAGE_URL = 'https://media.zid.store/variant-red.png'
+
+
+@tagged('post_install', '-at_install')
+class TestVariantImages(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.connector = cls.env['zid.connector'].create({
+            'app_name': 'Test Store',
+            'license_key': 'TEST-LICENSE',
+            'store_id': '1002',
+        })
+        cls.product = cls.env['zid.product'].create({
+            'zid_connector_id': cls.connector.id,
+            'zid_product_id': 'P-1',
+            'name': 'Frame',
+            'main_image_url': IMAGE_URL,
+            'main_image_state': 'pending',
+        })
+
+    def setUp(self):
+        super().setUp()
+        # Any HTTP call made through requests or urllib fails the test
+        self.session_request = self.startPatcher(
+            patch('requests.Session.request', side_effect=AssertionError('network I/O')))
+        self.urlopen = self.startPatcher(
+            patch('urllib.request.urlopen', side_effect=AssertionError('network I/O')))
+
+    def _assert_offline(self):
+        self.session_request.assert_not_called()
+        self.urlopen.assert_not_called()
+
+    def _create_variant(self, images):
+        return self.env['zid.variant'].create({
+            'zid_connector_id': self.connector.id,
+            'zid_variant_id': 'V-1',
+            'parent_product_id': self.product.id,
+            'sku': 'FRAME-RED',
+            'images_data': json.dumps(images),
+        })
+
+    def _read_view_fields(self, records):
+        """Read every field the list and form views of ``records`` display"""
+        for view_type in ('list', 'form'):
+            arch = records.get_view(view_type=view_type)['arch']
+            names = {node.get('name') for node in etree.fromstring(arch).iter('field')}
+            records.invalidate_recordset()
+            records.read([name for name in names if name in records._fields])
+
+    def test_main_image_never_downloads(self):
+        variant = self._create_variant([{'id': 'I-1', 'image': {'full_size': IMAGE_URL}, 'is_default': True}])
+        self.assertEqual(variant.main_image_url, IMAGE_URL)
+        self.assertFalse(variant.main_image, "Nothing is downloaded while the gallery image is pending")
+
+        self.env['zid.product.image'].create({
+            'variant_id': variant.id,
+            'image_url': IMAGE_URL,
+            'image': PIXEL,
+        })
+        self.assertTrue(variant.main_image, "The main image is taken from the downloaded gallery image")
+
+        variant.invalidate_recordset(['main_image'])
+        variant._compute_main_image()
+        self.assertTrue(variant.main_image)
+        self._assert_offline()
+
+    def test_views_never_download(self):
+        variant = self._create_variant([{'id': 'I-1', 'image': {'full_size': IMAGE_URL}}])
+        self.env['zid.product.image']._sync_gallery('variant_id', variant, [
+            {'id': 'I-1', 'image': {'full_size': IMAGE_URL}},
+        ])
+
+        self._read_view_fields(self.product)
+        self._read_view_fields(variant)
+        self._assert_offline()
+
+    def test_gallery_entry_without_id_resolves_main_image(self):
+        images = [{'image': {'full_size': IMAGE_URL}, 'is_default': True}]
+        variant = self._create_variant(images)
+        Image = self.env['zid.product.image']
+
+        Image._sync_gallery('variant_id', variant, images)
+        Image._sync_gallery('variant_id', variant, images)
+        self.assertEqual(len(variant.zid_image_ids), 1, "An entry without id is matched on its URL")
+
+        variant.zid_image_ids.write({'image': PIXEL, 'state': 'done'})
+        self.assertTrue(variant.main_image)
+        self._assert_offline()
@@ -0,0 +1,89 @@
+import logging
+import time
+
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+# Deliveries sent through each path
+DELIVERIES = 50
+
+
+@tagged('post_install', '-at_install', 'zid_benchmark')
+class TestWebhookBenchmark(TransactionCase):
+    """Old inline order handling against the inbox endpoint.
+
+    The inline path is what the webhook route used to do in the request:
+    queue the order and process the queue right away. The inbox path is
+    what the route does now: one ``_ingest`` per delivery.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.connector = cls.env['zid.connector'].create({
+            'app_name': 'Benchmark Store',
+            'license_key': 'TEST-LICENSE',
+            'store_id': '1004',
+            'auto_create_sale_order': False,
+        })
+
+    def setUp(self):
+        super().setUp()
+        # Queue processing commits per chunk; keep everything inside the test transaction
+        self.patch(type(self.env.cr), 'commit', lambda cr: None)
+
+    def _order_payload(self, order_id):
+        return {
+            'id': order_id,
+            'store_id': '1004',
+            'code': f'ZID-{order_id}',
+            'created_at': '2024-05-01 10:00:00',
+            'updated_at': '2024-05-01 10:00:00',
+            'order_status': {'code': 'new'},
+            'customer': {'name': 'Zid Customer', 'email': f'customer{order_id}@example.com'},
+            'products': [{'id': 'P-1', 'sku': 'FRAME-RED', 'name': 'Frame', 'quantity': 1, 'price': 100}],
+            'order_total': 100,
+        }
+
+    def _count_order_work(self):
+        return (
+            self.env['zid.sale.order'].search_count([('zid_connector_id', '=', self.connector.id)]),
+            self.env['zid.queue.line.ept'].search_count([('queue_id.zid_connector_id', '=', self.connector.id)]),
+            self.env['sale.order'].search_count([]),
+        )
+
+    def _run_inline(self, payloads):
+        Queue = self.env['zid.queue.ept']
+        start = time.perf_counter()
+        for data in payloads:
+            queue, lines = Queue._enqueue_orders(self.connector, [data], source='webhook', priority='realtime')
+            if lines:
+                queue.action_process()
+        self.env.flush_all()
+        return time.perf_counter() - start
+
+    def _run_inbox(self, payloads):
+        Event = self.env['zid.webhook.event']
+        start = time.perf_counter()
+        for data in payloads:
+            event, error = Event._ingest('order.create', data, {'X-Zid-Event-Id': f"bench-{data['id']}"})
+            self.assertTrue(event, error)
+        self.env.flush_all()
+        return time.perf_counter() - start
+
+    def test_inbox_against_inline_handlers(self):
+        inline_elapsed = self._run_inline([self._order_payload(8000 + i) for i in range(DELIVERIES)])
+
+        before = self._count_order_work()
+        inbox_elapsed = self._run_inbox([self._order_payload(9000 + i) for i in range(DELIVERIES)])
+
+        self.assertEqual(self._count_order_work(), before, "The inbox request must not do any order work")
+        self.assertEqual(
+            self.env['zid.webhook.event'].search_count([
+                ('zid_connector_id', '=', self.connector.id), ('state', '=', 'pending')]),
+            DELIVERIES)
+        _logger.info(
+            f"Webhook benchmark, {DELIVERIES} order deliveries: inline handlers {inline_elapsed * 1000:.0f} ms "
+            f"({inline_elapsed / DELIVERIES * 1000:.1f} ms each), inbox {inbox_elapsed * 1000:.0f} ms "
+            f"({inbox_elapsed / DELIVERIES * 1000:.1f} ms each)")
@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+import json
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestWebhookInbox(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.connector = cls.env['zid.connector'].create({
+            'app_name': 'Test Store',
+            'license_key': 'TEST-LICENSE',
+            'store_id': '1001',
+        })
+        cls.Event = cls.env['zid.webhook.event']
+        cls.order_data = {
+            'id': 5001,
+            'store_id': '1001',
+            'code': 'ZID-5001',
+            'updated_at': '2024-05-01 10:00:00',
+        }
+
+    def setUp(self):
+        super().setUp()
+        # The worker commits per chunk; keep everything inside the test transaction
+        self.patch(type(self.env.cr), 'commit', lambda cr: None)
+
+    def _order_lines(self):
+        return self.env['zid.queue.line.ept'].search([
+            ('queue_id.zid_connector_id', '=', self.connector.id),
+            ('zid_id', '=', str(self.order_data['id'])),
+        ])
+
+    def test_duplicate_delivery_is_dropped(self):
+        headers = {'X-Zid-Event-Id': 'evt-1'}
+        event, error = self.Event._ingest('order.create', self.order_data, headers)
+        self.assertTrue(event)
+        self.assertFalse(error)
+
+        duplicate, error = self.Event._ingest('order.create', self.order_data, headers)
+        self.assertFalse(duplicate)
+        self.assertFalse(error)
+        self.assertEqual(self.Event.search_count([('zid_connector_id', '=', self.connector.id)]), 1)
+
+    def test_redelivered_order_is_queued_once(self):
+        first, _error = self.Event._ingest('order.create', self.order_data, {'X-Zid-Event-Id': 'evt-1'})
+        second, _error = self.Event._ingest('order.create', self.order_data, {'X-Zid-Event-Id': 'evt-2'})
+        events = first | second
+        self.assertEqual(len(events), 2)
+
+        events._process_events()
+
+        self.assertEqual(events.mapped('state'), ['done', 'done'])
+        lines = self._order_lines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines.state, 'draft', "The handler only queues the order, the queue worker processes it")
+        self.assertEqual(lines.queue_id.priority, 'realtime')
+
+    def test_unsigned_delivery_rejected_when_secret_set(self):
+        self.connector.webhook_secret = 'shared-secret'
+        raw_body = json.dumps(self.order_data).encode()
+
+        event, error = self.Event._ingest('order.create', self.order_data, {}, raw_body)
+        self.assertFalse(event)
+        self.assertEqual(error, 'Missing signature')
+
+        event, error = self.Event._ingest('order.create', self.order_data, {'X-Zid-Signature': 'forged'}, raw_body)
+        self.assertFalse(event)
+        self.assertEqual(error, 'Invalid signature')
+
+        signature = hmac.new(b'shared-secret', raw_body, hashlib.sha256).hexdigest()
+        event, error = self.Event._ingest('order.create', self.order_data, {'X-Zid-Signature': signature}, raw_body)
+        self.assertTrue(event)
+        self.assertFalse(error)
@@ -23,3 +23,4 @@ from . import zid_automation_wizard
 from . import zid_payment_mapping_wizard
 from . import zid_sales_team_wizard
 from . import zid_health_report_wizard
+from . import zid_webhook_replay_wizard
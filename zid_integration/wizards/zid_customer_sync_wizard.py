@@ -32,51 +32,21 @@ class ZidCustomerSyncWizard(models.TransientModel):
 
     def _import_customers(self):
         """Import customers from Zid API"""
-        connector = self.zid_connector_id
-        
-        # Prepare params
         page = 1
-        per_page = 50
         total_synced = 0
         total_failed = 0
         
         while True:
-            params = {
-                'page': page,
-                'per_page': per_page
-            }
-            # Note: Zid API might use different filters
-            
             try:
-                # Call Proxy/Zid API
-                response = connector.api_request(
-                    endpoint='managers/store/customers',
-                    method='GET',
-                    data=params # GET params
-                )
-                
-                customers = response.get('customers', []) if response else []
-                
-                if not customers:
-                    break
-                    
-                for cust_data in customers:
-                    try:
-                        self._create_or_update_partner(cust_data)
-                        total_synced += 1
-                    except Exception as e:
-                        _logger.error(f"Failed to sync customer {cust_data.get('id')}: {str(e)}")
-                        total_failed += 1
-                
-                # Check pagination
-                pagination = response.get('pagination', {})
-                if page >= pagination.get('total_pages', 1):
-                    break
-                    
-                page += 1
-                
+                synced, failed, has_more = self._import_customer_page(page)
             except Exception as e:
                 raise UserError(_('API Error: %s') % str(e))
+
+            total_synced += synced
+            total_failed += failed
+            if not has_more:
+                break
+            page += 1
                 
         return {
             'type': 'ir.actions.client',
@@ -88,6 +58,36 @@ class ZidCustomerSyncWizard(models.TransientModel):
             }
         }
 
+    def _import_customer_page(self, page, per_page=50):
+        """Import one page of customers; returns ``(synced, failed, has_more)``"""
+        params = {
+            'page': page,
+            'per_page': per_page
+        }
+        # Note: Zid API might use different filters
+
+        # Call Proxy/Zid API
+        response = self.zid_connector_id.api_request(
+            endpoint='managers/store/customers',
+            method='GET',
+            data=params # GET params
+        )
+
+        customers = response.get('customers', []) if response else []
+        if not customers:
+            return 0, 0, False
+
+        synced, failed = self.env['zid.chunked.transaction']._run_chunked(
+            customers,
+            self._create_or_update_partner,
+            on_error=lambda cust_data, e: _logger.error(
+                f"Failed to sync customer {cust_data.get('id')}: {str(e)}"),
+        )
+
+        # Check pagination
+        pagination = response.get('pagination', {})
+        return synced, failed, page < pagination.get('total_pages', 1)
+
     def _create_or_update_partner(self, data):
         """Create or update Odoo partner from Zid customer data"""
         partner_obj = self.env['res.partner']
@@ -2,6 +2,7 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 
 _logger = logging.getLogger(__name__)
@@ -102,7 +103,8 @@ class ZidProductsConnector(models.TransientModel):
     current_page = fields.Integer(
         string='Current Page',
         default=0,
-        readonly=True
+        readonly=True,
+        help='Next page to import; an interrupted import resumes from here'
     )
 
     total_pages = fields.Integer(
@@ -220,6 +222,20 @@ class ZidProductsConnector(models.TransientModel):
         # Commit the wizard state
         self.env.cr.commit()
 
+        return self._run_import()
+
+    def action_resume_import(self):
+        """Continue a failed import from the last committed page"""
+        self.ensure_one()
+        self.write({
+            'state': 'importing',
+            'progress_text': _('Resuming import from page %d...') % max(self.current_page, 1),
+        })
+        self.env.cr.commit()
+        return self._run_import()
+
+    def _run_import(self):
+        """Run the import from the current page and report the outcome"""
         try:
             # Start import
             self._import_products()
@@ -253,11 +269,16 @@ class ZidProductsConnector(models.TransientModel):
             'target': 'new',
         }
 
-    def _import_products(self):
-        """Main import logic"""
+    def _import_products(self, deadline=None):
+        """Main import logic.
+
+        With a ``deadline`` (``time.monotonic()`` value) the import stops
+        between pages once it passes; returns whether pages are left.
+        """
         self.ensure_one()
 
-        page = 1
+        # current_page is the resume cursor; a fresh import resets it to 0
+        page = max(self.current_page, 1)
         total_fetched = 0
         has_next = True
 
@@ -276,6 +297,11 @@ class ZidProductsConnector(models.TransientModel):
                 _logger.info(f"Reached maximum pages limit: {self.max_pages}")
                 break
 
+            if deadline and time.monotonic() >= deadline:
+                # Resume from the next unprocessed page
+                self.write({'current_page': page})
+                break
+
             # Update progress
             self.write({
                 'current_page': page,
@@ -299,17 +325,14 @@ class ZidProductsConnector(models.TransientModel):
                     has_next = False
                     break
 
-                # Process products
-                for product_data in products_list:
-                    try:
-                        self._process_single_product(product_data)
-                        # Product is committed inside create_or_update_from_zid
-                    except Exception as e:
-                        _logger.error(f"Error processing product {product_data.get('id')}: {str(e)}")
-                        self.error_log += f"\nProduct {product_data.get('id')}: {str(e)}"
-                        self.error_count += 1
-
-                    total_fetched += 1
+                # Upsert the page in one go; once it is committed a resume starts at the next page
+                self.env['zid.chunked.transaction']._run_chunked(
+                    [products_list],
+                    self._upsert_page,
+                    on_error=lambda products, error, page=page: self._on_page_error(products, error, page),
+                    on_commit=lambda products, page=page: self.write({'current_page': page + 1}),
+                )
+                total_fetched += len(products_list)
 
                 # Check for next page
                 if isinstance(response, dict):
@@ -341,6 +364,108 @@ class ZidProductsConnector(models.TransientModel):
                     page += 1  # Continue with next page
 
         _logger.info(f"Import completed. Total fetched: {total_fetched}")
+        return has_next
+
+    def _upsert_page(self, products_list):
+        """Create and update a page of products in bulk.
+
+        Existing products are looked up with one query, new ones are created
+        with one ``create`` call, and updates are written once per group of
+        identical values. Location, gallery and category side effects then
+        run over the whole page.
+        """
+        product_model = self.env['zid.product']
+        connector_id = self.zid_connector_id.id
+        skipped = 0
+
+        # Last occurrence wins when a page repeats a product
+        page_products = {}
+        for product_data in products_list:
+            product_id = str(product_data.get('id', ''))
+            if not product_id or self._should_skip_product(product_data):
+                skipped += 1
+                continue
+            if product_id in page_products:
+                skipped += 1
+            page_products[product_id] = product_data
+
+        existing = {
+            product.zid_product_id: product
+            for product in product_model.search([
+                ('zid_product_id', 'in', list(page_products)),
+                ('zid_connector_id', '=', connector_id)
+            ])
+        }
+
+        to_create, to_update = [], []
+        for product_id, product_data in page_products.items():
+            product = existing.get(product_id)
+            if product and self.import_mode in ['update', 'new_and_update']:
+                to_update.append((product, product_data))
+            elif not product and self.import_mode in ['all', 'new', 'new_and_update']:
+                to_create.append(product_data)
+            else:
+                skipped += 1
+
+        created = product_model
+        if to_create:
+            category_map = product_model._get_category_map(to_create, connector_id)
+            created = product_model.create([
+                product_model._prepare_product_values(product_data, connector_id, category_map)
+                for product_data in to_create
+            ])
+        for update_vals, products in self._group_update_values(to_update):
+            products.write(update_vals)
+
+        # Side effects: new products get everything, updated ones what the update settings allow
+        new_pairs = list(zip(created, to_create, strict=True))
+        product_model._sync_location_lines(new_pairs + (to_update if self.update_stock else []))
+        self.env['zid.product.image']._sync_galleries('product_id', [
+            (product, product_data.get('images', []))
+            for product, product_data in new_pairs + (to_update if self.update_images else [])
+        ])
+
+        self.write({
+            'imported_count': self.imported_count + len(created),
+            'updated_count': self.updated_count + len(to_update),
+            'skipped_count': self.skipped_count + skipped,
+        })
+        self.progress_text = _('Processed %d products...') % (
+            self.imported_count + self.updated_count + self.skipped_count)
+        _logger.info(f"Upserted page: {len(created)} created, {len(to_update)} updated, {skipped} skipped")
+
+    def _group_update_values(self, to_update):
+        """Group ``(product, product_data)`` pairs by their update values.
+
+        Returns ``[(update_vals, products)]``: products receiving identical
+        values (same prices, stock, image...) share a single ``write``.
+        """
+        groups = {}
+        for product, product_data in to_update:
+            update_vals = self._prepare_update_values(product, product_data)
+            key = json.dumps(update_vals, sort_keys=True, default=str)
+            if key in groups:
+                groups[key][1] |= product
+            else:
+                groups[key] = [update_vals, product]
+        return list(groups.values())
+
+    def _on_page_error(self, products_list, error, page):
+        """The bulk upsert failed (and was rolled back): redo the page product by product"""
+        _logger.warning(f"Bulk upsert of page {page} failed, retrying product by product: {str(error)}")
+        self.env['zid.chunked.transaction']._run_chunked(
+            products_list,
+            self._process_single_product,
+            on_error=self._on_product_error,
+            # A commit in the middle of the page keeps it as the resume point
+            on_commit=lambda product_data: self.write({'current_page': page}),
+        )
+
+    def _on_product_error(self, product_data, error):
+        """Record a product that failed to import (its savepoint is already rolled back)"""
+        _logger.error(f"Error processing product {product_data.get('id')}: {str(error)}")
+        self.error_log += f"\nProduct {product_data.get('id')}: {str(error)}"
+        self.error_count += 1
 
     def _extract_products_from_response(self, response):
         """Extract products list from API response"""
@@ -437,6 +562,14 @@ class ZidProductsConnector(models.TransientModel):
 
     def _update_product(self, product, product_data):
         """Update existing product based on settings"""
+        product.write(self._prepare_update_values(product, product_data))
+        
+        # Update location lines after updating product
+        if self.update_stock:
+            product._update_location_lines(product_data)
+
+    def _prepare_update_values(self, product, product_data):
+        """Values refreshing an existing product, limited by the update settings"""
         update_vals = {}
 
         # Always update basic info
@@ -467,8 +600,7 @@ class ZidProductsConnector(models.TransientModel):
         if self.update_images:
             images = product_data.get('images', [])
             main_image_url = ''
-            main_image_binary = False
-            
+
             if images and isinstance(images, list):
                 # Sort by display order
                 images = sorted(images, key=lambda x: x.get('display_order', 0))
@@ -483,22 +615,9 @@ class ZidProductsConnector(models.TransientModel):
                     if not main_image_url:
                         main_image_url = first_image.get('url', '') or first_image.get('thumbnail', '')
 
-                # Download image
-                if main_image_url:
-                    try:
-                        import requests
-                        import base64
-                        response = requests.get(main_image_url, timeout=10)
-                        if response.status_code == 200:
-                            main_image_binary = base64.b64encode(response.content)
-                    except Exception as e:
-                        _logger.warning(f"Failed to download image: {str(e)}")
-
-            update_vals.update({
-                'main_image_url': main_image_url,
-                'main_image': main_image_binary,
-                'images_data': json.dumps(images, ensure_ascii=False),
-            })
+            # The file itself is downloaded by the image stage
+            update_vals.update(product._prepare_main_image_values(main_image_url, self.zid_connector_id))
+            update_vals['images_data'] = json.dumps(images, ensure_ascii=False)
 
         # Always update sync date and raw response
         update_vals.update({
@@ -506,12 +625,7 @@ class ZidProductsConnector(models.TransientModel):
             'raw_response': json.dumps(product_data, ensure_ascii=False),
             'zid_updated_at': product_data.get('updated_at'),
         })
-
-        product.write(update_vals)
-        
-        # Update location lines after updating product
-        if self.update_stock:
-            product._update_location_lines(product_data)
+        return update_vals
 
     def _generate_summary(self):
         """Generate import summary HTML"""
@@ -543,7 +657,7 @@ class ZidProductsConnector(models.TransientModel):
                         </tr>
                         <tr>
                             <td><strong>Pages Processed:</strong></td>
-                            <td>{self.current_page}</td>
+                            <td>{max(self.current_page - 1, 0)}</td>
                         </tr>
                     </tbody>
                 </table>
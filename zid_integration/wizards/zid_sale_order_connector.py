@@ -3,6 +3,7 @@ from odoo.exceptions import UserError
 import json
 import logging
 from datetime import datetime, timedelta
+from itertools import pairwise
 
 _logger = logging.getLogger(__name__)
 
@@ -58,8 +59,17 @@ class ZidSaleOrderConnector(models.TransientModel):
     import_mode = fields.Selection([
         ('new', 'Import New Orders Only'),
         ('update', 'Update Existing Orders'),
-        ('all', 'Import All Orders')
-    ], string='Import Mode', default='new', required=True)
+        ('all', 'Import All Orders'),
+        ('incremental', 'Incremental (Changed Since Last Sync)')
+    ], string='Import Mode', default='new', required=True,
+       help='Incremental imports only orders updated after the connector watermark and '
+            'advances the watermark once every page has been queued.')
+
+    import_source = fields.Char(
+        string='Import Source',
+        default='wizard',
+        help='Path recorded on the idempotency keys of queued orders (wizard, cron, bulk_sync)'
+    )
 
     order_ids = fields.Text(
         string='Specific Order IDs',
@@ -89,6 +99,10 @@ class ZidSaleOrderConnector(models.TransientModel):
     # Error tracking
     error_message = fields.Text(string='Error Message', readonly=True)
 
+    # Newest order seen during this run, used to advance the connector watermark
+    watermark_updated_at = fields.Datetime(string='Newest Update Seen', readonly=True)
+    watermark_order_id = fields.Integer(string='Newest Order Seen', readonly=True)
+
     @api.model
     def default_get(self, fields_list):
         res = super().default_get(fields_list)
@@ -99,10 +113,16 @@ class ZidSaleOrderConnector(models.TransientModel):
             else:
                 connector = connector_id
             
-            if connector.order_import_start_date:
-                res['date_from'] = connector.order_import_start_date
+            if connector:
+                res['date_from'] = connector._get_order_sync_window_start()
         return res
 
+    @api.onchange('import_mode')
+    def _onchange_import_mode(self):
+        if self.import_mode == 'incremental' and self.zid_connector_id:
+            self.date_from = self.zid_connector_id._get_order_sync_window_start()
+            self.date_to = False
+
     @api.model
     def _get_default_connector(self):
         """Get default active connector"""
@@ -137,179 +157,199 @@ class ZidSaleOrderConnector(models.TransientModel):
         if self.order_ids:
             params['order_id'] = self.order_ids.replace(' ', '')
 
+        # Newest changes first, so paging can stop at the first order older than date_from
+        params['sort_by'] = 'updated_at'
+        params['sort_order'] = 'desc'
+
         return params
 
-    def action_start_import(self):
-        """Initialize import process"""
+    def _fetch_orders_page(self, page):
+        """Fetch one page of orders and keep those inside the date window.
+
+        Returns a tuple ``(orders, has_more)``. Paging stops early once a page
+        contains an order older than ``date_from``, but only when that page
+        really is sorted by ``updated_at`` descending: the API may ignore
+        ``sort_by``, in which case every page is read.
+        """
         self.ensure_one()
-        
-        # Reset progress (but don't create queue yet - only when we have data)
+        connector = self.zid_connector_id
+        params = self._prepare_api_params()
+        params.update({
+            'page': page,
+            'per_page': self.page_size
+        })
+
+        result = connector.call_proxy_api('/api/zid/fetch-orders', params)
+        if not result.get('success'):
+            error = result.get('error', 'Unknown error')
+            raise UserError(_('Proxy error: %s') % error)
+
+        raw_orders = result.get('orders', [])
+        has_more = len(raw_orders) >= self.page_size
+
+        if not (self.date_from or self.date_to):
+            return raw_orders, has_more
+
+        # Client-side date filtering (since Zid API may not respect date parameters)
+        orders = []
+        reached_older = False
+        page_dates = []
+        for order in raw_orders:
+            updated_at_str = order.get('updated_at') or order.get('created_at')
+            if not updated_at_str:
+                continue
+
+            updated_at = connector._parse_zid_datetime(updated_at_str)
+            if not updated_at:
+                _logger.warning(f"Could not parse updated_at/created_at for order {order.get('id')}: {updated_at_str}")
+                # Include order if we can't parse the date
+                orders.append(order)
+                continue
+
+            page_dates.append(updated_at)
+            if self.date_from and updated_at < self.date_from:
+                reached_older = True
+                continue
+            if self.date_to and updated_at > self.date_to:
+                continue
+            orders.append(order)
+
+        if reached_older and all(newer >= older for newer, older in pairwise(page_dates)):
+            has_more = False
+        _logger.info(f"Filtered {len(raw_orders)} orders to {len(orders)} within modification date range")
+        return orders, has_more
+
+    def _filter_orders_to_enqueue(self, orders):
+        """Apply the import mode against what is already stored in Odoo.
+
+        Existing orders are read in one query for the whole page. In incremental
+        mode, orders whose stored ``zid_updated_at`` is not older than the
+        incoming one were already applied (overlap window) and are skipped.
+        """
+        self.ensure_one()
+        if self.import_mode == 'all' or not orders:
+            return orders
+
+        order_ids = [int(order['id']) for order in orders if order.get('id')]
+        existing = {
+            rec['zid_order_id']: rec['zid_updated_at']
+            for rec in self.env['zid.sale.order'].search_read([
+                ('zid_connector_id', '=', self.zid_connector_id.id),
+                ('zid_order_id', 'in', order_ids),
+            ], ['zid_order_id', 'zid_updated_at'])
+        }
+
+        filtered = []
+        for order in orders:
+            zid_id = int(order.get('id') or 0)
+            if self.import_mode == 'new' and zid_id in existing:
+                continue
+            if self.import_mode == 'update' and zid_id not in existing:
+                continue
+            if self.import_mode == 'incremental' and zid_id in existing:
+                stored = existing[zid_id]
+                incoming = self.zid_connector_id._parse_zid_datetime(order.get('updated_at'))
+                if stored and incoming and stored >= incoming:
+                    continue
+            filtered.append(order)
+        return filtered
+
+    def _track_watermark(self, orders):
+        """Remember the newest (updated_at, id) fetched in this run"""
+        self.ensure_one()
+        connector = self.zid_connector_id
+        best = (self.watermark_updated_at or datetime.min, self.watermark_order_id)
+        for order in orders:
+            updated_at = connector._parse_zid_datetime(order.get('updated_at') or order.get('created_at'))
+            if updated_at:
+                best = max(best, (updated_at, int(order.get('id') or 0)))
+        if best[0] != datetime.min:
+            self.write({'watermark_updated_at': best[0], 'watermark_order_id': best[1]})
+
+    def _enqueue_orders(self, orders):
+        """Create queue lines for a page of orders, creating the queue on first use"""
+        self.ensure_one()
+        if not orders:
+            return 0
+
+        # The queue is only created with the first batch that has new order versions
+        queue, lines = self.env['zid.queue.ept']._enqueue_orders(
+            self.zid_connector_id,
+            orders,
+            queue=self.current_queue_id,
+            source=self.import_source,
+            # Update and All modes are explicit requests to re-import orders already seen
+            force=self.import_mode in ('update', 'all'),
+            priority='normal' if self.import_mode == 'incremental' else 'backfill',
+            name=_('Order Import - %s') % fields.Datetime.now(),
+        )
+        if queue != self.current_queue_id:
+            self.current_queue_id = queue.id
+        return len(lines)
+
+    def _run_incremental_import(self):
+        """Fetch every changed page server-side in one go (used by the scheduler)"""
+        self.ensure_one()
+        connector = self.zid_connector_id
         self.write({
+            'import_mode': 'incremental',
+            'date_from': connector._get_order_sync_window_start(),
+            'date_to': False,
             'state': 'importing',
             'current_page': 1,
             'total_fetched': 0,
-            'progress_text': _('Starting import...\n'),
+            'progress_text': '',
             'error_message': False,
-            'current_queue_id': False,  # No queue yet
+            'current_queue_id': False,
         })
-        
-        # Commit to save initialization
-        self.env.cr.commit()
-        
-        # Start batch processing
-        return self.action_process_batch()
 
-    def action_process_batch(self):
-        """Process a single batch (page) and return action to continue"""
-        self.ensure_one()
-        
-        if self.state != 'importing':
-            return
-            
-        try:
-            params = self._prepare_api_params()
-            params.update({
-                'page': self.current_page,
-                'per_page': self.page_size
-            })
-
-            self._update_progress(_('Fetching page %d...') % self.current_page)
-            
-            # Fetch from Proxy
-            result = self.zid_connector_id.call_proxy_api(
-                '/api/zid/fetch-orders',
-                params
-            )
-
-            if not result.get('success'):
-                error = result.get('error', 'Unknown error')
-                raise UserError(_('Proxy error: %s') % error)
-
-            orders = result.get('orders', [])
-            
-            # Client-side date filtering (since Zid API may not respect date parameters)
-            if self.date_from or self.date_to:
-                filtered_orders = []
-                for order in orders:
-                    updated_at_str = order.get('updated_at')
-                    if not updated_at_str:
-                        # Fallback to created_at if updated_at is missing
-                        updated_at_str = order.get('created_at')
-                    
-                    if not updated_at_str:
-                        continue
-                    
-                    try:
-                        # Parse Zid's datetime format: "2025-12-28 13:41:16"
-                        from datetime import datetime
-                        updated_at = datetime.strptime(updated_at_str, '%Y-%m-%d %H:%M:%S')
-                        
-                        # Check if within range
-                        if self.date_from and updated_at < self.date_from:
-                            continue
-                        if self.date_to and updated_at > self.date_to:
-                            continue
-                            
-                        filtered_orders.append(order)
-                    except Exception as e:
-                        _logger.warning(f"Could not parse updated_at/created_at for order {order.get('id')}: {updated_at_str}")
-                        # Include order if we can't parse the date
-                        filtered_orders.append(order)
-                
-                orders = filtered_orders
-                _logger.info(f"Filtered {len(result.get('orders', []))} orders to {len(orders)} within modification date range")
-            
-            if not orders:
-                # No more orders, we are done
-                if self.total_fetched == 0:
-                    # No orders found at all - don't create empty queue
-                    self._finish_import_no_data()
-                else:
-                    # Some orders were processed in previous batches
-                    self._finish_import()
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'zid.sale.order.connector',
-                    'res_id': self.id,
-                    'view_mode': 'form',
-                    'target': 'new',
-                }
-
-            # Create queue ONLY when we have data to process
-            queue = self.current_queue_id
-            if not queue:
-                # First batch with actual data - create queue now
-                queue = self.env['zid.queue.ept'].create({
-                    'zid_connector_id': self.zid_connector_id.id,
-                    'model_type': 'order',
-                    'name': _('Order Import - %s') % fields.Datetime.now()
-                })
-                self.current_queue_id = queue.id
-                _logger.info(f"Created queue {queue.name} for {len(orders)} orders")
-
-            queue_lines = []
-            for order_data in orders:
-                queue_lines.append({
-                    'queue_id': queue.id,
-                    'zid_id': str(order_data.get('id')),
-                    'name': order_data.get('code'),
-                    'data': json.dumps(order_data, ensure_ascii=False),
-                    'state': 'draft'
-                })
-            
-            if queue_lines:
-                self.env['zid.queue.line.ept'].create(queue_lines)
-            
-            # Update counters
-            fetched_count = len(orders)
-            new_total = self.total_fetched + fetched_count
+        has_more = True
+        while has_more:
+            orders, has_more = self._fetch_orders_page(self.current_page)
+            self._track_watermark(orders)
+            fetched_count = self._enqueue_orders(self._filter_orders_to_enqueue(orders))
             self.write({
                 'current_page': self.current_page + 1,
-                'total_fetched': new_total,
-                'progress_text': self.progress_text + _('✓ Fetched %d orders (Total: %d)\n') % (fetched_count, new_total)
+                'total_fetched': self.total_fetched + fetched_count,
             })
-            
-            # Commit this batch
             self.env.cr.commit()
-            
-            # Check if we should continue
-            if fetched_count < self.page_size:
-                # Less than page size means end of results
-                self._finish_import()
-            else:
-                # Return server action to call this method again immediately (loop)
-                # We return the dictionary of the action, pointing to the XML record
-                action_ref = self.env.ref('zid_integration.action_zid_import_orders_batch_processing')
-                if not action_ref:
-                     raise UserError(_("Server action for batch processing not found."))
 
-                action = action_ref.read()[0]
-                action['context'] = {'active_ids': [self.id], 'active_id': self.id}
-                return action
+        if self.total_fetched:
+            self._finish_import()
+        else:
+            self._finish_import_no_data()
+            self._advance_connector_watermark()
+        return self.total_fetched
 
-        except Exception as e:
-            self.env.cr.rollback()
-            _logger.error(f"Batch import failed: {str(e)}")
-            self.write({
-                'state': 'error',
-                'error_message': str(e),
-                'progress_text': self.progress_text + _('\n❌ Error: %s') % str(e)
-            })
-            self.env.cr.commit()
-            return {
-                'type': 'ir.actions.act_window',
-                'res_model': 'zid.sale.order.connector',
-                'res_id': self.id,
-                'view_mode': 'form',
-                'target': 'new',
-            }
+    def _advance_connector_watermark(self):
+        """Persist the newest order seen once every page has been queued"""
+        self.ensure_one()
+        if self.import_mode == 'incremental' and self.watermark_updated_at:
+            self.zid_connector_id._advance_order_watermark(self.watermark_updated_at, self.watermark_order_id)
 
+    def action_start_import(self):
+        """Hand the import over to a background job and open it"""
+        self.ensure_one()
+        
+        job = self.env['zid.import.job'].create({
+            'name': _('Order Import - %s') % self.zid_connector_id.app_name,
+            'zid_connector_id': self.zid_connector_id.id,
+            'import_mode': self.import_mode,
+            'date_from': self.date_from,
+            'date_to': self.date_to,
+            'order_status': self.order_status,
+            'payment_status': self.payment_status,
+            'page_size': self.page_size,
+            'source': self.import_source,
+        })
+        self.env.ref('zid_integration.cron_zid_import_jobs').sudo()._trigger()
+        
         return {
             'type': 'ir.actions.act_window',
-            'res_model': 'zid.sale.order.connector',
-            'res_id': self.id,
+            'res_model': 'zid.import.job',
+            'res_id': job.id,
             'view_mode': 'form',
-            'target': 'new',
+            'target': 'current',
         }
 
     def _finish_import(self):
@@ -323,6 +363,10 @@ class ZidSaleOrderConnector(models.TransientModel):
         # Auto-process the queue after fetching
         if self.current_queue_id:
              self.current_queue_id.action_process()
+
+        # Every page is queued and upserted, so the next run can start from here
+        self._advance_connector_watermark()
+        self.env.cr.commit()
              
         # Trigger status sync for recent orders if enabled
         try:
@@ -351,7 +395,9 @@ class ZidSaleOrderConnector(models.TransientModel):
             'total_fetched': 0,
             'progress_text': '',
             'error_message': False,
-            'current_queue_id': False
+            'current_queue_id': False,
+            'watermark_updated_at': False,
+            'watermark_order_id': 0,
         })
         return {
             'type': 'ir.actions.act_window',
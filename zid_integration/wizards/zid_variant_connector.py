@@ -463,7 +463,7 @@ class ZidVariantConnector(models.TransientModel):
         _logger.info(f"Found {len(variants)} variants for product {product_id}")
         self.total_variants += len(variants)
 
-        # Process each variant
+        # Prepare each variant, then import them in chunked transactions
         for idx, variant_data in enumerate(variants, 1):
             variant_id = str(variant_data.get('id', ''))
             sku = variant_data.get('sku', '')
@@ -523,7 +523,12 @@ class ZidVariantConnector(models.TransientModel):
                 _logger.debug(f"Processing variant {idx}/{len(variants)} - ID: {variant_id}")
 
             _logger.debug(f"Variant data keys: {list(variant_data.keys())}")
-            self._process_single_variant(variant_data, parent_product)
+
+        self.env['zid.chunked.transaction']._run_chunked(
+            variants,
+            lambda variant_data: self._process_single_variant(variant_data, parent_product),
+            on_error=self._on_variant_error,
+        )
 
     def _process_single_variant(self, variant_data, parent_product):
         """Process a single variant"""
@@ -556,66 +561,66 @@ class ZidVariantConnector(models.TransientModel):
                     is_inf = stock.get('is_infinite', False)
                     _logger.info(f"  - {location_name}: {'Infinite' if is_inf else f'{qty} units'}")
 
-        try:
-            # Apply filters
-            if not self._should_import_variant(variant_data):
-                _logger.info(f"Variant {sku} filtered out, skipping")
-                self._add_progress(_('  Skipped variant %s (filtered)\n') % sku)
-                return
-
-            # Check if variant exists
-            existing_variant = self.env['zid.variant'].search([
-                ('zid_variant_id', '=', variant_id),
-                ('zid_connector_id', '=', self.zid_connector_id.id)
-            ], limit=1)
-
-            if existing_variant:
-                _logger.debug(f"Found existing variant {sku} with ID: {existing_variant.id}")
-
-                if not self.update_existing:
-                    _logger.info(f"Skipping existing variant {sku} (update_existing=False)")
-                    self._add_progress(_('  Skipped existing variant %s\n') % sku)
-                    return
-            else:
-                _logger.debug(f"Variant {sku} does not exist")
-
-                if not self.create_new:
-                    _logger.info(f"Skipping new variant {sku} (create_new=False)")
-                    self._add_progress(_('  Skipped new variant %s\n') % sku)
-                    return
-
-            # Log stock information before create/update
-            if 'stocks' in variant_data:
-                total_qty = variant_data.get('quantity', 0)
-                is_infinite = variant_data.get('is_infinite', False)
-                _logger.info(f"Variant {sku} stock summary - Total: {total_qty}, Infinite: {is_infinite}")
+        # Apply filters
+        if not self._should_import_variant(variant_data):
+            _logger.info(f"Variant {sku} filtered out, skipping")
+            self._add_progress(_('  Skipped variant %s (filtered)\n') % sku)
+            return
 
-            # Create or update variant
-            _logger.info(f"Creating/updating variant {sku}")
+        # Check if variant exists
+        existing_variant = self.env['zid.variant'].search([
+            ('zid_variant_id', '=', variant_id),
+            ('zid_connector_id', '=', self.zid_connector_id.id)
+        ], limit=1)
 
-            # Ensure stocks data is passed to create_or_update_from_zid
-            variant = self.env['zid.variant'].create_or_update_from_zid(
-                variant_data,
-                parent_product,
-                self.zid_connector_id.id
-            )
+        if existing_variant:
+            _logger.debug(f"Found existing variant {sku} with ID: {existing_variant.id}")
 
-            if existing_variant:
-                self.updated_variants += 1
-                _logger.info(f"✓ Successfully updated variant {sku}")
-                self._add_progress(_('  ✓ Updated variant %s\n') % sku)
-            else:
-                self.imported_variants += 1
-                _logger.info(f"✓ Successfully created variant {sku}")
-                self._add_progress(_('  ✓ Created variant %s\n') % sku)
+            if not self.update_existing:
+                _logger.info(f"Skipping existing variant {sku} (update_existing=False)")
+                self._add_progress(_('  Skipped existing variant %s\n') % sku)
+                return
+        else:
+            _logger.debug(f"Variant {sku} does not exist")
 
-        except Exception as e:
-            self.failed_variants += 1
-            error_msg = f"Failed to process variant {sku}: {str(e)}"
-            self.error_log += f"\n{error_msg}"
+            if not self.create_new:
+                _logger.info(f"Skipping new variant {sku} (create_new=False)")
+                self._add_progress(_('  Skipped new variant %s\n') % sku)
+                return
 
-            _logger.error(f"✗ {error_msg}", exc_info=True)
-            self._add_progress(_('  ✗ %s\n') % error_msg)
+        # Log stock information before create/update
+        if 'stocks' in variant_data:
+            total_qty = variant_data.get('quantity', 0)
+            is_infinite = variant_data.get('is_infinite', False)
+            _logger.info(f"Variant {sku} stock summary - Total: {total_qty}, Infinite: {is_infinite}")
+
+        # Create or update variant
+        _logger.info(f"Creating/updating variant {sku}")
+
+        # Ensure stocks data is passed to create_or_update_from_zid
+        self.env['zid.variant'].create_or_update_from_zid(
+            variant_data,
+            parent_product,
+            self.zid_connector_id.id
+        )
+
+        if existing_variant:
+            self.updated_variants += 1
+            _logger.info(f"✓ Successfully updated variant {sku}")
+            self._add_progress(_('  ✓ Updated variant %s\n') % sku)
+        else:
+            self.imported_variants += 1
+            _logger.info(f"✓ Successfully created variant {sku}")
+            self._add_progress(_('  ✓ Created variant %s\n') % sku)
+
+    def _on_variant_error(self, variant_data, error):
+        """Record a variant that failed to import (its savepoint is already rolled back)"""
+        self.failed_variants += 1
+        error_msg = f"Failed to process variant {variant_data.get('sku', '')}: {str(error)}"
+        self.error_log += f"\n{error_msg}"
+
+        _logger.error(f"✗ {error_msg}", exc_info=True)
+        self._add_progress(_('  ✗ %s\n') % error_msg)
 
     def _should_import_variant(self, variant_data):
         """Check if variant should be imported based on filters"""
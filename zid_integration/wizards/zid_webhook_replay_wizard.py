@@ -0,0 +1,104 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ZidWebhookReplayWizard(models.TransientModel):
+    _name = 'zid.webhook.replay.wizard'
+    _description = 'Replay Zid Webhook Events'
+
+    zid_connector_id = fields.Many2one(
+        'zid.connector',
+        string='Zid Connector',
+        required=True
+    )
+
+    date_from = fields.Datetime(
+        string='Received From',
+        required=True
+    )
+
+    date_to = fields.Datetime(
+        string='Received To',
+        required=True,
+        default=fields.Datetime.now
+    )
+
+    event = fields.Selection(
+        selection=lambda self: self.env['zid.webhook']._fields['event'].selection,
+        string='Event Type',
+        help='Leave empty to replay every event type'
+    )
+
+    include_failed_only = fields.Boolean(
+        string='Failed Events Only',
+        default=False
+    )
+
+    rate_per_minute = fields.Integer(
+        string='Events per Minute',
+        default=60,
+        required=True,
+        help='Replayed events are released to the worker at this pace'
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self.env.context.get('default_zid_connector_id'):
+            res['zid_connector_id'] = self.env.context['default_zid_connector_id']
+        return res
+
+    def _get_domain(self):
+        domain = [
+            ('zid_connector_id', '=', self.zid_connector_id.id),
+            ('received_at', '>=', self.date_from),
+            ('received_at', '<=', self.date_to),
+            ('state', 'not in', ['pending', 'processing']),
+        ]
+        if self.event:
+            domain.append(('event', '=', self.event))
+        if self.include_failed_only:
+            domain.append(('state', '=', 'failed'))
+        return domain
+
+    def action_replay(self):
+        """Send the events of the window back through the inbox, staggered by the rate"""
+        self.ensure_one()
+
+        if self.date_from > self.date_to:
+            raise UserError(_('The start date must be before the end date'))
+        if self.rate_per_minute <= 0:
+            raise UserError(_('The replay rate must be positive'))
+
+        events = self.env['zid.webhook.event'].search(self._get_domain(), order='id')
+        if not events:
+            raise UserError(_('No webhook events were received in this window'))
+
+        now = fields.Datetime.now()
+        for minute, start in enumerate(range(0, len(events), self.rate_per_minute)):
+            chunk = events[start:start + self.rate_per_minute]
+            for replays, group in chunk.grouped('replay_count').items():
+                group.write({
+                    'state': 'pending',
+                    'available_at': fields.Datetime.add(now, minutes=minute),
+                    'replay_count': replays + 1,
+                    'coalesced_into_id': False,
+                    'error_message': False,
+                })
+
+        self.env.ref('zid_integration.cron_zid_webhook_events').sudo()._trigger()
+        _logger.info(f"Replaying {len(events)} webhook events for connector {self.zid_connector_id.app_name}")
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Replay Scheduled'),
+                'message': _('%d events will be processed again over about %d minutes') % (
+                    len(events), -(-len(events) // self.rate_per_minute)),
+                'type': 'success',
+            }
+        }